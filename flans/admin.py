@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import Flan, Subscriber, EmailLog, FlanCreator
+from .pagination import CountingPaginator
 
 # Register your models here.
 from .models import Flan
@@ -18,6 +20,10 @@ class FlanAdmin(admin.ModelAdmin):
     # Search functionality
     search_fields = ['name', 'description']
 
+    # Totals follow FLANS_COUNT_MODE; skip the extra unfiltered COUNT(*)
+    paginator = CountingPaginator
+    show_full_result_count = False
+
     # Pre-populate fields (if we had slugs)
     # prepopulated_fields = {"slug": ("name",)}
 
@@ -56,6 +62,10 @@ class FlanCreatorAdmin(admin.ModelAdmin):
     list_filter = ['creator_type', 'is_featured', 'join_date']
     search_fields = ['name', 'bio']
     readonly_fields = ['join_date']
+
+    def get_queryset(self, request):
+        # total_flans reads the annotation instead of a COUNT per row
+        return super().get_queryset(request).annotate(flans_count=Count('flans'))
     
     fieldsets = (
         ('Basic Information', {
@@ -1,18 +1,32 @@
 from django.urls import path
-from . import api_views
+from . import api_views, async_views
 
 urlpatterns = [
     # Flans
     path('flans/', api_views.FlanListAPIView.as_view(), name='api-flan-list'),
+    path('flans/changes/', api_views.api_flan_changes, name='api-flan-changes'),
+    path('flans/bulk/', api_views.api_flans_bulk_create, name='api-flans-bulk-create'),
     path('flans/<int:pk>/', api_views.FlanDetailAPIView.as_view(), name='api-flan-detail'),
     path('flans/<int:flan_id>/ratings/', api_views.FlanRatingListCreateAPIView.as_view(), name='api-flan-ratings'),
 
     # Creators
     path('creators/', api_views.FlanCreatorListAPIView.as_view(), name='api-creators-list'),
+    path('creators/<int:pk>/', api_views.FlanCreatorDetailAPIView.as_view(), name='api-creator-detail'),
 
     # Subscriptions
     path('subscribe/', api_views.api_subscribe, name='api-subscribe'),
+    path('subscribers/import/', api_views.api_import_subscribers, name='api-subscribers-import'),
 
     # Stats
     path('stats/', api_views.api_stats, name='api-stats'),
+    path('profiling/', api_views.api_profiling, name='api-profiling'),
+
+    # Async read paths (served natively under onlyflans.asgi)
+    path('async/flans/', async_views.flan_list, name='api-async-flan-list'),
+    path('async/flans/<int:pk>/', async_views.flan_detail, name='api-async-flan-detail'),
+    path('async/creators/', async_views.creators_list, name='api-async-creators-list'),
+    path('async/stats/', async_views.stats, name='api-async-stats'),
+
+    # Bulk exports
+    path('export/<slug:resource>.<slug:fmt>', api_views.api_export, name='api-export'),
 ]
\ No newline at end of file
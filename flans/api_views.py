@@ -1,18 +1,36 @@
+import io
+
 from rest_framework import generics, filters, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.request import Request
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
 
 from .models import Flan, FlanCreator, FlanRating
 from .serializers import (
     FlanListSerializer, FlanDetailSerializer,
     FlanCreatorSerializer, FlanRatingSerializer,
-    SubscribeSerializer,
+    SubscribeSerializer, FlanSyncSerializer,
 )
+from .db import replica_reads
+from .caching import FLAN_DETAIL_CACHE_TIMEOUT, api_flan_detail_key, get_or_compute
+from .exceptions import InvalidCursorError, InvalidExportSinceError, UnknownExportResourceError
+from .importers import IMPORT_FORMATS, guess_format, iter_rows
+from .pagination import keyset_page
+from .profiling import get_profile_snapshot, profile_store
+from .services import CreatorService, FlanService, SubscriberService
+from .exports import EXPORT_FORMATS, get_export_spec, parse_since, stream_export
+from . import write_behind
+from .sync import MAX_SYNC_PAGE_SIZE, SYNC_PAGE_SIZE, get_flan_changes
+
 
+MAX_BULK_FLANS = 1000
 
+
+@method_decorator(replica_reads(), name='dispatch')
 class FlanListAPIView(generics.ListAPIView):
     """
     GET /api/flans/
@@ -40,6 +58,70 @@ class FlanListAPIView(generics.ListAPIView):
         return queryset
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def api_flan_changes(request: Request) -> Response:
+    """
+    GET /api/flans/changes/?since=<token>
+    Flans created/updated and ids of flans deleted since the token.
+    Omit `since` for a full snapshot; keep calling with `next_token`
+    while `has_more` is true. Changes from the last few seconds are sent
+    again on the next call (see flans.sync).
+    """
+    try:
+        limit = min(int(request.query_params.get('limit', SYNC_PAGE_SIZE)), MAX_SYNC_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return Response(
+            {'error': 'limit must be a positive integer.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        changes = get_flan_changes(request.query_params.get('since'), limit=limit)
+    except InvalidCursorError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'changed': FlanSyncSerializer(changes.changed, many=True).data,
+        'deleted': changes.deleted,
+        'next_token': changes.next_token,
+        'has_more': changes.has_more,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def api_flans_bulk_create(request: Request) -> Response:
+    """
+    POST /api/flans/bulk/
+    Create up to MAX_BULK_FLANS flans from a JSON list (or {"flans": [...]})
+    of {name, description, image_url, flan_type, is_premium, price}, owned
+    by the requesting user. Add ?strict=1 to create nothing unless every
+    item is valid. Responds with the created ids and per-item errors
+    (by list index). Staff only.
+    """
+    items = request.data.get('flans') if isinstance(request.data, dict) else request.data
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return Response(
+            {'error': "Send a JSON list of flan objects, or {\"flans\": [...]}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > MAX_BULK_FLANS:
+        return Response(
+            {'error': f"At most {MAX_BULK_FLANS} flans per request; got {len(items)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    strict = request.query_params.get('strict') in ('1', 'true')
+    result = FlanService.create_flans_bulk(items, request.user, strict=strict)
+    if result.errors and not result.created:
+        return Response(result.to_dict(), status=status.HTTP_400_BAD_REQUEST)
+    return Response(result.to_dict(), status=status.HTTP_201_CREATED)
+
+
+@method_decorator(replica_reads(), name='dispatch')
 class FlanDetailAPIView(generics.RetrieveAPIView):
     """
     GET /api/flans/<id>/
@@ -47,17 +129,27 @@ class FlanDetailAPIView(generics.RetrieveAPIView):
     """
     queryset = Flan.objects.select_related(
         'creator', 'featured_creator'
-    ).prefetch_related('ratings__user')
+    ).prefetch_related(Prefetch('ratings', queryset=FlanRating.objects.select_related('user')))
     serializer_class = FlanDetailSerializer
     permission_classes = [AllowAny]
 
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        # Serialized payload is cached; concurrent misses are coalesced per flan
+        data = get_or_compute(
+            api_flan_detail_key(self.kwargs['pk']),
+            lambda: self.get_serializer(self.get_object()).data,
+            FLAN_DETAIL_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
 
 class FlanCreatorListAPIView(generics.ListAPIView):
     """
     GET /api/creators/
     Returns all flan creators. Featured creators first.
     """
-    queryset = FlanCreator.objects.prefetch_related('flans')
+    # total_flans is served from the annotation instead of a COUNT per creator
+    queryset = FlanCreator.objects.annotate(flans_count=Count('flans'))
     serializer_class = FlanCreatorSerializer
     permission_classes = [AllowAny]
     filter_backends = [filters.OrderingFilter]
@@ -65,10 +157,43 @@ class FlanCreatorListAPIView(generics.ListAPIView):
     ordering = ['-is_featured', '-total_earnings']
 
 
+class FlanCreatorDetailAPIView(generics.RetrieveAPIView):
+    """
+    GET /api/creators/<id>/
+    Creator profile, cached stats and the newest flans, keyset-paginated:
+    follow `next_cursor` with /api/creators/<id>/?after=<cursor>
+    """
+    queryset = FlanCreator.objects.all()
+    serializer_class = FlanCreatorSerializer
+    permission_classes = [AllowAny]
+    page_size = 12
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        creator = self.get_object()
+        stats = CreatorService.get_creator_stats(creator.id)
+        creator.flans_count = stats.flan_count
+
+        try:
+            page = keyset_page(
+                Flan.objects.filter(featured_creator=creator),
+                request.query_params.get('after'),
+                self.page_size,
+            )
+        except InvalidCursorError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = self.get_serializer(creator).data
+        data['stats'] = stats.to_dict()
+        data['flans'] = FlanListSerializer(page.items, many=True).data
+        data['next_cursor'] = page.next_cursor
+        return Response(data)
+
+
 class FlanRatingListCreateAPIView(generics.ListCreateAPIView):
     """
     GET  /api/flans/<flan_id>/ratings/  — list ratings for a flan
     POST /api/flans/<flan_id>/ratings/  — submit or update a rating (auth required)
+    With FLANS_RATING_WRITE_BEHIND, POST queues the write and returns 202.
     """
     serializer_class = FlanRatingSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -78,6 +203,27 @@ class FlanRatingListCreateAPIView(generics.ListCreateAPIView):
             flan_id=self.kwargs['flan_id']
         ).select_related('user')
 
+    def _pending_rating(self, request: Request):
+        """The user's rating still waiting in the write-behind buffer, as an unsaved FlanRating."""
+        if not request.user.is_authenticated:
+            return None
+        pending = write_behind.rating_buffer.get_pending(
+            int(self.kwargs['flan_id']), request.user.id)
+        if pending is None:
+            return None
+        return FlanRating(
+            flan_id=pending.flan_id, user=request.user,
+            score=pending.score, review=pending.review,
+        )
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        ratings = list(self.get_queryset())
+        pending = self._pending_rating(request)
+        if pending is not None:
+            # Read-your-writes: show the queued rating instead of the stored one
+            ratings = [pending] + [r for r in ratings if r.user_id != request.user.id]
+        return Response(self.get_serializer(ratings, many=True).data)
+
     def create(self, request: Request, *args, **kwargs) -> Response:
         flan_id = self.kwargs['flan_id']
         score = request.data.get('score')
@@ -98,6 +244,11 @@ class FlanRatingListCreateAPIView(generics.ListCreateAPIView):
 
         flan = generics.get_object_or_404(Flan, id=flan_id)
 
+        if write_behind.is_enabled():
+            write_behind.rating_buffer.submit(flan.id, request.user.id, score, review)
+            serializer = self.get_serializer(self._pending_rating(request))
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
         rating, created = FlanRating.objects.update_or_create(
             flan=flan,
             user=request.user,
@@ -139,8 +290,57 @@ def api_subscribe(request: Request) -> Response:
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def api_import_subscribers(request: Request) -> Response:
+    """
+    POST /api/subscribers/import/
+    Bulk-import subscribers from an uploaded CSV or NDJSON file (field `file`).
+    The format comes from the file extension unless `format` is given.
+    Staff only.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response(
+            {'error': "Upload a CSV or NDJSON file in the 'file' field."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    fmt = request.data.get('format') or guess_format(upload.name)
+    if fmt not in IMPORT_FORMATS:
+        return Response(
+            {'error': f"Unsupported format '{fmt}'. Use one of: {', '.join(IMPORT_FORMATS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace')
+    result = SubscriberService.import_subscribers(iter_rows(lines, fmt))
+    return Response(result.to_dict(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def api_profiling(request: Request) -> Response:
+    """
+    GET    /api/profiling/?limit=50
+    p50/p95/p99 request time, DB time and query count per URL name, and
+    latency per query fingerprint, from the sampled SQL profiler (this
+    worker process only). DELETE clears the collected samples.
+    Staff only.
+    """
+    if request.method == 'DELETE':
+        profile_store.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    try:
+        limit = max(1, int(request.query_params.get('limit', 50)))
+    except ValueError:
+        return Response({'error': "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(get_profile_snapshot(limit))
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@replica_reads()
 def api_stats(request: Request) -> Response:
     """
     GET /api/stats/
@@ -163,3 +363,43 @@ def api_stats(request: Request) -> Response:
         }
     }
     return Response(stats)
+
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def api_export(request: Request, resource: str, fmt: str):
+    """
+    GET /api/export/<resource>.<ndjson|csv>
+    Streams a full export of flans, ratings or subscribers in constant memory.
+    Supports incremental exports: /api/export/flans.ndjson?since=2026-01-01
+    Ratings and subscribers are staff only.
+    """
+    if fmt not in EXPORT_FORMATS:
+        return Response(
+            {'error': f"Unsupported format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        spec = get_export_spec(resource)
+    except UnknownExportResourceError as e:
+        return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        since = parse_since(request.query_params.get('since'))
+    except InvalidExportSinceError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if spec.staff_only and not request.user.is_staff:
+        return Response(
+            {'error': 'Staff access required for this export.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    response = StreamingHttpResponse(
+        stream_export(resource, fmt, since=since),
+        content_type=EXPORT_FORMATS[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{resource}.{fmt}"'
+    return response
@@ -0,0 +1,129 @@
+"""
+Native async variants of the hot read endpoints.
+
+These run side by side with the sync DRF views in ``api_views`` and return
+the same payloads, but never tie up a worker thread per request when served
+through ``onlyflans.asgi`` (e.g. ``uvicorn onlyflans.asgi:application``).
+DRF views are sync-only, so these are plain Django async views.
+"""
+from django.db.models import Avg, Count, Q
+from django.http import HttpRequest, JsonResponse
+
+from .caching import (
+    FLAN_DETAIL_CACHE_TIMEOUT, aget_catalog_generation, aget_or_compute, api_flan_detail_key,
+)
+from .models import Flan, FlanCreator, FlanRating, Subscriber
+from .serializers import FlanCreatorSerializer, FlanDetailSerializer, FlanListSerializer
+
+STATS_CACHE_KEY = 'flans:api:stats'
+STATS_CACHE_TIMEOUT = 60  # seconds
+# Keyed by the catalog generation, so any flan or creator write invalidates it
+CREATORS_CACHE_KEY = 'flans:api:creators:{generation}'
+CREATORS_CACHE_TIMEOUT = 60  # seconds
+
+ITERATOR_CHUNK_SIZE = 500
+
+# Same options FlanListAPIView exposes through its filter backends
+FLAN_ORDERING_FIELDS = {'created_at', 'price', 'name'}
+
+
+def _filtered_flans(request: HttpRequest):
+    queryset = Flan.objects.all()
+    flan_type = request.GET.get('type')
+    is_premium = request.GET.get('premium')
+    search = request.GET.get('search')
+    ordering = request.GET.get('ordering', '-created_at')
+
+    if flan_type:
+        queryset = queryset.filter(flan_type=flan_type)
+    if is_premium is not None:
+        queryset = queryset.filter(is_premium=is_premium.lower() == 'true')
+    if search:
+        queryset = queryset.filter(
+            Q(name__icontains=search) | Q(description__icontains=search))
+    if ordering.lstrip('-') in FLAN_ORDERING_FIELDS:
+        queryset = queryset.order_by(ordering)
+
+    return queryset
+
+
+async def flan_list(request: HttpRequest) -> JsonResponse:
+    """
+    GET /api/async/flans/
+    Async twin of FlanListAPIView; same filters (type, premium, search, ordering).
+    """
+    flans = [
+        flan async for flan in _filtered_flans(request).aiterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    ]
+    return JsonResponse(FlanListSerializer(flans, many=True).data, safe=False)
+
+
+async def flan_detail(request: HttpRequest, pk: int) -> JsonResponse:
+    """
+    GET /api/async/flans/<id>/
+    Async twin of FlanDetailAPIView.
+    """
+    async def load():
+        flan = await Flan.objects.select_related(
+            'featured_creator'
+        ).prefetch_related('ratings__user').aget(pk=pk)
+
+        if flan.featured_creator is not None:
+            # Pre-fill the count so the serializer doesn't run a sync query
+            flan.featured_creator.flans_count = await flan.featured_creator.flans.acount()
+        return FlanDetailSerializer(flan).data
+
+    try:
+        # Shares its cache entry (and coalescing) with FlanDetailAPIView
+        data = await aget_or_compute(api_flan_detail_key(pk), load, FLAN_DETAIL_CACHE_TIMEOUT)
+    except Flan.DoesNotExist:
+        return JsonResponse({'detail': 'No Flan matches the given query.'}, status=404)
+
+    return JsonResponse(data)
+
+
+async def creators_list(request: HttpRequest) -> JsonResponse:
+    """
+    GET /api/async/creators/
+    Async twin of FlanCreatorListAPIView, flan counts annotated in the same query.
+    """
+    async def load():
+        creators = [
+            creator async for creator in FlanCreator.objects.annotate(
+                flans_count=Count('flans')
+            ).aiterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        ]
+        return FlanCreatorSerializer(creators, many=True).data
+
+    key = CREATORS_CACHE_KEY.format(generation=await aget_catalog_generation())
+    data = await aget_or_compute(key, load, CREATORS_CACHE_TIMEOUT)
+    return JsonResponse(data, safe=False)
+
+
+async def stats(request: HttpRequest) -> JsonResponse:
+    """
+    GET /api/async/stats/
+    Async twin of api_stats, cached for STATS_CACHE_TIMEOUT seconds.
+    """
+    async def load():
+        by_type = {flan_type: 0 for flan_type, _ in Flan.FlanType.choices}
+        async for row in Flan.objects.order_by().values('flan_type').annotate(total=Count('id')):
+            by_type[row['flan_type']] = row['total']
+
+        total_flans = sum(by_type.values())
+        premium_flans = await Flan.objects.filter(is_premium=True).acount()
+        ratings = await FlanRating.objects.aaggregate(total=Count('id'), avg=Avg('score'))
+
+        return {
+            'total_flans': total_flans,
+            'premium_flans': premium_flans,
+            'free_flans': total_flans - premium_flans,
+            'total_creators': await FlanCreator.objects.acount(),
+            'total_subscribers': await Subscriber.objects.filter(is_active=True).acount(),
+            'total_ratings': ratings['total'],
+            'avg_platform_rating': round(ratings['avg'] or 0, 1),
+            'flans_by_type': by_type,
+        }
+
+    data = await aget_or_compute(STATS_CACHE_KEY, load, STATS_CACHE_TIMEOUT)
+    return JsonResponse(data)
@@ -0,0 +1,117 @@
+"""
+Cache keys and read-through helpers for hot pages.
+
+Misses are coalesced through ``single_flight`` so a hot key expiring
+produces one recomputation instead of one per concurrent request, and are
+computed from the primary database even inside ``replica_reads()``.
+Invalidation is driven by the model signals in ``signals``.
+"""
+import time
+from typing import Any, Awaitable, Callable
+
+from django.core.cache import cache
+
+from .coalescing import single_flight
+from .db import primary_reads
+
+FLAN_DETAIL_CACHE_TIMEOUT = 60  # seconds
+# Keyed by catalog generation, so this only bounds memory
+FLAN_LIST_COUNT_CACHE_TIMEOUT = 60 * 60  # seconds
+# Flan changes invalidate creator stats right away; rating changes only via this TTL
+CREATOR_STATS_CACHE_TIMEOUT = 5 * 60  # seconds
+
+CATALOG_GENERATION_KEY = 'flans:catalog:generation'
+
+_MISSING = object()
+
+
+def flan_detail_key(flan_id: int) -> str:
+    # v2: the cached value is the annotated Flan, no longer a (flan, stats) pair
+    return f'flans:detail:v2:{flan_id}'
+
+
+def api_flan_detail_key(flan_id: int) -> str:
+    return f'flans:api:detail:{flan_id}'
+
+
+def flan_list_count_key(flan_type: str, generation: int) -> str:
+    return f'flans:list:count:{generation}:{flan_type}'
+
+
+def creator_stats_key(creator_id: int) -> str:
+    # v2: CreatorStatsData is slotted; pickles of the old class don't load into it
+    return f'flans:creator:stats:v2:{creator_id}'
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], timeout: int) -> Any:
+    """Return the cached value for ``key``, computing it at most once per process on a miss."""
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    def fill() -> Any:
+        # Another leader may have filled the key while we queued for it
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            # Shared by every client: a replica copy could predate the invalidation
+            with primary_reads():
+                value = compute()
+            cache.set(key, value, timeout)
+        return value
+
+    return single_flight.do(key, fill)
+
+
+async def aget_or_compute(key: str, compute: Callable[[], Awaitable[Any]], timeout: int) -> Any:
+    """Async version of ``get_or_compute``."""
+    value = await cache.aget(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    async def fill() -> Any:
+        value = await cache.aget(key, _MISSING)
+        if value is _MISSING:
+            with primary_reads():
+                value = await compute()
+            await cache.aset(key, value, timeout)
+        return value
+
+    return await single_flight.ado(key, fill)
+
+
+def invalidate_flan(flan_id: int) -> None:
+    cache.delete_many([flan_detail_key(flan_id), api_flan_detail_key(flan_id)])
+
+
+def invalidate_creator_stats(creator_id: int) -> None:
+    cache.delete(creator_stats_key(creator_id))
+
+
+def get_catalog_generation() -> int:
+    """
+    Version number of the flan catalog, bumped whenever any Flan or
+    FlanCreator changes. Cache keys that include it are invalidated all at
+    once by a bump.
+    """
+    generation = cache.get(CATALOG_GENERATION_KEY)
+    if generation is None:
+        # Start from the clock so an evicted counter never reuses old numbers
+        cache.add(CATALOG_GENERATION_KEY, int(time.time() * 1000), None)
+        generation = cache.get(CATALOG_GENERATION_KEY)
+    return generation
+
+
+async def aget_catalog_generation() -> int:
+    """Async version of ``get_catalog_generation``."""
+    generation = await cache.aget(CATALOG_GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(CATALOG_GENERATION_KEY, int(time.time() * 1000), None)
+        generation = await cache.aget(CATALOG_GENERATION_KEY)
+    return generation
+
+
+def bump_catalog_generation() -> None:
+    try:
+        cache.incr(CATALOG_GENERATION_KEY)
+    except ValueError:
+        get_catalog_generation()
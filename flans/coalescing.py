@@ -0,0 +1,93 @@
+"""
+In-process request coalescing ("single flight").
+
+When many concurrent callers ask for the same key, only the first one (the
+leader) runs the computation; the others wait for its result instead of
+repeating the same queries. Works for threads (WSGI workers) via ``do`` and
+for coroutines (ASGI) via ``ado``. Followers that wait longer than the
+timeout stop waiting and compute the value themselves.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 5.0  # seconds a follower waits for the leader
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent computations of the same key within a process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           timeout: float = DEFAULT_TIMEOUT) -> Any:
+        """Run ``fn`` once for all threads concurrently asking for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if is_leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+
+        if not call.done.wait(timeout):
+            logger.warning(f"Coalesced call for {key!r} timed out, computing directly")
+            return fn()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                  timeout: float = DEFAULT_TIMEOUT) -> Any:
+        """Await ``fn()`` once for all coroutines on this event loop asking for ``key``."""
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        future = self._async_calls.get(loop_key)
+
+        if future is None:
+            future = self._async_calls[loop_key] = loop.create_future()
+            try:
+                result = await fn()
+                future.set_result(result)
+                return result
+            except BaseException as e:
+                future.set_exception(e)
+                future.exception()  # mark retrieved when nobody is waiting
+                raise
+            finally:
+                self._async_calls.pop(loop_key, None)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Coalesced call for {key!r} timed out, computing directly")
+            return await fn()
+
+
+# Process-wide instance shared by views
+single_flight = SingleFlight()
@@ -0,0 +1,164 @@
+"""
+Row counting strategies for paginated listings.
+
+``COUNT(*)`` over a large filtered table is often the slowest query on a
+listing page, so paginators ask ``count_queryset`` instead. The mode comes
+from ``settings.FLANS_COUNT_MODE``:
+
+* ``exact``     - plain ``queryset.count()`` (the default).
+* ``cached``    - exact count, cached per query for ``FLANS_COUNT_CACHE_TTL``
+  seconds.
+* ``estimated`` - an estimate: planner statistics on PostgreSQL, or the
+  maintained per (flan_type, is_premium) counts for flan listings. Small
+  results (under ``FLANS_COUNT_ESTIMATE_THRESHOLD``) are still counted
+  exactly; above it the UI shows "10,000+" rather than a precise number.
+  Without an estimator the cached count is used.
+"""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models import Count, F, QuerySet
+
+from .caching import get_or_compute
+from .models import Flan, FlanGroupCount
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ('exact', 'cached', 'estimated')
+DEFAULT_COUNT_CACHE_TTL = 60  # seconds
+DEFAULT_ESTIMATE_THRESHOLD = 10_000
+
+
+@dataclass(frozen=True)
+class CountResult:
+    value: int
+    is_estimate: bool = False
+
+
+def get_count_mode() -> str:
+    mode = getattr(settings, 'FLANS_COUNT_MODE', 'exact')
+    if mode not in COUNT_MODES:
+        raise ValueError(f"FLANS_COUNT_MODE must be one of {COUNT_MODES}, got {mode!r}")
+    return mode
+
+
+def get_estimate_threshold() -> int:
+    return getattr(settings, 'FLANS_COUNT_ESTIMATE_THRESHOLD', DEFAULT_ESTIMATE_THRESHOLD)
+
+
+def format_count(result: CountResult) -> str:
+    """'1,234' for exact counts, '10,000+' for estimates over the threshold."""
+    if result.is_estimate:
+        return f"{get_estimate_threshold():,}+"
+    return f"{result.value:,}"
+
+
+def count_cache_key(queryset: QuerySet) -> Optional[str]:
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    digest = hashlib.sha1(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+    return f'flans:count:{digest}'
+
+
+def cached_count(queryset: QuerySet) -> int:
+    key = count_cache_key(queryset)
+    if key is None:
+        return 0
+
+    return get_or_compute(
+        key, queryset.count, getattr(settings, 'FLANS_COUNT_CACHE_TTL', DEFAULT_COUNT_CACHE_TTL))
+
+
+def planner_estimate(queryset: QuerySet) -> Optional[int]:
+    """Row estimate from the PostgreSQL planner, or None on other backends."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_flan_group_counts() -> Dict[Tuple[str, bool], int]:
+    """
+    Flan counts per (flan_type, is_premium) from the FlanGroupCount rows the
+    Flan signals keep up to date; at most one small table read.
+    """
+    return {
+        (flan_type, is_premium): total
+        for flan_type, is_premium, total in FlanGroupCount.objects.values_list(
+            'flan_type', 'is_premium', 'total')
+    }
+
+
+def adjust_flan_group_counts(deltas: Mapping[Tuple[str, bool], int]) -> None:
+    """Add ``deltas`` ({(flan_type, is_premium): change}) to the maintained counts."""
+    with transaction.atomic():
+        for (flan_type, is_premium), delta in deltas.items():
+            if not delta:
+                continue
+            group = FlanGroupCount.objects.filter(flan_type=flan_type, is_premium=is_premium)
+            if not group.update(total=F('total') + delta):
+                FlanGroupCount.objects.get_or_create(flan_type=flan_type, is_premium=is_premium)
+                group.update(total=F('total') + delta)
+
+
+def rebuild_flan_group_counts() -> None:
+    """
+    Recount the maintained counts with one GROUP BY, for bulk writes that
+    skip the Flan signals (bulk_create, flush, raw SQL).
+    """
+    with transaction.atomic():
+        FlanGroupCount.objects.all().delete()
+        FlanGroupCount.objects.bulk_create(
+            FlanGroupCount(flan_type=row['flan_type'], is_premium=row['is_premium'], total=row['total'])
+            for row in Flan.objects.order_by().values('flan_type', 'is_premium').annotate(
+                total=Count('id'))
+        )
+
+
+def estimate_flan_count(flan_type: Optional[str] = None, is_premium: Optional[bool] = None) -> int:
+    """Number of flans matching the (optional) type and premium filters, from the maintained counts."""
+    return sum(
+        total for (group_type, group_premium), total in get_flan_group_counts().items()
+        if (not flan_type or group_type == flan_type)
+        and (is_premium is None or group_premium == is_premium)
+    )
+
+
+def count_queryset(queryset: QuerySet, mode: Optional[str] = None,
+                   estimate: Optional[Callable[[], int]] = None) -> CountResult:
+    """
+    Count ``queryset`` using ``mode`` (default: FLANS_COUNT_MODE).
+    ``estimate`` is a cheap estimator for this particular listing; without
+    one the planner is asked on PostgreSQL.
+    """
+    mode = mode or get_count_mode()
+    if mode == 'exact':
+        return CountResult(queryset.count())
+    if mode == 'cached':
+        return CountResult(cached_count(queryset))
+
+    approx = estimate() if estimate is not None else planner_estimate(queryset)
+    if approx is None:
+        return CountResult(cached_count(queryset))
+    if approx < get_estimate_threshold():
+        # Cheap enough to count precisely, and the exact number reads better
+        return CountResult(cached_count(queryset))
+    return CountResult(approx, is_estimate=True)
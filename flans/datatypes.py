@@ -1,10 +1,12 @@
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict
+from typing import ClassVar, Optional, List, Dict, Sequence, Tuple
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from django.contrib.auth.models import User
 
-@dataclass
+from .exceptions import InvalidFlanDataError
+
+@dataclass(slots=True)
 class FlanData:
     """Clean data structure - immutable and type-safe"""
     name: str
@@ -17,6 +19,12 @@ class FlanData:
     created_at: Optional[datetime] = None
     id: Optional[int] = None
     
+    # Columns for Flan.objects.values_list(*FlanData.VALUES_FIELDS), in from_row order
+    VALUES_FIELDS: ClassVar[Tuple[str, ...]] = (
+        'id', 'name', 'description', 'image_url', 'flan_type',
+        'is_premium', 'price', 'creator_id', 'created_at',
+    )
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization"""
         return {
@@ -42,10 +50,17 @@ class FlanData:
             flan_type=flan_model.flan_type,
             is_premium=flan_model.is_premium,
             price=flan_model.price,
-            creator_id=flan_model.creator.id,
+            creator_id=flan_model.creator_id,
             created_at=flan_model.created_at
         )
     
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'FlanData':
+        """Create FlanData from a VALUES_FIELDS tuple, with no model instance in between"""
+        id, name, description, image_url, flan_type, is_premium, price, creator_id, created_at = row
+        return cls(name, description, image_url, flan_type, is_premium, price,
+                   creator_id, created_at, id)
+    
     @property
     def display_price(self) -> str:
         """Formatted price for display"""
@@ -53,7 +68,7 @@ class FlanData:
             return f"${self.price:.2f}"
         return "FREE"
 
-@dataclass
+@dataclass(slots=True)
 class FlanCreateData:
     """Data structure for creating new flans (input validation)"""
     name: str
@@ -63,6 +78,30 @@ class FlanCreateData:
     is_premium: bool = False
     price: Decimal = Decimal('0.00')
     
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FlanCreateData':
+        """
+        Build from an API/import row, coercing price and is_premium.
+        Raises InvalidFlanDataError when they can't be parsed.
+        """
+        try:
+            price = Decimal(str(data.get('price') or '0.00'))
+        except InvalidOperation:
+            price = None
+        if price is None or not price.is_finite():
+            raise InvalidFlanDataError([f"Invalid price: {data.get('price')!r}"])
+        is_premium = data.get('is_premium', False)
+        if isinstance(is_premium, str):
+            is_premium = is_premium.strip().lower() in ('1', 'true', 'yes', 'on')
+        return cls(
+            name=str(data.get('name') or '').strip(),
+            description=str(data.get('description') or '').strip(),
+            image_url=str(data.get('image_url') or '').strip(),
+            flan_type=str(data.get('flan_type') or 'vanilla').strip(),
+            is_premium=bool(is_premium),
+            price=price,
+        )
+    
     def validate(self) -> List[str]:
         """Validate flan data before creation"""
         errors = []
@@ -76,7 +115,7 @@ class FlanCreateData:
             errors.append("Invalid flan type")
         return errors
 
-@dataclass
+@dataclass(slots=True)
 class SubscriberData:
     """Data structure for subscriber information"""
     email: str
@@ -88,6 +127,25 @@ class SubscriberData:
     subscribed_at: Optional[datetime] = None
     id: Optional[int] = None
     
+    # Columns for Subscriber.objects.values_list(*SubscriberData.VALUES_FIELDS), in from_row order
+    VALUES_FIELDS: ClassVar[Tuple[str, ...]] = (
+        'id', 'email', 'name', 'is_active', 'receive_weekly_digest',
+        'receive_new_flan_alerts', 'favorite_flan_type', 'subscribed_at',
+    )
+    
+    @property
+    def display_name(self) -> str:
+        """Same as Subscriber.display_name"""
+        return self.name or self.email.split('@')[0]
+    
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'SubscriberData':
+        """Create SubscriberData from a VALUES_FIELDS tuple"""
+        (id, email, name, is_active, receive_weekly_digest,
+         receive_new_flan_alerts, favorite_flan_type, subscribed_at) = row
+        return cls(email, name, is_active, receive_weekly_digest, receive_new_flan_alerts,
+                   favorite_flan_type, subscribed_at, id)
+    
     @classmethod
     def from_model(cls, subscriber_model) -> 'SubscriberData':
         return cls(
@@ -101,7 +159,53 @@ class SubscriberData:
             subscribed_at=subscriber_model.subscribed_at
         )
 
-@dataclass
+@dataclass(slots=True)
+class SubscriberImportResult:
+    """Outcome counts of a bulk subscriber import"""
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    invalid_samples: List[str] = field(default_factory=list)
+    
+    @property
+    def total(self) -> int:
+        return self.inserted + self.duplicates + self.invalid
+    
+    def to_dict(self) -> Dict:
+        return {
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'total': self.total,
+            'invalid_samples': self.invalid_samples,
+        }
+
+@dataclass(slots=True)
+class FlanBulkCreateResult:
+    """Outcome of FlanService.create_flans_bulk"""
+    created_ids: List[int] = field(default_factory=list)
+    # Input position -> validation errors for that item
+    errors: Dict[int, List[str]] = field(default_factory=dict)
+    
+    @property
+    def created(self) -> int:
+        return len(self.created_ids)
+    
+    @property
+    def invalid(self) -> int:
+        return len(self.errors)
+    
+    def to_dict(self) -> Dict:
+        return {
+            'created': self.created,
+            'invalid': self.invalid,
+            'created_ids': self.created_ids,
+            'errors': [
+                {'index': index, 'errors': errors} for index, errors in sorted(self.errors.items())
+            ],
+        }
+
+@dataclass(slots=True)
 class EmailTemplateData:
     """Data structure for email templates with validation"""
     template_name: str
@@ -120,7 +224,7 @@ class EmailTemplateData:
         required_keys = ['subscriber', 'site_url']
         return [key for key in required_keys if key not in self.context]
 
-@dataclass
+@dataclass(slots=True)
 class AnalyticsData:
     """Data structure for flan analytics and metrics"""
     flan_id: int
@@ -157,7 +261,32 @@ class AnalyticsData:
             'created_at': self.created_at.isoformat()
         }
 
-@dataclass
+@dataclass(slots=True)
+class CreatorStatsData:
+    """Aggregated numbers for a creator's page"""
+    creator_id: int
+    flan_count: int = 0
+    premium_count: int = 0
+    total_ratings: int = 0
+    avg_rating: float = 0.0
+    
+    @property
+    def premium_share(self) -> float:
+        """Percentage of the creator's flans that are premium"""
+        if self.flan_count == 0:
+            return 0.0
+        return round(self.premium_count / self.flan_count * 100, 1)
+    
+    def to_dict(self) -> Dict:
+        return {
+            'flan_count': self.flan_count,
+            'premium_count': self.premium_count,
+            'premium_share': self.premium_share,
+            'total_ratings': self.total_ratings,
+            'avg_rating': self.avg_rating,
+        }
+
+@dataclass(slots=True)
 class PaginatedResponse:
     """Generic paginated response structure"""
     data: List
@@ -165,6 +294,8 @@ class PaginatedResponse:
     page: int
     page_size: int
     total_pages: int
+    # True when total_count/total_pages come from an estimate (FLANS_COUNT_MODE)
+    total_count_is_estimate: bool = False
     
     @property
     def has_next(self) -> bool:
@@ -182,6 +313,7 @@ class PaginatedResponse:
                 'page': self.page,
                 'page_size': self.page_size,
                 'total_pages': self.total_pages,
+                'total_count_is_estimate': self.total_count_is_estimate,
                 'has_next': self.has_next,
                 'has_previous': self.has_previous
             }
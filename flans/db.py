@@ -0,0 +1,245 @@
+"""
+SQLite connection tuning and primary/replica routing.
+
+``apply_sqlite_pragmas`` runs on every new SQLite connection
+(``connection_created``, hooked up in FlansConfig.ready()) and applies
+``settings.FLANS_SQLITE_PRAGMAS``. With WAL, readers no longer wait for
+writers, and ``busy_timeout`` makes writers queue for the lock instead of
+failing straight away with "database is locked".
+
+``ReplicaRouter`` plus ``ReplicaMiddleware`` send reads marked with
+``replica_reads()`` to the aliases in ``settings.FLANS_REPLICA_ALIASES``
+(Postgres streaming replicas, or the ``readonly`` ``mode=ro`` connection in
+the SQLite profile, which can never take the write lock). Writes always go
+to ``default``, and a client that just wrote reads from ``default`` for a
+few seconds so it sees its own changes. Shared cache entries (values,
+template fragments, whole anonymous pages) are filled from ``default``:
+through ``get_or_compute``, ``primary_reads()`` or ``primary_queryset()``.
+"""
+import contextvars
+import random
+from contextlib import ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Union
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+
+READ_ONLY_ALIAS = 'readonly'
+
+PIN_COOKIE_NAME = 'flans_primary'
+PIN_COOKIE_SALT = 'flans.db.primary-pin'
+DEFAULT_PIN_SECONDS = 5
+
+# Tuned for a single-host WAL database; see settings_production.py
+DEFAULT_SQLITE_PRAGMAS: Dict[str, Union[str, int]] = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',        # durable at checkpoints; safe with WAL
+    'busy_timeout': 5000,           # ms to wait for a lock before "database is locked"
+    'cache_size': -64000,           # negative = KiB, i.e. 64 MB page cache
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+    'foreign_keys': 'on',
+}
+
+# journal_mode is stored in the database file, so it can't be set through a read-only connection
+_WRITE_ONLY_PRAGMAS = {'journal_mode'}
+
+
+def get_sqlite_pragmas() -> Dict[str, Union[str, int]]:
+    return getattr(settings, 'FLANS_SQLITE_PRAGMAS', {})
+
+
+def is_read_only_connection(connection) -> bool:
+    return 'mode=ro' in str(connection.settings_dict.get('NAME', ''))
+
+
+def pragma_statements(pragmas: Dict[str, Union[str, int]], read_only: bool = False) -> List[str]:
+    return [
+        f'PRAGMA {name} = {value}' for name, value in pragmas.items()
+        if not (read_only and name in _WRITE_ONLY_PRAGMAS)
+    ]
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs) -> None:
+    """connection_created receiver: apply FLANS_SQLITE_PRAGMAS to new SQLite connections."""
+    if connection.vendor != 'sqlite':
+        return
+    statements = pragma_statements(get_sqlite_pragmas(), is_read_only_connection(connection))
+    if not statements:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+@contextmanager
+def execute_wrapper_all(wrapper) -> Iterator[None]:
+    """``connection.execute_wrapper(wrapper)`` on every configured alias, replicas included."""
+    with ExitStack() as stack:
+        for alias in settings.DATABASES:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield
+
+
+@dataclass
+class _RequestState:
+    pinned: bool = False  # recent write by this client: read from the primary
+    wrote: bool = False   # a write was routed during this request
+
+
+_use_replica = contextvars.ContextVar('flans_use_replica', default=False)
+_request_state = contextvars.ContextVar('flans_db_request_state', default=None)
+
+
+def get_replica_aliases() -> List[str]:
+    aliases = getattr(settings, 'FLANS_REPLICA_ALIASES', [])
+    return [alias for alias in aliases if alias in settings.DATABASES]
+
+
+def choose_replica(replicas: List[str]) -> str:
+    return random.choice(replicas)
+
+
+def get_pin_seconds() -> int:
+    return getattr(settings, 'FLANS_PRIMARY_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """
+    Let ORM reads in this block go to a replica. Works as a decorator too
+    (``@replica_reads()``). Writes, and reads of a client pinned to the
+    primary, are unaffected.
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """
+    Send ORM reads in this block to the primary, even inside replica_reads().
+    For values other clients get to see, like shared cache entries: filled
+    from a lagging replica they'd bring back data an invalidation just dropped.
+    """
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_queryset(queryset):
+    """
+    ``queryset`` pinned to the database replica_reads() would read it from.
+    For results consumed lazily (generators), after the replica_reads() block
+    that created them has exited.
+    """
+    with replica_reads():
+        return queryset.using(queryset.db)
+
+
+def primary_queryset(queryset):
+    """
+    ``queryset`` pinned to the primary even if it's evaluated later inside
+    replica_reads(), e.g. lazily by a template while filling a cached fragment.
+    """
+    with primary_reads():
+        return queryset.using(queryset.db)
+
+
+class ReplicaRouter:
+    """
+    Writes go to ``default`` (the primary). Reads inside ``replica_reads()``
+    go to one of FLANS_REPLICA_ALIASES unless the current request is pinned
+    to the primary by ``ReplicaMiddleware``.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get():
+            return None
+        state = _request_state.get()
+        if state is not None and state.pinned:
+            return 'default'
+        replicas = get_replica_aliases()
+        return choose_replica(replicas) if replicas else None
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in getattr(settings, 'FLANS_REPLICA_ALIASES', [])
+
+
+@sync_and_async_middleware
+class ReplicaMiddleware:
+    """
+    Read-your-writes for replica reads. A request that writes gets a signed
+    cookie, and for FLANS_PRIMARY_PIN_SECONDS afterwards that client's reads
+    stay on the primary, so e.g. a fresh rating shows up on the next page
+    even if the replica lags. With FLANS_REPLICA_SAFE_METHODS, every GET/HEAD
+    request reads from a replica, not just the views marked replica_reads().
+    Runs natively under both WSGI and ASGI, so async views stay async.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _is_pinned(self, request) -> bool:
+        return request.get_signed_cookie(
+            PIN_COOKIE_NAME, default=None, salt=PIN_COOKIE_SALT, max_age=get_pin_seconds(),
+        ) is not None
+
+    def _reads(self, request):
+        if (request.method in self.SAFE_METHODS
+                and getattr(settings, 'FLANS_REPLICA_SAFE_METHODS', False)):
+            return replica_reads()
+        return nullcontext()
+
+    @staticmethod
+    def _pin_if_wrote(state: _RequestState, response):
+        if state.wrote:
+            response.set_signed_cookie(
+                PIN_COOKIE_NAME, '1', salt=PIN_COOKIE_SALT, max_age=get_pin_seconds(),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = _RequestState(pinned=self._is_pinned(request))
+        token = _request_state.set(state)
+        try:
+            with self._reads(request):
+                response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._pin_if_wrote(state, response)
+
+    async def __acall__(self, request):
+        state = _RequestState(pinned=self._is_pinned(request))
+        token = _request_state.set(state)
+        try:
+            with self._reads(request):
+                response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._pin_if_wrote(state, response)
@@ -2,13 +2,14 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
-from .models import Subscriber, EmailLog
+from .models import EmailLog
+from .services import SubscriberService
 
 
 def send_weekly_digest():
     """Send weekly flan digest to all active subscribers"""
-    subscribers = Subscriber.objects.filter(
-        is_active=True, receive_weekly_digest=True)
+    # Streamed: one chunk of subscribers in memory at a time
+    subscribers = SubscriberService.iter_subscribers_for_weekly_digest()
 
     # Get flan data for the email
     from .models import Flan
@@ -64,7 +65,7 @@ def send_weekly_digest():
 
             # Log the email
             EmailLog.objects.create(
-                subscriber=subscriber,
+                subscriber_id=subscriber.id,
                 subject=subject,
                 was_successful=True
             )
@@ -74,7 +75,7 @@ def send_weekly_digest():
         except Exception as e:
             print(f"❌ Failed to send to {subscriber.email}: {e}")
             EmailLog.objects.create(
-                subscriber=subscriber,
+                subscriber_id=subscriber.id,
                 subject=subject,
                 was_successful=False
             )
@@ -82,17 +83,12 @@ def send_weekly_digest():
 
 def send_new_flan_alert(flan):
     """Send alert about a new flan to interested subscribers"""
-    subscribers = Subscriber.objects.filter(
-        is_active=True,
-        receive_new_flan_alerts=True
-    )
+    # Streamed, and already limited to subscribers whose favorite type matches (or is unset)
+    subscribers = SubscriberService.iter_subscribers_for_new_flan_alert(flan.flan_type)
 
     subject = f"🍮 New Flan Alert: {flan.name}"
 
     for subscriber in subscribers:
-        if subscriber.favorite_flan_type and subscriber.favorite_flan_type != flan.flan_type:
-            continue
-
         try:
             context = {
                 'subscriber': subscriber,
@@ -116,7 +112,7 @@ def send_new_flan_alert(flan):
             email.send()
 
             EmailLog.objects.create(
-                subscriber=subscriber,
+                subscriber_id=subscriber.id,
                 subject=subject,
                 was_successful=True
             )
@@ -126,7 +122,7 @@ def send_new_flan_alert(flan):
         except Exception as e:
             print(f"❌ Failed to send alert to {subscriber.email}: {e}")
             EmailLog.objects.create(
-                subscriber=subscriber,
+                subscriber_id=subscriber.id,
                 subject=subject,
                 was_successful=False
             )
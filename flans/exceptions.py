@@ -49,3 +49,42 @@ class DuplicateSubscriberError(SubscriptionError):
 class AnalyticsServiceError(Exception):
     """Base exception for analytics service errors"""
     pass
+
+
+class ExportError(Exception):
+    """Base exception for data export errors"""
+    pass
+
+
+class UnknownExportResourceError(ExportError):
+    """Raised when an export is requested for a resource we don't export"""
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        super().__init__(f"Unknown export resource: {resource}")
+
+
+class InvalidExportSinceError(ExportError):
+    """Raised when the ?since= value of an export can't be parsed"""
+
+    def __init__(self, value: str):
+        self.value = value
+        super().__init__(
+            f"Invalid since value {value!r}, expected an ISO 8601 date or datetime")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor or sync token can't be decoded"""
+
+    def __init__(self, token: str):
+        self.token = token
+        super().__init__(f"Invalid cursor: {token!r}")
+
+
+class ThumbnailError(Exception):
+    """Raised when a source image can't be fetched, decoded or resized"""
+
+    def __init__(self, source: str, reason: str):
+        self.source = source
+        self.reason = reason
+        super().__init__(f"Can't build thumbnails for {source!r}: {reason}")
@@ -0,0 +1,64 @@
+"""
+Parsers for bulk imports.
+
+Uploaded files and management command inputs are read line by line and
+turned into dicts lazily, so imports never hold the whole file in memory.
+"""
+import csv
+import json
+from typing import Dict, Iterable, Iterator
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def guess_format(filename: str, default: str = 'csv') -> str:
+    """Pick the import format from a file name's extension."""
+    lowered = (filename or '').lower()
+    if lowered.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if lowered.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_ndjson_rows(lines: Iterable[str]) -> Iterator[Dict]:
+    """One JSON object per line. Lines that aren't JSON objects yield an empty dict."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {}
+
+
+def iter_csv_rows(lines: Iterable[str], key_column: str = 'email') -> Iterator[Dict]:
+    """
+    CSV with a header row. When the header has no ``key_column`` column the
+    file is treated as headerless and its first column as that key.
+    """
+    lines = iter(lines)
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    normalized = [column.strip().lower() for column in header]
+    if key_column not in normalized:
+        yield {key_column: header[0] if header else ''}
+        for values in reader:
+            if values:
+                yield {key_column: values[0]}
+        return
+
+    for values in reader:
+        if values:
+            yield dict(zip(normalized, values))
+
+
+def iter_rows(lines: Iterable[str], fmt: str, key_column: str = 'email') -> Iterator[Dict]:
+    if fmt == 'ndjson':
+        return iter_ndjson_rows(lines)
+    return iter_csv_rows(lines, key_column)
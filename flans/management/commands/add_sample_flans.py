@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from flans.models import Flan
+from flans.seeding import StepTimer, insert_missing, invalidate_seeded_caches
 
 
 class Command(BaseCommand):
@@ -204,25 +205,21 @@ class Command(BaseCommand):
             }
         ]
 
-        flans_created = 0
-        for flan_data in sample_flans:
-            flan, created = Flan.objects.get_or_create(
-                name=flan_data['name'],
-                defaults={
-                    'description': flan_data['description'],
-                    'image_url': flan_data['image_url'],
-                    'flan_type': flan_data['flan_type'],
-                    'is_premium': flan_data['is_premium'],
-                    'price': flan_data['price'],
-                    'creator': user
-                }
+        timer = StepTimer()
+        with timer.step('flans'):
+            _, created = insert_missing(
+                Flan, 'name', [{**flan_data, 'creator': user} for flan_data in sample_flans],
+                prepare=Flan.apply_price_rule,
             )
             if created:
-                flans_created += 1
+                invalidate_seeded_caches()
+        for flan_data in sample_flans:
+            if flan_data['name'] in created:
                 self.stdout.write(f"✅ Added: {flan_data['name']}")
             else:
                 self.stdout.write(f"⚠️ Already exists: {flan_data['name']}")
 
         self.stdout.write(self.style.SUCCESS(
-            f'\n🎉 Successfully created {flans_created} new flans!'))
+            f'\n🎉 Successfully created {len(created)} new flans!'))
         self.stdout.write(f'📊 Total flans in database: {Flan.objects.count()}')
+        self.stdout.write(f'⏱️  Timings:\n{timer.summary()}')
@@ -0,0 +1,96 @@
+"""
+Memory and throughput of building FlanData lists, the two ways:
+
+* model  - Flan.objects.select_related('creator') + FlanData.from_model
+           (what FlanService used to do)
+* row    - values_list(*FlanData.VALUES_FIELDS) + FlanData.from_row
+
+If the database has fewer than --rows flans, the missing ones are inserted
+inside a transaction that is rolled back afterwards; nothing is kept.
+
+Usage:
+    python manage.py bench_flan_data
+    python manage.py bench_flan_data --rows 20000 --repeat 5
+"""
+import gc
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from flans.datatypes import FlanData
+from flans.models import Flan
+
+INSERT_BATCH = 5000
+
+
+def build_from_models(limit: int):
+    return [FlanData.from_model(flan) for flan in Flan.objects.select_related('creator')[:limit]]
+
+
+def build_from_rows(limit: int):
+    return [FlanData.from_row(row) for row in Flan.objects.values_list(*FlanData.VALUES_FIELDS)[:limit]]
+
+
+STRATEGIES = (('model', build_from_models), ('row', build_from_rows))
+
+
+class Command(BaseCommand):
+    help = "Benchmark FlanData construction from models vs values_list rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per strategy (best is reported)')
+
+    def _fill(self, rows: int) -> int:
+        missing = rows - Flan.objects.count()
+        if missing <= 0:
+            return 0
+        user, _ = User.objects.get_or_create(username='bench-flan-data')
+        for start in range(0, missing, INSERT_BATCH):
+            Flan.objects.bulk_create(
+                Flan(name=f'Bench flan {i}', description='Benchmark row', creator=user,
+                     is_premium=i % 4 == 0, price=Decimal('4.50') if i % 4 == 0 else Decimal('0.00'))
+                for i in range(start, min(start + INSERT_BATCH, missing))
+            )
+        return missing
+
+    def _measure(self, build, rows: int, repeat: int):
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            result = build(rows)
+            timings.append(time.perf_counter() - started)
+            del result
+
+        # Separate run: tracemalloc slows allocation down
+        gc.collect()
+        tracemalloc.start()
+        result = build(rows)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        count = len(result)
+        del result
+        return count, min(timings), peak, retained
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        with transaction.atomic():
+            inserted = self._fill(rows)
+            if inserted:
+                self.stdout.write(f"(inserted {inserted:,} temporary flans)")
+
+            self.stdout.write(f"🍮 FlanData for {rows:,} flans, best of {repeat}\n")
+            self.stdout.write(
+                f"{'path':<7} {'rows':>8} {'seconds':>8} {'rows/s':>10} {'peak MB':>8} {'kept MB':>8}")
+            for label, build in STRATEGIES:
+                count, seconds, peak, retained = self._measure(build, rows, repeat)
+                self.stdout.write(
+                    f"{label:<7} {count:>8,} {seconds:>8.3f} {count / seconds if seconds else 0:>10,.0f} "
+                    f"{peak / 2 ** 20:>8.1f} {retained / 2 ** 20:>8.1f}")
+
+            transaction.set_rollback(True)
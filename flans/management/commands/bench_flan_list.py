@@ -0,0 +1,73 @@
+"""
+Render-time benchmark for the flan_list page.
+
+Compares a cold render (card grid fragment missing from the cache) with a
+warm one, at the default 9 cards per page and at larger page sizes.
+The page size is set through FLANS_LIST_PAGE_SIZE, and the anonymous page
+cache is off so every render actually goes through the view.
+
+Usage:
+    python manage.py bench_flan_list
+    python manage.py bench_flan_list --page-size 9 --page-size 60 --iterations 100
+"""
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from flans import views
+from flans.caching import bump_catalog_generation
+from flans.models import Flan
+
+
+class Command(BaseCommand):
+    help = "Benchmark flan_list render time with cold and warm fragment caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size', type=int, action='append', dest='page_sizes',
+            help='Cards per page (repeatable, default: 9 and 48)',
+        )
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def _render(self, factory: RequestFactory):
+        request = factory.get('/')
+        request.user = AnonymousUser()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            views.flan_list(request)
+        return (time.perf_counter() - started) * 1000, len(queries)
+
+    def handle(self, *args, **options):
+        page_sizes = options['page_sizes'] or [views.FLANS_PER_PAGE, 48]
+        iterations = options['iterations']
+        factory = RequestFactory()
+        total = Flan.objects.count()
+
+        self.stdout.write(f"🍮 {total} flans in the database, {iterations} renders per case\n")
+        self.stdout.write(f"{'per page':>8} {'cache':>6} {'mean ms':>9} {'p95 ms':>8} {'queries':>8}")
+
+        for page_size in page_sizes:
+            if page_size > total:
+                self.stdout.write(self.style.WARNING(
+                    f"  ⚠️ only {total} flans, page of {page_size} won't be full"))
+
+            with override_settings(FLANS_LIST_PAGE_SIZE=page_size, FLANS_ANONYMOUS_PAGE_CACHE=False):
+                for label, cold in (('cold', True), ('warm', False)):
+                    timings, query_counts = [], []
+                    self._render(factory)  # prime template loader and chrome fragments
+                    for _ in range(iterations):
+                        if cold:
+                            bump_catalog_generation()
+                        ms, count = self._render(factory)
+                        timings.append(ms)
+                        query_counts.append(count)
+
+                    p95 = sorted(timings)[int(0.95 * (len(timings) - 1))]
+                    self.stdout.write(
+                        f"{page_size:>8} {label:>6} {statistics.mean(timings):>9.2f} "
+                        f"{p95:>8.2f} {max(query_counts):>8}")
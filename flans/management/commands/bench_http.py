@@ -0,0 +1,126 @@
+"""
+Concurrent HTTP load benchmark for comparing sync and async endpoints.
+
+Start the app under an ASGI server first, then point this at it:
+
+    uvicorn onlyflans.asgi:application --port 8000
+    python manage.py bench_http /api/flans/ /api/async/flans/ --concurrency 500
+
+Each client keeps one HTTP/1.1 keep-alive connection open and sends
+requests back to back, so the numbers reflect server-side concurrency
+rather than connection setup.
+"""
+import asyncio
+import statistics
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+
+    length: Optional[int] = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value.strip())
+        elif name == 'transfer-encoding' and 'chunked' in value.lower():
+            chunked = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(host: str, port: int, path: str, deadline_count: List[int],
+                  latencies: List[float], errors: List[int]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+    try:
+        while deadline_count[0] > 0:
+            deadline_count[0] -= 1
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors[0] += 1
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        errors[0] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(base_url: str, path: str, concurrency: int,
+                   total_requests: int) -> Tuple[float, List[float], int]:
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    remaining = [total_requests]
+    latencies: List[float] = []
+    errors = [0]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, path, remaining, latencies, errors)
+        for _ in range(concurrency)
+    ), return_exceptions=True)
+    return time.perf_counter() - started, latencies, errors[0]
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent-request throughput and latency against a running server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Paths to benchmark, e.g. /api/flans/')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=5000,
+                            help='Total requests per path (default: 5000)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"🏎️  {options['concurrency']} concurrent clients, "
+            f"{options['requests']} requests per path against {options['base_url']}\n")
+        self.stdout.write(
+            f"{'path':<32} {'req/s':>9} {'mean ms':>9} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+        for path in options['paths']:
+            elapsed, latencies, errors = asyncio.run(run_load(
+                options['base_url'], path,
+                options['concurrency'], options['requests'],
+            ))
+            ms = [latency * 1000 for latency in latencies]
+            self.stdout.write(
+                f"{path:<32} {len(latencies) / elapsed:>9.1f} "
+                f"{(statistics.mean(ms) if ms else 0):>9.1f} "
+                f"{percentile(ms, 50):>8.1f} {percentile(ms, 95):>8.1f} "
+                f"{percentile(ms, 99):>8.1f} {errors:>7}")
@@ -0,0 +1,148 @@
+"""
+Concurrent read/write benchmark for the SQLite profiles.
+
+Copies the database to a temporary file, then runs reader threads
+(the flan_list page queries) against writer threads (single-row updates)
+for a fixed time, once with SQLite defaults (rollback journal, no pragmas)
+and once with the production profile (WAL + FLANS pragmas, read-only reader
+connections, BEGIN IMMEDIATE writers). The real database is never touched.
+
+Usage:
+    python manage.py bench_sqlite
+    python manage.py bench_sqlite --readers 16 --writers 4 --duration 10
+"""
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from flans.db import DEFAULT_SQLITE_PRAGMAS, pragma_statements
+
+READ_QUERIES = (
+    "SELECT id, name, price, is_premium FROM flans_flan ORDER BY created_at DESC LIMIT 9",
+    "SELECT COUNT(*) FROM flans_flan",
+)
+WRITE_QUERY = "UPDATE flans_flan SET updated_at = ? WHERE id = ?"
+
+
+@dataclass
+class Stats:
+    read_ms: List[float] = field(default_factory=list)
+    write_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _p95(values: List[float]) -> float:
+    return sorted(values)[int(0.95 * (len(values) - 1))] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent reads/writes with default vs tuned SQLite settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per profile')
+
+    def _connect(self, path: Path, tuned: bool, read_only: bool) -> sqlite3.Connection:
+        if tuned and read_only:
+            conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, isolation_level=None,
+                                   check_same_thread=False)
+        else:
+            # Django's default: 5 second busy wait
+            conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        if tuned:
+            for statement in pragma_statements(DEFAULT_SQLITE_PRAGMAS, read_only):
+                conn.execute(statement)
+        return conn
+
+    def _reader(self, path, tuned, deadline, stats):
+        conn = self._connect(path, tuned, read_only=True)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                for query in READ_QUERIES:
+                    conn.execute(query).fetchall()
+            except sqlite3.OperationalError:
+                with stats.lock:
+                    stats.errors += 1
+                continue
+            with stats.lock:
+                stats.read_ms.append((time.perf_counter() - started) * 1000)
+        conn.close()
+
+    def _writer(self, path, tuned, deadline, stats, flan_ids):
+        conn = self._connect(path, tuned, read_only=False)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.execute('BEGIN IMMEDIATE' if tuned else 'BEGIN')
+                conn.execute(WRITE_QUERY, (timezone.now().isoformat(), random.choice(flan_ids)))
+                conn.execute('COMMIT')
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                with stats.lock:
+                    stats.errors += 1
+                continue
+            with stats.lock:
+                stats.write_ms.append((time.perf_counter() - started) * 1000)
+        conn.close()
+
+    def _run(self, path: Path, tuned: bool, options) -> Stats:
+        setup = sqlite3.connect(path)
+        setup.execute(f"PRAGMA journal_mode = {'wal' if tuned else 'delete'}")
+        flan_ids = [row[0] for row in setup.execute("SELECT id FROM flans_flan")]
+        setup.close()
+        if not flan_ids:
+            raise CommandError("No flans to benchmark against; run seed_flans first")
+
+        stats = Stats()
+        deadline = time.perf_counter() + options['duration']
+        threads = [
+            threading.Thread(target=self._reader, args=(path, tuned, deadline, stats))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=self._writer, args=(path, tuned, deadline, stats, flan_ids))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES['default']['NAME']
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("bench_sqlite only runs against a SQLite default database")
+
+        duration = options['duration']
+        self.stdout.write(
+            f"🍮 {options['readers']} readers + {options['writers']} writers, {duration:g}s per profile\n")
+        self.stdout.write(
+            f"{'profile':<9} {'reads/s':>9} {'read p95':>9} {'writes/s':>9} {'write p95':>10} {'errors':>7}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for label, tuned in (('default', False), ('tuned', True)):
+                path = Path(tmp) / f'{label}.sqlite3'
+                # backup() gives a consistent copy even if the source is in use
+                src, dst = sqlite3.connect(source), sqlite3.connect(path)
+                src.backup(dst)
+                src.close()
+                dst.close()
+
+                stats = self._run(path, tuned, options)
+                self.stdout.write(
+                    f"{label:<9} {len(stats.read_ms) / duration:>9.0f} {_p95(stats.read_ms):>7.2f}ms "
+                    f"{len(stats.write_ms) / duration:>9.0f} {_p95(stats.write_ms):>8.2f}ms "
+                    f"{stats.errors:>7}")
@@ -0,0 +1,77 @@
+"""
+Cold vs warm first-request latency for the main HTML pages.
+
+"Cold" empties the template loader caches before each request, like the
+first request a fresh worker serves; "warm" runs after warm_templates().
+Data caches are primed before measuring and the anonymous page cache is
+off, so every request renders and the difference is template compile time. Run it with the production settings to measure the cached
+loader the way it is deployed:
+
+Usage:
+    DJANGO_SETTINGS_MODULE=onlyflans.settings_production python manage.py bench_templates
+    python manage.py bench_templates --iterations 50
+"""
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.autoreload import reset_loaders
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import resolve, reverse
+
+from flans.models import Flan, FlanCreator
+from flans.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = "Benchmark first-request latency with cold and warm template caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def _pages(self):
+        pages = [reverse('flan-list'), reverse('creators-list'), reverse('faq')]
+        flan = Flan.objects.order_by('id').first()
+        if flan:
+            pages.append(reverse('flan-detail', args=[flan.id]))
+        creator = FlanCreator.objects.order_by('id').first()
+        if creator:
+            pages.append(reverse('creator-detail', args=[creator.id]))
+        return pages
+
+    def _request(self, factory: RequestFactory, path: str) -> float:
+        request = factory.get(path)
+        request.user = AnonymousUser()
+        match = resolve(path)
+        started = time.perf_counter()
+        match.func(request, *match.args, **match.kwargs)
+        return (time.perf_counter() - started) * 1000
+
+    @override_settings(FLANS_ANONYMOUS_PAGE_CACHE=False)
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        factory = RequestFactory()
+        pages = self._pages()
+
+        for path in pages:
+            self._request(factory, path)  # prime data caches
+
+        self.stdout.write(f"🍮 {iterations} requests per page and case\n")
+        self.stdout.write(f"{'page':<24} {'cold ms':>9} {'warm ms':>9} {'saved':>7}")
+
+        for path in pages:
+            cold = []
+            for _ in range(iterations):
+                reset_loaders()
+                cold.append(self._request(factory, path))
+
+            reset_loaders()
+            warm_templates()
+            warm = [self._request(factory, path) for _ in range(iterations)]
+
+            cold_ms, warm_ms = statistics.median(cold), statistics.median(warm)
+            self.stdout.write(
+                f"{path:<24} {cold_ms:>9.2f} {warm_ms:>9.2f} "
+                f"{(1 - warm_ms / cold_ms) * 100 if cold_ms else 0:>6.0f}%")
@@ -0,0 +1,63 @@
+"""
+Stream a full (or incremental) export of flans, ratings or subscribers.
+
+Usage:
+    python manage.py export_data flans > flans.ndjson
+    python manage.py export_data ratings --format csv --output ratings.csv
+    python manage.py export_data flans --since 2026-01-01
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from flans.exceptions import ExportError
+from flans.exports import EXPORTS, EXPORT_FORMATS, parse_since, stream_export
+from flans.pagination import KEYSET_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Export flans, ratings or subscribers as NDJSON or CSV in constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format',
+            choices=sorted(EXPORT_FORMATS),
+            default='ndjson',
+            help='Output format (default: ndjson)',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only export rows changed since this ISO date/datetime',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write to this file instead of stdout',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=KEYSET_BATCH_SIZE,
+            help=f'Rows fetched per query (default: {KEYSET_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since'])
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        lines = stream_export(
+            options['resource'],
+            options['format'],
+            since=since,
+            batch_size=options['batch_size'],
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as fh:
+                for line in lines:
+                    fh.write(line)
+            self.stderr.write(self.style.SUCCESS(
+                f"✅ Exported {options['resource']} to {options['output']}"))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
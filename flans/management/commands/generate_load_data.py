@@ -0,0 +1,316 @@
+"""
+Generate a production-sized dataset for performance work.
+
+Everything is derived from --seed: the same seed and counts give the same
+rows, whatever the number of --workers. Popularity is skewed the way real
+traffic is: flan ratings and creator output follow a Zipf distribution
+(--skew), so a handful of flans go viral and most creators have a long
+tail of one or two recipes.
+
+Rows are generated in chunks (in parallel with --workers, each chunk from
+its own seeded RNG) and written by this process with batched executemany
+inserts, one transaction per table. Like bulk_create, this skips save()
+and signals; the catalog caches are invalidated and ANALYZE is run at the
+end. Usernames and emails carry the seed, so a second run needs a
+different --seed.
+
+Usage:
+    python manage.py generate_load_data
+    python manage.py generate_load_data --flans 1000000 --ratings 10000000 --workers 8
+    python manage.py generate_load_data --seed 2 --users 1000 --flans 5000 --ratings 50000
+"""
+import itertools
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from flans.caching import bump_catalog_generation
+from flans.counting import rebuild_flan_group_counts
+from flans.models import EmailLog, Flan, FlanCreator, FlanRating, Subscriber
+
+CHUNK_SIZE = 20_000
+INSERT_BATCH = 5000
+
+FIRST_NAMES = ('Ana', 'Bruno', 'Carmen', 'Diego', 'Elena', 'Fátima', 'Gustavo', 'Helena', 'Iris',
+               'João', 'Lucía', 'Mateo', 'Nina', 'Otávio', 'Paula', 'Rosa', 'Sofía', 'Tomás')
+LAST_NAMES = ('Almeida', 'Barbosa', 'Castro', 'Duarte', 'Flores', 'García', 'Lima', 'Moreno',
+              'Nunes', 'Ortiz', 'Pereira', 'Ramos', 'Santos', 'Torres', 'Vargas')
+FLAN_WORDS = ('Caramel', 'Vanilla', 'Burnt', 'Silky', 'Grandma', 'Midnight', 'Tropical',
+              'Espresso', 'Coconut', 'Dulce', 'Golden', 'Wobbly', 'Royal', 'Smoky')
+REVIEWS = ('Perfect jiggle.', 'Too sweet for me.', 'Better than my abuela\'s. Don\'t tell her.',
+           'Caramel was burnt, in a good way.', 'Made it twice this week.', 'Needs more vanilla.')
+EMAIL_SUBJECTS = ('🍮 Your weekly flan digest', '🆕 A new flan just dropped', 'Welcome to OnlyFlans!')
+
+# Weights, most likely first
+CREATOR_TYPES = (('amateur', 70), ('influencer', 15), ('chef', 10), ('grandma', 5))
+FLAN_TYPES = (('vanilla', 35), ('chocolate', 25), ('coconut', 15), ('coffee', 15), ('special', 10))
+FAVORITE_TYPES = (('', 50), *FLAN_TYPES)
+SCORES = ((5, 40), (4, 35), (3, 15), (2, 6), (1, 4))
+
+# Filled in by _init_worker(): shared by every chunk, sent to each worker once
+_context: Dict = {}
+
+
+def zipf_weights(n: int, skew: float) -> List[float]:
+    """Cumulative Zipf weights: rank ``i`` is picked in proportion to 1 / (i + 1) ** skew."""
+    return list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+
+
+def rating_counts(flans: int, users: int, ratings: int, skew: float) -> List[int]:
+    """
+    Ratings per flan rank, summing to ``ratings`` (or to flans * users if
+    that is smaller). Each flan is capped at ``users`` ratings, since a user
+    rates a flan once; what the cap cuts from viral flans goes to the tail.
+    """
+    ratings = min(ratings, flans * users)
+    if not flans:
+        return []
+    weights = [1 / (rank + 1) ** skew for rank in range(flans)]
+    total = sum(weights)
+    counts = [min(users, int(ratings * weight / total)) for weight in weights]
+    deficit = ratings - sum(counts)
+    while deficit > 0:
+        open_ranks = [rank for rank, count in enumerate(counts) if count < users]
+        share, extra = divmod(deficit, len(open_ranks))
+        for position, rank in enumerate(open_ranks):
+            added = min(users - counts[rank], share + (position < extra))
+            counts[rank] += added
+            deficit -= added
+    return counts
+
+
+def _weighted(rng: random.Random, choices: Sequence[Tuple[object, int]]):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _timestamp(rng: random.Random) -> str:
+    """A moment in the last ``days`` days as 'YYYY-MM-DD HH:MM:SS' UTC, which every backend accepts."""
+    day, seconds = divmod(rng.randrange(_context['days'] * 86400), 86400)
+    minutes, second = divmod(seconds, 60)
+    return f"{_context['dates'][day]} {minutes // 60:02d}:{minutes % 60:02d}:{second:02d}"
+
+
+def _build_users(rng, start, stop):
+    prefix = _context['prefix']
+    for n in range(start, stop):
+        joined = _timestamp(rng)
+        yield (f'{prefix}-user-{n}', '!', '', '', f'{prefix}-user-{n}@load.example',
+               False, False, True, joined)
+
+
+def _build_creators(rng, start, stop):
+    for n in range(start, stop):
+        updated = _timestamp(rng)
+        # Pareto earnings: most creators make little, a few make a lot
+        earnings = Decimal(min(99_999_999, 50 * rng.paretovariate(1.2))).quantize(Decimal('0.01'))
+        followers = int(100 * rng.paretovariate(0.9))
+        yield (f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} #{n}',
+               _weighted(rng, CREATOR_TYPES), 'Generated load-test creator.', '', '',
+               updated[:10], updated, rng.random() < 0.01, str(earnings),
+               rng.randint(60, 100), f'{followers:,}')
+
+
+def _build_flans(rng, start, stop):
+    user_ids, creator_ids = _context['user_ids'], _context['creator_ids']
+    creator_weights = _context['creator_weights']
+    for n in range(start, stop):
+        created = _timestamp(rng)
+        is_premium = rng.random() < 0.3
+        price = f'{rng.randint(199, 1999) / 100:.2f}' if is_premium else '0.00'
+        creator = rng.choices(creator_ids, cum_weights=creator_weights)[0] if creator_ids else None
+        yield (f'{rng.choice(FLAN_WORDS)} {rng.choice(FLAN_WORDS)} Flan #{n}',
+               'Generated load-test flan.', '', '', _weighted(rng, FLAN_TYPES), is_premium, price,
+               rng.choice(user_ids), creator, created, created)
+
+
+def _build_ratings(rng, start, stop):
+    """Ratings of the flans ranked ``start`` to ``stop``, each from distinct users."""
+    user_ids, flan_ids, counts = _context['user_ids'], _context['flan_ids'], _context['rating_counts']
+    scores, score_weights = zip(*SCORES)
+    for rank in range(start, stop):
+        count = counts[rank]
+        if not count:
+            continue
+        flan_id = flan_ids[rank]
+        for score, user_index in zip(rng.choices(scores, weights=score_weights, k=count),
+                                     sorted(rng.sample(range(len(user_ids)), count))):
+            created = _timestamp(rng)
+            review = rng.choice(REVIEWS) if rng.random() < 0.1 else ''
+            yield (flan_id, user_ids[user_index], score, review, created, created)
+
+
+def _build_subscribers(rng, start, stop):
+    prefix = _context['prefix']
+    for n in range(start, stop):
+        yield (f'{prefix}-subscriber-{n}@load.example', rng.choice(FIRST_NAMES), rng.random() < 0.9,
+               _timestamp(rng), rng.random() < 0.8, rng.random() < 0.6, _weighted(rng, FAVORITE_TYPES))
+
+
+def _build_email_logs(rng, start, stop):
+    subscriber_ids = _context['subscriber_ids']
+    for _ in range(start, stop):
+        yield (rng.choice(subscriber_ids), rng.choice(EMAIL_SUBJECTS), _timestamp(rng), rng.random() < 0.97)
+
+
+# table -> (model, inserted fields, row builder)
+TABLES = {
+    'users': (User, ('username', 'password', 'first_name', 'last_name', 'email', 'is_superuser',
+                     'is_staff', 'is_active', 'date_joined'), _build_users),
+    'creators': (FlanCreator, ('name', 'creator_type', 'bio', 'profile_image', 'profile_image_hash',
+                               'join_date', 'updated_at', 'is_featured', 'total_earnings',
+                               'satisfaction_rate', 'instagram_followers'), _build_creators),
+    'flans': (Flan, ('name', 'description', 'image_url', 'image_hash', 'flan_type', 'is_premium', 'price',
+                     'creator', 'featured_creator', 'created_at', 'updated_at'), _build_flans),
+    'ratings': (FlanRating, ('flan', 'user', 'score', 'review', 'created_at', 'updated_at'), _build_ratings),
+    'subscribers': (Subscriber, ('email', 'name', 'is_active', 'subscribed_at', 'receive_weekly_digest',
+                                 'receive_new_flan_alerts', 'favorite_flan_type'), _build_subscribers),
+    'email_logs': (EmailLog, ('subscriber', 'subject', 'sent_at', 'was_successful'), _build_email_logs),
+}
+
+
+def _init_worker(context: Dict) -> None:
+    _context.clear()
+    _context.update(context)
+    # Formatting dates is the slowest part of a row; do each day once
+    last_day = context['last_day']
+    _context['dates'] = [str(last_day - timedelta(days=day)) for day in range(context['days'])]
+
+
+def build_chunk(task: Tuple[str, int, int]) -> List[tuple]:
+    """Rows ``start`` to ``stop`` of ``table``; the RNG depends only on the seed and the chunk."""
+    table, start, stop = task
+    rng = random.Random(f"{_context['seed']}:{table}:{start}")
+    return list(TABLES[table][2](rng, start, stop))
+
+
+def chunk_tasks(table: str, total: int, chunk_size: int = CHUNK_SIZE) -> List[Tuple[str, int, int]]:
+    return [(table, start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+
+def rating_tasks(counts: Sequence[int], chunk_size: int = CHUNK_SIZE) -> List[Tuple[str, int, int]]:
+    """Ranges of flan ranks holding about ``chunk_size`` ratings each (viral flans get small ranges)."""
+    tasks, start, rows = [], 0, 0
+    for rank, count in enumerate(counts):
+        rows += count
+        if rows >= chunk_size:
+            tasks.append(('ratings', start, rank + 1))
+            start, rows = rank + 1, 0
+    if start < len(counts):
+        tasks.append(('ratings', start, len(counts)))
+    return tasks
+
+
+def generate_chunks(tasks: List[Tuple[str, int, int]], context: Dict, workers: int) -> Iterator[List[tuple]]:
+    """Chunks in task order, built here or by a pool of ``workers`` processes."""
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(context)
+        yield from map(build_chunk, tasks)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(context,)) as pool:
+        yield from pool.imap(build_chunk, tasks)
+
+
+def insert_rows(model, fields: Sequence[str], rows: List[tuple]) -> None:
+    columns = [model._meta.get_field(name).column for name in fields]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(model._meta.db_table),
+        ', '.join(map(connection.ops.quote_name, columns)),
+        ', '.join(['%s'] * len(columns)),
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), INSERT_BATCH):
+            cursor.executemany(sql, rows[start:start + INSERT_BATCH])
+
+
+class Command(BaseCommand):
+    help = "Generate a large, skewed, reproducible dataset for load and query-plan testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--creators', type=int, default=10_000)
+        parser.add_argument('--flans', type=int, default=1_000_000)
+        parser.add_argument('--ratings', type=int, default=10_000_000)
+        parser.add_argument('--subscribers', type=int, default=500_000)
+        parser.add_argument('--email-logs', type=int, default=2_000_000)
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent for popularity')
+        parser.add_argument('--days', type=int, default=365, help='Spread timestamps over this many days')
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating rows')
+
+    def _ids(self, queryset) -> List[int]:
+        return list(queryset.order_by('id').values_list('id', flat=True))
+
+    def _load(self, table: str, tasks: List[Tuple[str, int, int]], context: Dict, workers: int) -> None:
+        model, fields, _ = TABLES[table]
+        started = time.perf_counter()
+        inserted = 0
+        with transaction.atomic():
+            for rows in generate_chunks(tasks, context, workers):
+                insert_rows(model, fields, rows)
+                inserted += len(rows)
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"{table:<12} {inserted:>12,} {seconds:>8.1f}s {inserted / seconds if seconds else 0:>12,.0f}/s")
+
+    def handle(self, *args, **options):
+        seed, workers = options['seed'], options['workers']
+        prefix = f'load{seed}'
+        if options['users'] < 1 and (options['flans'] or options['ratings']):
+            raise CommandError("Flans and ratings need at least one user")
+        if options['email_logs'] and options['subscribers'] < 1:
+            raise CommandError("Email logs need at least one subscriber")
+        if User.objects.filter(username__startswith=f'{prefix}-user-').exists():
+            raise CommandError(f"Load data for seed {seed} already exists; pass a different --seed")
+
+        # Timestamps fall in the --days days up to yesterday (UTC), so none are in the future
+        today = datetime.now(dt_timezone.utc).date()
+        context = {
+            'seed': seed, 'prefix': prefix,
+            'days': max(1, options['days']), 'last_day': today - timedelta(days=1),
+        }
+        overall = time.perf_counter()
+        self.stdout.write(f"🍮 Generating load data (seed {seed}, {workers} worker(s))\n")
+        self.stdout.write(f"{'table':<12} {'rows':>12} {'time':>9} {'rate':>13}")
+
+        self._load('users', chunk_tasks('users', options['users']), context, workers)
+        context['user_ids'] = self._ids(User.objects.filter(username__startswith=f'{prefix}-user-'))
+
+        first_creator = FlanCreator.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self._load('creators', chunk_tasks('creators', options['creators']), context, workers)
+        creator_ids = self._ids(FlanCreator.objects.filter(id__gt=first_creator))
+        # Shuffled so the prolific creators aren't simply the oldest rows
+        random.Random(f'{seed}:creator-ranks').shuffle(creator_ids)
+        context['creator_ids'] = creator_ids
+        context['creator_weights'] = zipf_weights(len(creator_ids), options['skew'])
+
+        first_flan = Flan.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self._load('flans', chunk_tasks('flans', options['flans']), context, workers)
+        flan_ids = self._ids(Flan.objects.filter(id__gt=first_flan))
+        random.Random(f'{seed}:flan-ranks').shuffle(flan_ids)
+        context['flan_ids'] = flan_ids
+        context['rating_counts'] = rating_counts(
+            len(flan_ids), len(context['user_ids']), options['ratings'], options['skew'])
+        del context['creator_ids'], context['creator_weights']
+
+        self._load('ratings', rating_tasks(context['rating_counts']), context, workers)
+        del context['flan_ids'], context['rating_counts'], context['user_ids']
+
+        self._load('subscribers', chunk_tasks('subscribers', options['subscribers']), context, workers)
+        context['subscriber_ids'] = self._ids(
+            Subscriber.objects.filter(email__startswith=f'{prefix}-subscriber-'))
+        self._load('email_logs', chunk_tasks('email_logs', options['email_logs']), context, workers)
+
+        bump_catalog_generation()
+        rebuild_flan_group_counts()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Done in {time.perf_counter() - overall:.1f}s"))
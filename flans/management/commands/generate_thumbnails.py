@@ -0,0 +1,105 @@
+"""
+Backfill local thumbnails for flan and creator pictures.
+
+Fetching and resizing run in a thread pool (both release the GIL); hashes
+are written back from the main thread in batches with bulk_update, so the
+worker threads never touch the database. Updated rows get a new updated_at,
+so cached pages and their ETags pick up the new <picture> markup.
+
+Only public http(s) pictures are fetched unless --allow-local-files is
+given, which also reads file:// URLs and local paths.
+
+Usage:
+    python manage.py generate_thumbnails
+    python manage.py generate_thumbnails --model flans --workers 16 --force
+    python manage.py generate_thumbnails --allow-local-files
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from flans import thumbnails
+from flans.caching import bump_catalog_generation, invalidate_flan
+from flans.exceptions import ThumbnailError
+from flans.models import Flan, FlanCreator
+
+MODELS = {'flans': Flan, 'creators': FlanCreator}
+UPDATE_BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = "Generate WebP/JPEG thumbnails for flan and creator pictures"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=[*MODELS, 'all'], default='all')
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild rows that already have a thumbnail hash')
+        parser.add_argument('--allow-local-files', action='store_true',
+                            help='Also read file:// URLs and local paths')
+
+    def handle(self, *args, **options):
+        if not thumbnails.is_available():
+            raise CommandError("Pillow is required: pip install Pillow")
+
+        models = MODELS.values() if options['model'] == 'all' else [MODELS[options['model']]]
+        for model in models:
+            self._backfill(model, options['workers'], options['force'], options['allow_local_files'])
+
+    @staticmethod
+    def _build(source: str, allow_local: bool) -> str:
+        return thumbnails.build_thumbnails(thumbnails.fetch_source(source, allow_local), source)
+
+    def _backfill(self, model, workers: int, force: bool, allow_local: bool) -> None:
+        source_field, hash_field = thumbnails.IMAGE_FIELDS[model.__name__]
+        queryset = model.objects.exclude(**{source_field: ''})
+        if not force:
+            queryset = queryset.filter(**{hash_field: ''})
+        instances = list(queryset.only('id', source_field, hash_field))
+
+        # Rows sharing a picture are fetched and resized once
+        by_source = defaultdict(list)
+        for obj in instances:
+            by_source[getattr(obj, source_field)].append(obj)
+
+        self.stdout.write(
+            f"🖼️  {model._meta.verbose_name_plural}: {len(instances)} to process, "
+            f"{len(by_source)} distinct pictures")
+        changed, failed = [], 0
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self._build, source, allow_local): source for source in by_source}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    digest = future.result()
+                except ThumbnailError as e:
+                    failed += len(by_source[source])
+                    self.stdout.write(self.style.WARNING(f"  ⚠️ {source}: {e.reason}"))
+                    continue
+
+                for obj in by_source[source]:
+                    if getattr(obj, hash_field) != digest:
+                        setattr(obj, hash_field, digest)
+                        changed.append(obj)
+
+        # bulk_update leaves auto_now fields alone, so set updated_at by hand
+        now = timezone.now()
+        for obj in changed:
+            obj.updated_at = now
+        with transaction.atomic():
+            model.objects.bulk_update(changed, [hash_field, 'updated_at'], batch_size=UPDATE_BATCH_SIZE)
+
+        # bulk_update doesn't send post_save, so invalidate explicitly
+        if changed:
+            if model is Flan:
+                for obj in changed:
+                    invalidate_flan(obj.pk)
+            bump_catalog_generation()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"  ✅ {len(changed)} updated, {len(instances) - len(changed) - failed} unchanged, "
+            f"{failed} failed"))
@@ -0,0 +1,57 @@
+"""
+Bulk-import newsletter subscribers from a CSV or NDJSON file.
+
+Usage:
+    python manage.py import_subscribers partners.csv
+    python manage.py import_subscribers partners.ndjson
+    cat partners.csv | python manage.py import_subscribers - --format csv
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flans.importers import IMPORT_FORMATS, guess_format, iter_rows
+from flans.services import SubscriberService
+
+
+class Command(BaseCommand):
+    help = "Bulk-import subscribers from CSV (with an 'email' column) or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='Input format (default: from the file extension, else csv)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SubscriberService.IMPORT_BATCH_SIZE,
+            help=f'Rows per INSERT (default: {SubscriberService.IMPORT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        started = time.perf_counter()
+
+        if path == '-':
+            result = SubscriberService.import_subscribers(
+                iter_rows(sys.stdin, fmt), batch_size=options['batch_size'])
+        else:
+            try:
+                with open(path, encoding='utf-8-sig', errors='replace', newline='') as fh:
+                    result = SubscriberService.import_subscribers(
+                        iter_rows(fh, fmt), batch_size=options['batch_size'])
+            except OSError as e:
+                raise CommandError(f"Can't read {path}: {e}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported in {elapsed:.1f}s: {result.inserted} inserted, "
+            f"{result.duplicates} duplicates, {result.invalid} invalid"
+        ))
+        for sample in result.invalid_samples:
+            self.stdout.write(self.style.WARNING(f"  ⚠️ invalid: {sample!r}"))
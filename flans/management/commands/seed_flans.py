@@ -1,14 +1,20 @@
 """
 Management command to seed OnlyFlans with glorious flan data.
 
+Only rows whose name (or email) isn't in the database yet are inserted,
+in bulk, and the whole seed runs in one transaction, so re-running it is
+cheap and safe.
+
 Usage:
     python manage.py seed_flans
     python manage.py seed_flans --clear   # limpa tudo antes de seeder
 """
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.db import transaction
 from decimal import Decimal
 from flans.models import Flan, FlanCreator, Subscriber
+from flans.seeding import StepTimer, clear_catalog, insert_missing, invalidate_seeded_caches
 
 
 CREATORS = [
@@ -258,68 +264,66 @@ class Command(BaseCommand):
             help='Clear existing data before seeding',
         )
 
-    def handle(self, *args, **options):
-        if options['clear']:
-            self.stdout.write("🗑️  Clearing existing data...")
-            Flan.objects.all().delete()
-            FlanCreator.objects.all().delete()
-            Subscriber.objects.all().delete()
-            self.stdout.write(self.style.WARNING("Cleared!"))
+    def _report(self, title, ids, created, label=str):
+        self.stdout.write(f"\n{title}")
+        created = set(created)
+        for key in ids:
+            icon = "✨" if key in created else "⏭️ "
+            self.stdout.write(f"  {icon} {label(key)}")
 
-        # Create admin user if needed
-        admin, created = User.objects.get_or_create(
-            username='admin',
-            defaults={'email': 'admin@onlyflans.com',
-                      'is_staff': True, 'is_superuser': True}
-        )
-        if created:
-            admin.set_password('flanpassword123')
-            admin.save()
-            self.stdout.write(self.style.SUCCESS(
-                "👤 Admin user created (admin / flanpassword123)"))
+    def handle(self, *args, **options):
+        timer = StepTimer()
+        # All or nothing: a failed seed leaves the database as it was
+        with transaction.atomic():
+            if options['clear']:
+                self.stdout.write("🗑️  Clearing existing data...")
+                with timer.step('clear'):
+                    clear_catalog()
+                self.stdout.write(self.style.WARNING("Cleared!"))
 
-        # Seed creators
-        self.stdout.write("\n🍳 Creating creators...")
-        creator_map = {}
-        for data in CREATORS:
-            creator, created = FlanCreator.objects.get_or_create(
-                name=data['name'],
-                defaults={k: v for k, v in data.items() if k != 'name'}
-            )
-            creator_map[creator.name] = creator
-            icon = "✨" if created else "⏭️ "
-            self.stdout.write(f"  {icon} {creator.name}")
+            # Create admin user if needed
+            with timer.step('admin'):
+                admin, created = User.objects.get_or_create(
+                    username='admin',
+                    defaults={'email': 'admin@onlyflans.com',
+                              'is_staff': True, 'is_superuser': True}
+                )
+                if created:
+                    admin.set_password('flanpassword123')
+                    admin.save()
+            if created:
+                self.stdout.write(self.style.SUCCESS(
+                    "👤 Admin user created (admin / flanpassword123)"))
 
-        # Seed flans
-        self.stdout.write("\n🍮 Creating flans...")
-        for data in FLANS:
-            creator_name = data.pop('creator_name')
-            creator = creator_map.get(creator_name)
+            with timer.step('creators'):
+                creator_ids, new_creators = insert_missing(FlanCreator, 'name', CREATORS)
+            self._report("🍳 Creating creators...", [data['name'] for data in CREATORS], new_creators)
 
-            flan, created = Flan.objects.get_or_create(
-                name=data['name'],
-                defaults={
-                    **data,
+            flan_rows = [
+                {
+                    **{k: v for k, v in data.items() if k != 'creator_name'},
                     'creator': admin,
-                    'featured_creator': creator,
+                    'featured_creator_id': creator_ids.get(data['creator_name']),
                 }
-            )
-            icon = "✨" if created else "⏭️ "
-            premium = "💎" if flan.is_premium else "🆓"
-            self.stdout.write(f"  {icon} {premium} {flan.name}")
+                for data in FLANS
+            ]
+            with timer.step('flans'):
+                _, new_flans = insert_missing(Flan, 'name', flan_rows, prepare=Flan.apply_price_rule)
+            premium = {data['name']: data['is_premium'] for data in FLANS}
+            self._report("🍮 Creating flans...", [data['name'] for data in FLANS], new_flans,
+                         label=lambda name: f"{'💎' if premium[name] else '🆓'} {name}")
 
-            # Restore for next iteration
-            data['creator_name'] = creator_name
+            with timer.step('subscribers'):
+                _, new_subscribers = insert_missing(Subscriber, 'email', SUBSCRIBERS)
+            self._report("📧 Creating subscribers...", [data['email'] for data in SUBSCRIBERS], new_subscribers)
 
-        # Seed subscribers
-        self.stdout.write("\n📧 Creating subscribers...")
-        for data in SUBSCRIBERS:
-            sub, created = Subscriber.objects.get_or_create(
-                email=data['email'],
-                defaults=data
+            # bulk_create skips the Flan signals
+            new_flan_names = set(new_flans)
+            invalidate_seeded_caches(
+                [creator_ids[data['creator_name']] for data in FLANS
+                 if data['name'] in new_flan_names and data['creator_name'] in creator_ids],
+                recount=bool(new_flans),
             )
-            icon = "✨" if created else "⏭️ "
-            self.stdout.write(f"  {icon} {sub.email}")
 
         # Summary
         self.stdout.write("\n" + "="*50)
@@ -328,6 +332,7 @@ class Command(BaseCommand):
             f"{FlanCreator.objects.count()} creators, "
             f"{Subscriber.objects.count()} subscribers"
         ))
+        self.stdout.write(f"⏱️  Timings:\n{timer.summary()}")
         self.stdout.write("🚀 Run: python manage.py runserver")
         self.stdout.write(
             "🔑 Admin: http://localhost:8000/admin (admin / flanpassword123)")
@@ -0,0 +1,82 @@
+"""
+Per-page HTML size with the CSS inlined (before) vs linked (after), plus
+raw/gzip/brotli sizes of the stylesheets themselves.
+
+"Before" is reconstructed by inlining each linked stylesheet back into the
+rendered page, which is what the templates did before the CSS moved to
+flans/static. Pages are rendered with the anonymous page cache off.
+
+Usage:
+    python manage.py static_size_report
+"""
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import resolve, reverse
+
+from flans.models import Flan, FlanCreator
+from flans.storage import compress_gzip, get_encoders
+
+STYLESHEET_LINK = re.compile(r'<link rel="stylesheet" href="[^"]*?/static/(?P<path>[^"]+?\.css)" />')
+
+
+def _unhashed(path: str) -> str:
+    # flans/css/list.3f2a91c0d4e5.css -> flans/css/list.css
+    return re.sub(r'\.[0-9a-f]{12}(\.css)$', r'\1', path)
+
+
+def _read_static(path: str) -> str:
+    with open(finders.find(_unhashed(path)), encoding='utf-8') as f:
+        return f.read()
+
+
+class Command(BaseCommand):
+    help = "Report per-page HTML bytes before/after extracting inline CSS"
+
+    def _pages(self):
+        pages = [reverse('flan-list'), reverse('creators-list'), reverse('faq')]
+        flan = Flan.objects.order_by('id').first()
+        if flan:
+            pages.append(reverse('flan-detail', args=[flan.id]))
+        creator = FlanCreator.objects.order_by('id').first()
+        if creator:
+            pages.append(reverse('creator-detail', args=[creator.id]))
+        return pages
+
+    def _render(self, factory: RequestFactory, path: str) -> str:
+        request = factory.get(path)
+        request.user = AnonymousUser()
+        match = resolve(path)
+        return match.func(request, *match.args, **match.kwargs).content.decode()
+
+    @override_settings(FLANS_ANONYMOUS_PAGE_CACHE=False)
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        stylesheets = set()
+
+        self.stdout.write("🍮 HTML bytes per page (gzip in brackets)\n")
+        self.stdout.write(f"{'page':<24} {'before':>16} {'after':>16} {'saved':>7}")
+        for path in self._pages():
+            after = self._render(factory, path)
+            stylesheets.update(m.group('path') for m in STYLESHEET_LINK.finditer(after))
+            before = STYLESHEET_LINK.sub(
+                lambda m: f"<style>\n{_read_static(m.group('path'))}</style>", after)
+
+            before_bytes, after_bytes = before.encode(), after.encode()
+            self.stdout.write(
+                f"{path:<24} "
+                f"{len(before_bytes):>7} [{len(compress_gzip(before_bytes)):>6}] "
+                f"{len(after_bytes):>7} [{len(compress_gzip(after_bytes)):>6}] "
+                f"{(1 - len(after_bytes) / len(before_bytes)) * 100:>6.0f}%")
+
+        encoders = get_encoders()
+        self.stdout.write("\nStylesheets (fetched once, then cached)\n")
+        self.stdout.write(f"{'file':<28} {'raw':>7} " + ' '.join(f"{e:>7}" for e, _, _ in encoders))
+        for path in sorted(stylesheets):
+            data = _read_static(path).encode()
+            sizes = ' '.join(f"{len(compress(data)):>7}" for _, _, compress in encoders)
+            self.stdout.write(f"{_unhashed(path):<28} {len(data):>7} {sizes}")
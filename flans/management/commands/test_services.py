@@ -11,11 +11,15 @@ class Command(BaseCommand):
         self.stdout.write('🧪 Testing Service Classes...')
 
         # Test FlanService
-        flans = FlanService.get_all_flans()
-        self.stdout.write(f'📊 Found {len(flans)} flans')
-
-        if flans:
-            first_flan = flans[0]
+        # Streamed, so this stays cheap on a big catalog
+        first_flan = None
+        flan_count = 0
+        for flan in FlanService.iter_all_flans():
+            first_flan = first_flan or flan
+            flan_count += 1
+        self.stdout.write(f'📊 Found {flan_count} flans')
+
+        if first_flan:
             self.stdout.write(f'🍮 First flan: {first_flan.name}')
             self.stdout.write(f'💰 Price: {first_flan.display_price}')
 
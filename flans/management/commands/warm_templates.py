@@ -0,0 +1,23 @@
+"""
+Pre-compile every template under flans/templates.
+
+Only useful with the cached template loader (onlyflans.settings_production),
+where compiled templates are kept for the life of the process.
+
+Usage:
+    python manage.py warm_templates
+"""
+from django.core.management.base import BaseCommand
+
+from flans.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = "Compile all flans templates into the template loader cache"
+
+    def handle(self, *args, **options):
+        timings = warm_templates()
+        for name, ms in timings.items():
+            self.stdout.write(f"  {ms:>8.2f} ms  {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Warmed {len(timings)} templates in {sum(timings.values()):.1f} ms"))
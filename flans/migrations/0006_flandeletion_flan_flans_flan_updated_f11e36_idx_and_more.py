@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0005_remove_flancreator_total_flans_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlanDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flan_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Flan Deletion',
+                'verbose_name_plural': 'Flan Deletions',
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='flan',
+            index=models.Index(fields=['updated_at', 'id'], name='flans_flan_updated_f11e36_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flandeletion',
+            index=models.Index(fields=['deleted_at', 'id'], name='flans_fland_deleted_90473c_idx'),
+        ),
+    ]
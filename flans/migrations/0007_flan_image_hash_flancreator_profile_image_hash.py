@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0006_flandeletion_flan_flans_flan_updated_f11e36_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flan',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='flancreator',
+            name='profile_image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+    ]
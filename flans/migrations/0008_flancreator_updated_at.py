@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0007_flan_image_hash_flancreator_profile_image_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flancreator',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
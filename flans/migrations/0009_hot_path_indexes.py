@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0008_flancreator_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flan',
+            index=models.Index(fields=['featured_creator', '-created_at', '-id'], name='flans_flan_feature_18d303_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flan',
+            index=models.Index(fields=['is_premium', 'price'], name='flans_flan_is_prem_f26546_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flancreator',
+            index=models.Index(fields=['-is_featured', '-total_earnings'], name='flans_flanc_is_feat_48e60d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flancreator',
+            index=models.Index(fields=['updated_at'], name='flans_flanc_updated_c2a950_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['is_active', '-subscribed_at'], name='flans_subsc_is_acti_7dfb90_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(condition=models.Q(('receive_weekly_digest', True)), fields=['is_active', '-subscribed_at'], name='subscriber_digest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(condition=models.Q(('receive_new_flan_alerts', True)), fields=['is_active', '-subscribed_at'], name='subscriber_alerts_idx'),
+        ),
+    ]
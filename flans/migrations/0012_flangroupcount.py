@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:33
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_flans(apps, schema_editor):
+    Flan = apps.get_model('flans', 'Flan')
+    FlanGroupCount = apps.get_model('flans', 'FlanGroupCount')
+    FlanGroupCount.objects.bulk_create(
+        FlanGroupCount(flan_type=row['flan_type'], is_premium=row['is_premium'], total=row['total'])
+        for row in Flan.objects.order_by().values('flan_type', 'is_premium').annotate(total=Count('id'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0011_subscriber_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlanGroupCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flan_type', models.CharField(choices=[('vanilla', 'Vanilla Classic'), ('chocolate', 'Chocolate Dream'), ('coconut', 'Coconut Paradise'), ('coffee', 'Coffee Delight'), ('special', "Chef's Special")], max_length=20)),
+                ('is_premium', models.BooleanField()),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Flan Group Count',
+                'verbose_name_plural': 'Flan Group Counts',
+                'unique_together': {('flan_type', 'is_premium')},
+            },
+        ),
+        migrations.RunPython(count_existing_flans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0012_flangroupcount'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='subscriber',
+            name='flans_subsc_is_acti_7dfb90_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='subscriber',
+            name='subscriber_digest_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='subscriber',
+            name='subscriber_alerts_idx',
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['is_active'], name='subscriber_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(condition=models.Q(('is_active', True), ('receive_weekly_digest', True)), fields=['-subscribed_at'], name='subscriber_digest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(condition=models.Q(('is_active', True), ('receive_new_flan_alerts', True)), fields=['-subscribed_at'], name='subscriber_alerts_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0013_subscriber_audience_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flan',
+            index=models.Index(fields=['flan_type', '-created_at'], name='flans_flan_flan_ty_4ad9dd_idx'),
+        ),
+    ]
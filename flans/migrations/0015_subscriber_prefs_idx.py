@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flans', '0014_flan_type_created_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='subscriber',
+            name='subscriber_active_idx',
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['is_active', 'receive_weekly_digest', 'receive_new_flan_alerts'], name='subscriber_prefs_idx'),
+        ),
+    ]
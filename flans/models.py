@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from decimal import Decimal
 
 
@@ -23,7 +25,10 @@ class FlanCreator(models.Model):
     )
     bio = models.TextField(help_text="Hilarious creator biography")
     profile_image = models.URLField(max_length=500, blank=True)
+    # Content hash of the local thumbnails built from profile_image (see thumbnails)
+    profile_image_hash = models.CharField(max_length=40, blank=True, editable=False)
     join_date = models.DateField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_featured = models.BooleanField(default=False)
 
     # Fake stats for comedy
@@ -47,6 +52,12 @@ class FlanCreator(models.Model):
         ordering = ['-is_featured', '-total_earnings']
         verbose_name = 'Flan Creator'
         verbose_name_plural = 'Flan Creators'
+        indexes = [
+            # Matches the default ordering, so listings walk the index instead of sorting
+            models.Index(fields=['-is_featured', '-total_earnings']),
+            # Page cache validator for the creators list (newest updated_at)
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.get_creator_type_display()})"
@@ -64,7 +75,10 @@ class FlanCreator(models.Model):
         """
         Calculated from actual DB relations — never stale.
         FIX: was a fake IntegerField that could get out of sync.
+        Uses the ``flans_count`` annotation when the queryset provides one.
         """
+        if hasattr(self, 'flans_count'):
+            return self.flans_count
         return self.flans.count()
 
     def get_flans_count_display(self) -> str:
@@ -91,6 +105,8 @@ class Flan(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
     image_url = models.URLField(max_length=500, blank=True)
+    # Content hash of the local thumbnails built from image_url (see thumbnails)
+    image_hash = models.CharField(max_length=40, blank=True, editable=False)
 
     # Categorization & Pricing
     flan_type = models.CharField(
@@ -131,6 +147,14 @@ class Flan(models.Model):
         indexes = [
             models.Index(fields=['flan_type', 'is_premium']),
             models.Index(fields=['created_at']),
+            # List pages filtered by ?type=, newest first, without a sort
+            models.Index(fields=['flan_type', '-created_at']),
+            # Delta sync walks flans in (updated_at, id) order
+            models.Index(fields=['updated_at', 'id']),
+            # Creator pages: keyset pages of one creator's flans, newest first
+            models.Index(fields=['featured_creator', '-created_at', '-id']),
+            # Revenue stats: SUM/AVG(price) over premium flans, answered from the index
+            models.Index(fields=['is_premium', 'price']),
         ]
 
     def __str__(self) -> str:
@@ -148,12 +172,56 @@ class Flan(models.Model):
             return self.description[:100] + '...'
         return self.description
 
-    def save(self, *args, **kwargs):
+    def apply_price_rule(self) -> None:
+        """Free flans cost nothing. Also applied by bulk inserts, which skip save()."""
         if not self.is_premium:
             self.price = Decimal('0.00')
+
+    def save(self, *args, **kwargs):
+        self.apply_price_rule()
         super().save(*args, **kwargs)
 
 
+class FlanDeletion(models.Model):
+    """
+    Tombstone left behind when a flan is deleted, so delta-sync clients
+    can drop it from their local mirror.
+    """
+    flan_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Flan Deletion'
+        verbose_name_plural = 'Flan Deletions'
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id']),
+        ]
+
+    def __str__(self) -> str:
+        return f"Flan {self.flan_id} deleted at {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class FlanGroupCount(models.Model):
+    """
+    Number of flans per (flan_type, is_premium), kept current by the Flan
+    signals with F() increments so listings can estimate totals without a
+    GROUP BY. Bulk writes that skip the signals rebuild it (see ``counting``).
+    """
+    flan_type = models.CharField(max_length=20, choices=Flan.FlanType.choices)
+    is_premium = models.BooleanField()
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Flan Group Count'
+        verbose_name_plural = 'Flan Group Counts'
+        unique_together = [['flan_type', 'is_premium']]
+
+    def __str__(self) -> str:
+        tier = 'premium' if self.is_premium else 'free'
+        return f"{self.get_flan_type_display()} ({tier}): {self.total}"
+
+
 class Subscriber(models.Model):
     """
     Represents a user subscribed to flan email updates.
@@ -174,6 +242,27 @@ class Subscriber(models.Model):
         verbose_name = 'Subscriber'
         verbose_name_plural = 'Subscribers'
         ordering = ['-subscribed_at']
+        indexes = [
+            # Case-insensitive duplicate checks on import
+            models.Index(Lower('email'), name='subscriber_email_lower_idx'),
+            # Active and opt-in counts read this (covering) instead of the table
+            models.Index(
+                fields=['is_active', 'receive_weekly_digest', 'receive_new_flan_alerts'],
+                name='subscriber_prefs_idx',
+            ),
+            # Email audiences: exactly the active opted-in rows, already in
+            # mailing (Meta.ordering) order, so no filtering or sort is left
+            models.Index(
+                fields=['-subscribed_at'],
+                condition=models.Q(is_active=True, receive_weekly_digest=True),
+                name='subscriber_digest_idx',
+            ),
+            models.Index(
+                fields=['-subscribed_at'],
+                condition=models.Q(is_active=True, receive_new_flan_alerts=True),
+                name='subscriber_alerts_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         status = "Active" if self.is_active else "Inactive"
@@ -232,7 +321,8 @@ class FlanRating(models.Model):
         blank=True,
         help_text="Optional written review"
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: the write-behind buffer stores the time the rating was submitted
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
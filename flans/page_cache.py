@@ -0,0 +1,193 @@
+"""
+Full-page cache and conditional GET for anonymous HTML views.
+
+``anonymous_page_cache(last_modified)`` wraps a view so that visitors
+without a session or messages cookie get:
+
+* ``ETag``/``Last-Modified`` validators derived from the ``updated_at`` of
+  the rows the page shows (one query), answered with a 304 and
+  no render when the browser or a proxy already has the page;
+* otherwise the rendered HTML from the cache, keyed by path and validator,
+  so a row change produces a new key and stale pages simply age out.
+
+Requests with a session cookie may carry auth or flash messages, so they
+(and anything that isn't a plain GET/HEAD) always go to the view.
+CSRF tokens in cached HTML are swapped for the current visitor's token.
+Turned off with ``FLANS_ANONYMOUS_PAGE_CACHE = False``.
+"""
+import hashlib
+import re
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, OuterRef, Subquery
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .db import primary_reads
+from .models import Flan, FlanCreator, FlanDeletion, FlanRating
+
+PAGE_CACHE_TIMEOUT = 10 * 60  # seconds; keys change with the data, so this only bounds memory
+
+CSRF_INPUT = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = '__flans_csrf_token__'
+
+_markup_version: Optional[str] = None
+
+
+def get_markup_version() -> str:
+    """
+    Hash of everything besides the data that shapes a page: the flans
+    templates and the hashed static names. A deploy changing either gets
+    new ETags instead of 304s for old markup.
+    """
+    global _markup_version
+    if _markup_version is None:
+        from django.template.loader import get_template
+        from .static_views import get_hashed_names
+        from .warmup import get_template_names
+
+        digest = hashlib.sha1()
+        for name in get_template_names():
+            digest.update(get_template(name).template.source.encode())
+        digest.update(','.join(sorted(get_hashed_names())).encode())
+        _markup_version = digest.hexdigest()[:12]
+    return _markup_version
+
+
+def _latest(*moments: Optional[datetime]) -> Optional[datetime]:
+    moments = [moment for moment in moments if moment is not None]
+    return max(moments) if moments else None
+
+
+def _newest(queryset, field: str) -> Subquery:
+    """Newest ``field`` value of ``queryset`` as a subquery (an index seek, not a scan)."""
+    return Subquery(queryset.order_by(f'-{field}').values(field)[:1])
+
+
+def _last_deletion() -> Subquery:
+    return _newest(FlanDeletion.objects.all(), 'deleted_at')
+
+
+# Validators: newest updated_at among the rows each page renders, one query each
+
+def flan_list_last_modified(request: HttpRequest) -> Optional[datetime]:
+    # Over every flan, not just the ?type= ones: a flan moving to another
+    # type leaves this page without matching its filter any more
+    row = Flan.objects.order_by('-updated_at').annotate(
+        latest_deletion=_last_deletion(),
+    ).values_list('updated_at', 'latest_deletion').first()
+    if row is None:
+        return FlanDeletion.objects.aggregate(deleted=Max('deleted_at'))['deleted']
+    return _latest(*row)
+
+
+def flan_detail_last_modified(request: HttpRequest, flan_id: int) -> Optional[datetime]:
+    row = Flan.objects.filter(id=flan_id).annotate(
+        latest_rating=_newest(FlanRating.objects.filter(flan=OuterRef('pk')), 'updated_at'),
+    ).values_list('updated_at', 'latest_rating').first()
+    return _latest(*row) if row else None
+
+
+def creators_list_last_modified(request: HttpRequest) -> Optional[datetime]:
+    # Newest creator row with the other validators attached: an index seek, not an aggregate
+    row = FlanCreator.objects.order_by('-updated_at').annotate(
+        latest_flan=_newest(Flan.objects.all(), 'updated_at'),
+        latest_deletion=_last_deletion(),
+    ).values_list('updated_at', 'latest_flan', 'latest_deletion').first()
+    return _latest(*row) if row else None
+
+
+def creator_detail_last_modified(request: HttpRequest, creator_id: int) -> Optional[datetime]:
+    row = FlanCreator.objects.filter(id=creator_id).annotate(
+        latest_flan=_newest(Flan.objects.filter(featured_creator=OuterRef('pk')), 'updated_at'),
+        latest_rating=_newest(
+            FlanRating.objects.filter(flan__featured_creator=OuterRef('pk')), 'updated_at'),
+        latest_deletion=_last_deletion(),
+    ).values_list('updated_at', 'latest_flan', 'latest_rating', 'latest_deletion').first()
+    return _latest(*row) if row else None
+
+
+def is_cacheable_request(request: HttpRequest) -> bool:
+    if not getattr(settings, 'FLANS_ANONYMOUS_PAGE_CACHE', True):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    cookies = request.COOKIES
+    return (
+        settings.SESSION_COOKIE_NAME not in cookies
+        and getattr(settings, 'MESSAGE_COOKIE_NAME', 'messages') not in cookies
+    )
+
+
+def page_cache_key(request: HttpRequest, etag: str) -> str:
+    path = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+    version = etag.strip('"')
+    return f'flans:page:{path}:{version}'
+
+
+def _set_validators(response: HttpResponse, etag: str, last_modified: datetime,
+                    has_csrf_token: bool) -> HttpResponse:
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Always revalidate; pages with a per-visitor CSRF token must not be shared
+    patch_cache_control(response, max_age=0, must_revalidate=True,
+                        **({'private': True} if has_csrf_token else {'public': True}))
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def anonymous_page_cache(last_modified: Callable[..., Optional[datetime]],
+                         timeout: int = PAGE_CACHE_TIMEOUT):
+    """Cache a view's HTML for anonymous visitors and answer conditional GETs (see module docs)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            modified = last_modified(request, *args, **kwargs)
+            if modified is None:
+                # Nothing to validate against (e.g. a missing row): let the view answer
+                return view(request, *args, **kwargs)
+            etag = quote_etag(hashlib.sha1(
+                f'{get_markup_version()}:{request.get_full_path()}:{modified}'.encode()
+            ).hexdigest()[:32])
+
+            not_modified = get_conditional_response(
+                request, etag=etag,
+                last_modified=int(modified.timestamp()),
+            )
+            if not_modified is not None:
+                return not_modified
+
+            key = page_cache_key(request, etag)
+            content = cache.get(key)
+            if content is not None:
+                has_token = CSRF_PLACEHOLDER in content
+                if has_token:
+                    content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+                response = HttpResponse(content)
+                return _set_validators(response, etag, modified, has_token)
+
+            # Every anonymous visitor gets this render: read it from the primary
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            # Only plain successful renders: no flash messages, no cookies of their own
+            messages = getattr(request, '_messages', None)
+            if (response.status_code != 200 or response.streaming or response.cookies
+                    or getattr(messages, 'added_new', False)):
+                return response
+
+            content = response.content.decode(response.charset)
+            template, replaced = CSRF_INPUT.subn(rf'\g<1>{CSRF_PLACEHOLDER}\g<2>', content)
+            cache.set(key, template, timeout)
+            return _set_validators(response, etag, modified, bool(replaced))
+
+        return wrapper
+    return decorator
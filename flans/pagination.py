@@ -0,0 +1,151 @@
+"""
+Pagination helpers that don't depend on OFFSET or COUNT(*).
+
+Keyset ("seek") iteration walks a table in primary-key order with
+``pk > last_seen`` queries, so every batch costs the same no matter how
+deep into the table we are and only one batch is held in memory.
+``CountingPaginator`` keeps page-number pagination but takes its total
+from the counting strategies in ``counting``.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+from .counting import CountResult, count_queryset, format_count
+from .exceptions import InvalidCursorError
+
+KEYSET_BATCH_SIZE = 2000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _row_pk(row: Any) -> Any:
+    """Primary key of a model instance, a values() dict or a values_list() tuple."""
+    if isinstance(row, dict):
+        return row['pk'] if 'pk' in row else row['id']
+    if isinstance(row, tuple):
+        return row[0]
+    return row.pk
+
+
+def iter_keyset(queryset: QuerySet, batch_size: int = KEYSET_BATCH_SIZE) -> Iterator[Any]:
+    """
+    Yield every row of ``queryset`` in primary-key order, one batch at a time.
+
+    Works with model, ``values()`` and ``values_list()`` querysets.
+    values() rows must include ``id`` (or ``pk``); values_list() rows must
+    start with the primary key.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+
+        yield from batch
+
+        if len(batch) < batch_size:
+            return
+        last_pk = _row_pk(batch[-1])
+
+
+def encode_cursor(moment: datetime, *keys: int) -> str:
+    """
+    Opaque, URL-safe cursor for a (timestamp, key, ...) position.
+    Cursors sort the same way as the positions they encode.
+    """
+    micros = (moment - _EPOCH) // timedelta(microseconds=1)
+    return '.'.join(str(part) for part in (micros, *keys))
+
+
+def decode_cursor(token: str, num_keys: int = 1) -> Tuple:
+    """Inverse of ``encode_cursor``: returns (datetime, key, ...)."""
+    parts = token.split('.')
+    if len(parts) != num_keys + 1:
+        raise InvalidCursorError(token)
+    try:
+        micros, *keys = (int(part) for part in parts)
+    except ValueError:
+        raise InvalidCursorError(token)
+    return (_EPOCH + timedelta(microseconds=micros), *keys)
+
+
+@dataclass
+class KeysetPage:
+    """One page of a newest-first keyset listing."""
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def keyset_page(queryset: QuerySet, cursor: Optional[str], page_size: int,
+                time_field: str = 'created_at') -> KeysetPage:
+    """
+    Newest-first page of ``queryset`` ordered by (time_field, id), starting
+    after ``cursor``. Page N costs the same as page 1, unlike OFFSET.
+    Raises InvalidCursorError for malformed cursors.
+    """
+    queryset = queryset.order_by(f'-{time_field}', '-id')
+    if cursor:
+        moment, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{time_field}__lt': moment}) | Q(**{time_field: moment, 'id__lt': pk}))
+
+    rows = list(queryset[:page_size + 1])
+    page = KeysetPage(items=rows[:page_size])
+    if len(rows) > page_size:
+        last = page.items[-1]
+        page.next_cursor = encode_cursor(getattr(last, time_field), last.pk)
+    return page
+
+
+class CountingPaginator(Paginator):
+    """
+    Paginator whose total comes from ``count_queryset`` (see FLANS_COUNT_MODE).
+
+    With an estimated total, ``num_pages`` is approximate too: pages near the
+    estimated end may come back short or empty instead of raising EmptyPage.
+    Works as ``ModelAdmin.paginator`` (same positional signature as Paginator).
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 *args, count_mode: Optional[str] = None, estimate=None,
+                 counter: Optional[Callable[[Callable[[], CountResult]], CountResult]] = None, **kwargs):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page, *args, **kwargs)
+        self.count_mode = count_mode
+        self.estimate = estimate
+        self.counter = counter
+
+    def count_object_list(self) -> CountResult:
+        if not isinstance(self.object_list, QuerySet):
+            return CountResult(len(self.object_list))
+        return count_queryset(self.object_list, self.count_mode, self.estimate)
+
+    @cached_property
+    def count_result(self) -> CountResult:
+        # ``counter(count)`` can wrap the count, e.g. in a cache lookup
+        if self.counter is not None:
+            return self.counter(self.count_object_list)
+        return self.count_object_list()
+
+    @cached_property
+    def count(self) -> int:
+        return self.count_result.value
+
+    @property
+    def count_is_estimate(self) -> bool:
+        return self.count_result.is_estimate
+
+    @property
+    def count_display(self) -> str:
+        return format_count(self.count_result)
@@ -0,0 +1,279 @@
+"""
+Sampled request-level SQL profiling.
+
+With ``FLANS_SQL_PROFILING`` on, ``SQLProfilingMiddleware`` profiles a
+``FLANS_SQL_PROFILING_SAMPLE_RATE`` fraction of requests. For each sampled
+request it times every query and records:
+
+* request time, DB time and query count per URL name;
+* the time of each query under its fingerprint (the SQL with literals,
+  placeholders and IN-lists collapsed, so ``id = 3`` and ``id = 7`` match).
+
+The last 1000 samples of each are kept in process memory, and
+``/api/profiling/`` (staff only) reports their p50/p95/p99. Queries
+slower than ``FLANS_SLOW_QUERY_MS``, and requests slower than
+``FLANS_SLOW_REQUEST_MS`` with their slowest statements, go to the
+``flans.slow_queries`` logger.
+
+Unsampled requests cost one random() call. Stats are per process: with
+several workers, each one reports its own. The middleware runs natively
+under WSGI and ASGI, so profiling doesn't push async views onto threads.
+"""
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Deque, Dict, List, Optional, Sequence
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+from django.utils.decorators import sync_and_async_middleware
+
+from .db import execute_wrapper_all
+
+slow_query_logger = logging.getLogger('flans.slow_queries')
+
+DEFAULT_SAMPLE_RATE = 0.05
+DEFAULT_WINDOW = 1000            # samples kept per URL name / fingerprint
+DEFAULT_SLOW_QUERY_MS = 100
+DEFAULT_SLOW_REQUEST_MS = 500
+MAX_FINGERPRINTS = 500           # least recently seen fingerprints are dropped beyond this
+SLOWEST_PER_REQUEST = 5
+LOGGED_SQL_CHARS = 500
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_VALUES_ROWS = re.compile(r'VALUES\s*\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))*', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with literals and placeholders replaced by ``?`` and lists by ``(...)``."""
+    sql = _STRING.sub('?', sql.replace('%s', '?'))
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    sql = _VALUES_ROWS.sub('VALUES (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class RollingStats:
+    """The last ``window`` samples of one measurement, plus an all-time count."""
+
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        samples = list(self.samples)
+        return {
+            'count': self.count,
+            'p50': round(percentile(samples, 50), 2),
+            'p95': round(percentile(samples, 95), 2),
+            'p99': round(percentile(samples, 99), 2),
+            'max': round(max(samples, default=0.0), 2),
+        }
+
+
+@dataclass
+class QueryTiming:
+    sql: str
+    ms: float
+
+    @cached_property
+    def fingerprint(self) -> str:
+        return fingerprint(self.sql)
+
+
+@dataclass
+class RequestProfile:
+    url_name: str
+    queries: List[QueryTiming] = field(default_factory=list)
+    total_ms: float = 0.0
+
+    @property
+    def db_ms(self) -> float:
+        return sum(query.ms for query in self.queries)
+
+    def slowest(self, n: int = SLOWEST_PER_REQUEST) -> List[QueryTiming]:
+        return sorted(self.queries, key=lambda query: query.ms, reverse=True)[:n]
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper hook: time the statement."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(QueryTiming(sql, (time.perf_counter() - started) * 1000))
+
+
+class ProfileStore:
+    """Rolling per-URL and per-fingerprint stats for this process."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, max_fingerprints: int = MAX_FINGERPRINTS):
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.request_ms: Dict[str, RollingStats] = {}
+            self.db_ms: Dict[str, RollingStats] = {}
+            self.query_counts: Dict[str, RollingStats] = {}
+            self.query_ms: 'OrderedDict[str, RollingStats]' = OrderedDict()
+            self.query_sql: Dict[str, str] = {}
+
+    def _stats(self, table: Dict[str, RollingStats], key: str) -> RollingStats:
+        if key not in table:
+            table[key] = RollingStats(self.window)
+        return table[key]
+
+    def record(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._stats(self.request_ms, profile.url_name).add(profile.total_ms)
+            self._stats(self.db_ms, profile.url_name).add(profile.db_ms)
+            self._stats(self.query_counts, profile.url_name).add(len(profile.queries))
+            for query in profile.queries:
+                key = query.fingerprint
+                self._stats(self.query_ms, key).add(query.ms)
+                self.query_ms.move_to_end(key)
+                self.query_sql.setdefault(key, normalize_sql(query.sql)[:LOGGED_SQL_CHARS])
+            while len(self.query_ms) > self.max_fingerprints:
+                dropped, _ = self.query_ms.popitem(last=False)
+                self.query_sql.pop(dropped, None)
+
+    def snapshot(self, limit: int = 50) -> Dict:
+        """URL and query stats, slowest p95 first."""
+        with self._lock:
+            urls = [
+                {
+                    'url_name': url_name,
+                    'request_ms': stats.summary(),
+                    'db_ms': self.db_ms[url_name].summary(),
+                    'queries': self.query_counts[url_name].summary(),
+                }
+                for url_name, stats in self.request_ms.items()
+            ]
+            queries = [
+                {'fingerprint': key, 'sql': self.query_sql[key], 'ms': stats.summary()}
+                for key, stats in self.query_ms.items()
+            ]
+        urls.sort(key=lambda row: row['request_ms']['p95'], reverse=True)
+        queries.sort(key=lambda row: row['ms']['p95'], reverse=True)
+        return {'urls': urls[:limit], 'queries': queries[:limit]}
+
+
+profile_store = ProfileStore()
+
+
+def get_sample_rate() -> float:
+    return getattr(settings, 'FLANS_SQL_PROFILING_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+
+
+def log_slow(profile: RequestProfile, path: str) -> None:
+    slow_query_ms = getattr(settings, 'FLANS_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    for query in profile.queries:
+        if query.ms >= slow_query_ms:
+            slow_query_logger.warning(
+                "slow query %.1fms [%s] %s: %s",
+                query.ms, query.fingerprint, profile.url_name, query.sql[:LOGGED_SQL_CHARS])
+
+    if profile.total_ms >= getattr(settings, 'FLANS_SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS):
+        slowest = '\n'.join(
+            f'  {query.ms:.1f}ms [{query.fingerprint}] {query.sql[:LOGGED_SQL_CHARS]}'
+            for query in profile.slowest()
+        )
+        slow_query_logger.warning(
+            "slow request %.1fms %s (%s): %d queries, %.1fms in the database\n%s",
+            profile.total_ms, path, profile.url_name, len(profile.queries), profile.db_ms, slowest)
+
+
+@sync_and_async_middleware
+class SQLProfilingMiddleware:
+    """
+    Profile a sample of requests into ``profile_store`` (see module docs).
+    Switched off (MiddlewareNotUsed) unless FLANS_SQL_PROFILING.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'FLANS_SQL_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _sample(request) -> Optional[RequestProfile]:
+        """A fresh profile for this request, or None if it isn't sampled."""
+        if random.random() >= get_sample_rate():
+            return None
+        try:
+            url_name = resolve(request.path_info).url_name or '<unnamed>'
+        except Resolver404:
+            url_name = '<unresolved>'
+        return RequestProfile(url_name)
+
+    @staticmethod
+    def _record(request, profile: RequestProfile, started: float) -> None:
+        profile.total_ms = (time.perf_counter() - started) * 1000
+        profile_store.record(profile)
+        log_slow(profile, request.path)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = self._sample(request)
+        if profile is None:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with execute_wrapper_all(profile):
+            response = self.get_response(request)
+        self._record(request, profile, started)
+        return response
+
+    async def __acall__(self, request):
+        profile = self._sample(request)
+        if profile is None:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        # Connections are per thread: install the wrappers in the thread the
+        # request's ORM calls run in (its thread-sensitive executor)
+        wrapping = execute_wrapper_all(profile)
+        await sync_to_async(wrapping.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrapping.__exit__)(None, None, None)
+        self._record(request, profile, started)
+        return response
+
+
+def get_profile_snapshot(limit: int = 50) -> Dict:
+    return {'pid': os.getpid(), 'sample_rate': get_sample_rate(), **profile_store.snapshot(limit)}
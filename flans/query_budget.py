@@ -0,0 +1,119 @@
+"""
+Query budgets per URL name.
+
+Every page and API endpoint declares how many SQL queries one request may
+run (cold cache, anonymous unless the view needs a user). The numbers must
+not grow with the data: the tests render each endpoint with 1 and with 100
+related rows and require the same count, within the budget, so an N+1 (a
+``total_flans`` or ``ratings`` lookup per row) fails CI.
+
+``QueryBudgetMiddleware`` is the live counterpart for development: it
+counts the queries of each request and logs a warning, with the stack of
+the first query over budget, when a view overspends.
+"""
+import logging
+import traceback
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+from .db import execute_wrapper_all
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGETS: Dict[str, int] = {
+    # Pages: page-cache validator + content (+ sidebar stats on the list)
+    'flan-list': 8,
+    'flan-detail': 2,
+    'creators-list': 2,
+    'creator-detail': 5,
+    'faq': 0,
+    'api-flan-list': 1,
+    'api-flan-changes': 1,
+    # flan, ratings with their users, featured creator's flan count
+    'api-flan-detail': 3,
+    'api-flan-ratings': 1,
+    'api-creators-list': 1,
+    'api-creator-detail': 4,
+    # One COUNT per stat and per flan type
+    'api-stats': 12,
+}
+
+STACK_SAMPLE_FRAMES = 12
+
+
+def get_query_budget(url_name: Optional[str]) -> Optional[int]:
+    """Budget for ``url_name``; FLANS_QUERY_BUDGETS entries override the defaults."""
+    budgets = {**QUERY_BUDGETS, **getattr(settings, 'FLANS_QUERY_BUDGETS', {})}
+    return budgets.get(url_name)
+
+
+def _project_frames(stack: List[traceback.FrameSummary]) -> List[traceback.FrameSummary]:
+    """Drop Django/DRF/stdlib frames and this module, keeping where the query came from."""
+    root = str(settings.BASE_DIR)
+    return [
+        frame for frame in stack
+        if frame.filename.startswith(root) and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+
+
+class QueryCounter:
+    """
+    Count queries on every configured database (replicas included) inside a
+    ``with`` block. With a ``limit``, the stack of the first query past it
+    is kept in ``stack_sample``.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.count = 0
+        self.stack_sample: Optional[str] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        if self.limit is not None and self.count == self.limit + 1:
+            frames = _project_frames(traceback.extract_stack()[:-1])
+            self.stack_sample = ''.join(traceback.format_list(frames[-STACK_SAMPLE_FRAMES:]))
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> 'QueryCounter':
+        self._wrapping = execute_wrapper_all(self)
+        self._wrapping.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._wrapping.__exit__(*exc_info)
+
+
+class QueryBudgetMiddleware:
+    """
+    Development aid: warn when a request runs more queries than its URL's
+    budget. Switched off (MiddlewareNotUsed) unless FLANS_QUERY_BUDGET_WARNINGS.
+    Queries run while a streaming response is iterated are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'FLANS_QUERY_BUDGET_WARNINGS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            url_name = resolve(request.path_info).url_name
+        except Resolver404:
+            url_name = None
+        budget = get_query_budget(url_name)
+        if budget is None:
+            return self.get_response(request)
+
+        with QueryCounter(limit=budget) as counter:
+            response = self.get_response(request)
+        if counter.count > budget:
+            logger.warning(
+                "%s (%s) ran %d queries, budget is %d. First query over budget:\n%s",
+                request.path, url_name, counter.count, budget, counter.stack_sample,
+            )
+        return response
@@ -0,0 +1,74 @@
+"""
+Query-plan capture for index regression tests.
+
+``capture_plans()`` records every SELECT run on a connection inside the
+block and, on exit, asks SQLite for its ``EXPLAIN QUERY PLAN``. A ``SCAN``
+step reads a whole table, or a whole index (``SCAN t USING INDEX i``,
+``SCAN t USING COVERING INDEX i``), row by row; only ``SEARCH`` steps seek.
+``USE TEMP B-TREE FOR ORDER BY`` means the rows are sorted after they are
+read, so no index served the ordering. ``QueryPlan.full_scans`` (as
+``(table, index)`` pairs, index None for a bare table scan) and
+``QueryPlan.temp_sorts`` list those so the tests can fail when a hot query
+loses its index.
+
+    with capture_plans() as plans:
+        client.get('/')
+    assert not [p for p in plans if p.full_scans() or p.temp_sorts()]
+"""
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from django.db import connection as default_connection
+
+# "SCAN flans_flan", "SCAN flans_flan AS U0", "SCAN U0 USING INDEX i" or
+# "SCAN flans_flan USING COVERING INDEX i"; subqueries name the alias (U0)
+FULL_SCAN = re.compile(
+    r'^SCAN (?P<table>\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (?P<index>\w+))?$')
+# "USE TEMP B-TREE FOR ORDER BY" (also GROUP BY, DISTINCT, LAST TERM OF ORDER BY, ...)
+TEMP_SORT = re.compile(r'^USE TEMP B-TREE FOR (?P<clause>.+)$')
+
+
+@dataclass
+class QueryPlan:
+    sql: str
+    params: Sequence
+    steps: List[str] = field(default_factory=list)
+
+    def full_scans(self) -> List[Tuple[str, Optional[str]]]:
+        """(table, index) for each table this query reads in full; index is None without one."""
+        return [(match['table'], match['index']) for match in map(FULL_SCAN.match, self.steps) if match]
+
+    def temp_sorts(self) -> List[str]:
+        """Clauses (ORDER BY, GROUP BY, ...) sorted in a temp B-tree rather than read in index order."""
+        return [match['clause'] for match in map(TEMP_SORT.match, self.steps) if match]
+
+    def __str__(self) -> str:
+        return '\n'.join([self.sql, *(f'  {step}' for step in self.steps)])
+
+
+def explain(sql: str, params: Sequence, connection=default_connection) -> List[str]:
+    """The detail column of SQLite's EXPLAIN QUERY PLAN for ``sql``."""
+    if connection.vendor != 'sqlite':
+        raise NotImplementedError("Query plans are only parsed for SQLite")
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[3] for row in cursor.fetchall()]
+
+
+@contextmanager
+def capture_plans(connection=default_connection) -> Iterator[List[QueryPlan]]:
+    """Collect a QueryPlan for each SELECT executed in the block (filled in on exit)."""
+    plans: List[QueryPlan] = []
+
+    def record(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            plans.append(QueryPlan(sql, tuple(params or ())))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield plans
+    # Explained afterwards so EXPLAIN doesn't go through the wrapper itself
+    for plan in plans:
+        plan.steps = explain(plan.sql, plan.params, connection)
@@ -0,0 +1,130 @@
+"""
+Bulk helpers for the seeding commands (seed_flans, add_sample_flans,
+add_fake_creators).
+
+``insert_missing`` finds out in one query which natural keys (flan name,
+creator name, subscriber email) are already there and bulk-inserts only
+the rest, so re-seeding a populated database costs a handful of queries
+instead of a get_or_create per row. ``clear_catalog`` empties the tables
+with the backend's flush SQL (DELETE on SQLite, TRUNCATE on Postgres)
+rather than loading every row for the ORM cascade.
+
+Neither goes through save() or signals: the price rule is applied by the
+caller's ``prepare`` hook, and ``invalidate_seeded_caches`` does what the
+signal handlers would.
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import connection
+
+from .caching import api_flan_detail_key, bump_catalog_generation, flan_detail_key, invalidate_creator_stats
+from .counting import rebuild_flan_group_counts
+from .models import Flan, FlanCreator, FlanDeletion, FlanGroupCount, Subscriber
+
+SEED_BATCH_SIZE = 500
+
+
+def existing_ids(model, key: str, values: Iterable[str]) -> Dict[str, int]:
+    """``{key: id}`` for the rows of ``model`` whose ``key`` is in ``values``; the oldest row wins."""
+    queryset = model.objects.filter(**{f'{key}__in': list(values)}).order_by('-pk')
+    return dict(queryset.values_list(key, 'pk'))
+
+
+def insert_missing(
+    model,
+    key: str,
+    rows: Iterable[Dict],
+    prepare: Optional[Callable] = None,
+    batch_size: int = SEED_BATCH_SIZE,
+) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Bulk-insert the ``rows`` (field dicts) whose ``key`` isn't in the table
+    yet; ``prepare(instance)`` runs on each new instance first. Returns the
+    ``{key: id}`` map of all the rows, old and new, and the inserted keys.
+    """
+    rows = list(rows)
+    keys = [row[key] for row in rows]
+    ids = existing_ids(model, key, keys)
+
+    seen = set(ids)
+    missing = []
+    for row in rows:
+        if row[key] in seen:
+            continue
+        seen.add(row[key])
+        instance = model(**row)
+        if prepare is not None:
+            prepare(instance)
+        missing.append(instance)
+
+    if missing:
+        model.objects.bulk_create(missing, batch_size=batch_size)
+        # Read back rather than rely on bulk_create setting pks, which not every backend does
+        ids = existing_ids(model, key, keys)
+    return ids, [getattr(instance, key) for instance in missing]
+
+
+def clear_catalog() -> Dict[str, int]:
+    """
+    Delete every flan, creator and subscriber, with their ratings and email
+    logs, and return how many of each went. Flans leave tombstones, as they
+    do when deleted one by one, so delta-sync clients drop them too.
+    """
+    flan_ids = list(Flan.objects.values_list('pk', flat=True))
+    counts = {
+        'flans': len(flan_ids),
+        'creators': FlanCreator.objects.count(),
+        'subscribers': Subscriber.objects.count(),
+    }
+    FlanDeletion.objects.bulk_create(
+        (FlanDeletion(flan_id=flan_id) for flan_id in flan_ids), batch_size=SEED_BATCH_SIZE)
+
+    # allow_cascade also empties the tables pointing at these (ratings, email logs).
+    # Sequences are kept, so new flans never reuse an id a client has seen.
+    tables = [model._meta.db_table for model in (Flan, FlanCreator, Subscriber, FlanGroupCount)]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sql_flush(no_style(), tables, allow_cascade=True):
+            cursor.execute(sql)
+
+    cache.delete_many([key for flan_id in flan_ids
+                       for key in (flan_detail_key(flan_id), api_flan_detail_key(flan_id))])
+    return counts
+
+
+def invalidate_seeded_caches(creator_ids: Iterable[int] = (), recount: bool = True) -> None:
+    """
+    What the Flan signal handlers would have done for bulk-inserted flans.
+    Pass ``recount=False`` when no flans were inserted to skip the group recount.
+    """
+    bump_catalog_generation()
+    if recount:
+        rebuild_flan_group_counts()
+    for creator_id in set(creator_ids):
+        invalidate_creator_stats(creator_id)
+
+
+class StepTimer:
+    """Wall time of named steps, for a summary at the end of a command."""
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0.0) + time.perf_counter() - started
+
+    @property
+    def total(self) -> float:
+        return sum(self.steps.values())
+
+    def summary(self) -> str:
+        lines = [f"  {name:<12} {seconds * 1000:>8.1f}ms" for name, seconds in self.steps.items()]
+        return '\n'.join([*lines, f"  {'total':<12} {self.total * 1000:>8.1f}ms"])
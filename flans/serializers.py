@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Flan, FlanCreator, FlanRating, Subscriber
+from .services import SubscriberService
 
 
 class FlanCreatorSerializer(serializers.ModelSerializer):
@@ -44,6 +45,13 @@ class FlanListSerializer(serializers.ModelSerializer):
         ]
 
 
+class FlanSyncSerializer(FlanListSerializer):
+    """List payload plus updated_at, for the delta-sync change feed."""
+
+    class Meta(FlanListSerializer.Meta):
+        fields = FlanListSerializer.Meta.fields + ['updated_at']
+
+
 class FlanDetailSerializer(serializers.ModelSerializer):
     """Full serializer for detail views — includes nested creator and ratings."""
     display_price = serializers.ReadOnlyField(source='get_display_price')
@@ -63,13 +71,14 @@ class FlanDetailSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
 
+    # Computed from obj.ratings.all() so a prefetched ratings list is reused
+    # instead of running an extra AVG and COUNT query per flan.
     def get_avg_score(self, obj) -> float:
-        from django.db.models import Avg
-        result = obj.ratings.aggregate(avg=Avg('score'))
-        return round(result['avg'] or 0, 1)
+        scores = [rating.score for rating in obj.ratings.all()]
+        return round(sum(scores) / len(scores), 1) if scores else 0
 
     def get_total_ratings(self, obj) -> int:
-        return obj.ratings.count()
+        return len(obj.ratings.all())
 
 
 class SubscribeSerializer(serializers.ModelSerializer):
@@ -80,4 +89,4 @@ class SubscribeSerializer(serializers.ModelSerializer):
                   'receive_weekly_digest', 'receive_new_flan_alerts']
 
     def validate_email(self, value: str) -> str:
-        return value.lower().strip()
+        return SubscriberService.normalize_email(value)
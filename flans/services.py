@@ -1,48 +1,80 @@
-from typing import List, Optional, Dict, Tuple
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Dict, Set, Tuple
 from decimal import Decimal
-from django.db.models import Count, Avg, Q
-from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Avg, Q, Sum
+from django.db.models.functions import Lower
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from django.contrib.auth.models import User
 
-from .models import Flan, Subscriber
-from .datatypes import FlanData, FlanCreateData, AnalyticsData, PaginatedResponse, SubscriberData
+from .models import Flan, FlanRating, Subscriber
+from .datatypes import (
+    FlanData, FlanCreateData, AnalyticsData, PaginatedResponse, SubscriberData,
+    SubscriberImportResult, CreatorStatsData, FlanBulkCreateResult,
+)
+from .counting import adjust_flan_group_counts, estimate_flan_count
+from .db import replica_queryset, replica_reads
+from .pagination import CountingPaginator
+from .caching import (
+    CREATOR_STATS_CACHE_TIMEOUT, bump_catalog_generation, creator_stats_key, get_or_compute,
+)
 from .exceptions import FlanNotFoundError, InvalidFlanDataError, DuplicateSubscriberError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip by the iter_* getters
+ITERATOR_CHUNK_SIZE = 2000
+# Rows per INSERT in FlanService.create_flans_bulk
+BULK_CREATE_BATCH_SIZE = 500
+
 class FlanService:
     """Service class for flan-related business logic"""
     
     @staticmethod
+    @replica_reads()
     def get_all_flans() -> List[FlanData]:
         """Get all flans as FlanData objects"""
         try:
-            flans = Flan.objects.select_related('creator').all()
-            return [FlanData.from_model(flan) for flan in flans]
+            rows = Flan.objects.values_list(*FlanData.VALUES_FIELDS)
+            return [FlanData.from_row(row) for row in rows]
         except Exception as e:
             logger.error(f"Error getting all flans: {e}")
             return []
     
     @staticmethod
+    def iter_all_flans(chunk_size: int = ITERATOR_CHUNK_SIZE) -> Iterator[FlanData]:
+        """
+        Stream all flans as FlanData, ``chunk_size`` rows at a time, without
+        a queryset result cache (server-side cursor where the backend has one).
+        Memory stays flat however many flans there are.
+        """
+        rows = replica_queryset(Flan.objects.values_list(*FlanData.VALUES_FIELDS))
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield FlanData.from_row(row)
+    
+    @staticmethod
+    @replica_reads()
     def get_flans_by_type(flan_type: Optional[str] = None) -> List[FlanData]:
         """Get flans filtered by type"""
         try:
-            queryset = Flan.objects.select_related('creator').all()
+            queryset = Flan.objects.all()
             if flan_type:
                 queryset = queryset.filter(flan_type=flan_type)
             
-            return [FlanData.from_model(flan) for flan in queryset]
+            return [FlanData.from_row(row) for row in queryset.values_list(*FlanData.VALUES_FIELDS)]
         except Exception as e:
             logger.error(f"Error getting flans by type {flan_type}: {e}")
             return []
     
     @staticmethod
+    @replica_reads()
     def get_flan_by_id(flan_id: int) -> Optional[FlanData]:
         """Get a specific flan by ID"""
         try:
-            flan = Flan.objects.select_related('creator').get(id=flan_id)
-            return FlanData.from_model(flan)
+            row = Flan.objects.values_list(*FlanData.VALUES_FIELDS).get(id=flan_id)
+            return FlanData.from_row(row)
         except Flan.DoesNotExist:
             logger.warning(f"Flan with id {flan_id} not found")
             raise FlanNotFoundError(flan_id)
@@ -51,11 +83,12 @@ class FlanService:
             return None
     
     @staticmethod
+    @replica_reads()
     def get_premium_flans() -> List[FlanData]:
         """Get all premium flans"""
         try:
-            flans = Flan.objects.select_related('creator').filter(is_premium=True)
-            return [FlanData.from_model(flan) for flan in flans]
+            rows = Flan.objects.filter(is_premium=True).values_list(*FlanData.VALUES_FIELDS)
+            return [FlanData.from_row(row) for row in rows]
         except Exception as e:
             logger.error(f"Error getting premium flans: {e}")
             return []
@@ -88,6 +121,69 @@ class FlanService:
             return False, None, [f"Database error: {str(e)}"]
     
     @staticmethod
+    def create_flans_bulk(items: Iterable[FlanCreateData], creator: User,
+                          batch_size: int = BULK_CREATE_BATCH_SIZE,
+                          strict: bool = False) -> FlanBulkCreateResult:
+        """
+        Validate and insert many flans in one transaction.
+        
+        Every item is checked (FlanCreateData.validate plus the model field
+        validators) and its errors are reported by input position. Valid
+        items are inserted with bulk_create, ``batch_size`` rows per INSERT;
+        with ``strict``, nothing is inserted if any item is invalid.
+        Items may also be dicts, parsed with FlanCreateData.from_dict.
+        """
+        result = FlanBulkCreateResult()
+        flans: List[Flan] = []
+        
+        for index, item in enumerate(items):
+            try:
+                if isinstance(item, dict):
+                    item = FlanCreateData.from_dict(item)
+                errors = item.validate()
+            except InvalidFlanDataError as e:
+                errors = e.errors
+            if errors:
+                result.errors[index] = errors
+                continue
+            
+            flan = Flan(
+                name=item.name,
+                description=item.description,
+                image_url=item.image_url,
+                flan_type=item.flan_type,
+                is_premium=item.is_premium,
+                price=item.price,
+                creator=creator,
+            )
+            # bulk_create skips save(), so apply its price rule here
+            flan.apply_price_rule()
+            try:
+                flan.full_clean(exclude=['creator'])
+            except ValidationError as e:
+                result.errors[index] = [
+                    f"{field}: {message}" for field, messages in e.message_dict.items()
+                    for message in messages
+                ]
+                continue
+            flans.append(flan)
+        
+        if not flans or (strict and result.errors):
+            return result
+        
+        with transaction.atomic():
+            for start in range(0, len(flans), batch_size):
+                Flan.objects.bulk_create(flans[start:start + batch_size])
+            # bulk_create sends no post_save, so do what the Flan signals would
+            adjust_flan_group_counts(Counter((flan.flan_type, flan.is_premium) for flan in flans))
+        result.created_ids = [flan.pk for flan in flans]
+        
+        bump_catalog_generation()
+        logger.info(f"Bulk-created {result.created} flans ({result.invalid} invalid)")
+        return result
+    
+    @staticmethod
+    @replica_reads()
     def get_flan_analytics(flan_id: int) -> Optional[AnalyticsData]:
         """Get analytics for a specific flan"""
         try:
@@ -111,21 +207,23 @@ class FlanService:
             return None
     
     @staticmethod
+    @replica_reads()
     def get_flans_paginated(page: int = 1, page_size: int = 10) -> PaginatedResponse:
         """Get paginated flans"""
         try:
-            flans_queryset = Flan.objects.select_related('creator').all().order_by('-created_at')
-            paginator = Paginator(flans_queryset, page_size)
+            rows = Flan.objects.order_by('-created_at').values_list(*FlanData.VALUES_FIELDS)
+            paginator = CountingPaginator(rows, page_size, estimate=estimate_flan_count)
             
             page_obj = paginator.get_page(page)
-            flan_data_list = [FlanData.from_model(flan) for flan in page_obj.object_list]
+            flan_data_list = [FlanData.from_row(row) for row in page_obj.object_list]
             
             return PaginatedResponse(
                 data=flan_data_list,
                 total_count=paginator.count,
                 page=page,
                 page_size=page_size,
-                total_pages=paginator.num_pages
+                total_pages=paginator.num_pages,
+                total_count_is_estimate=paginator.count_is_estimate,
             )
         except Exception as e:
             logger.error(f"Error getting paginated flans: {e}")
@@ -138,9 +236,47 @@ class FlanService:
                 total_pages=0
             )
 
+class CreatorService:
+    """Service class for flan creator pages"""
+    
+    @staticmethod
+    def get_creator_stats(creator_id: int) -> CreatorStatsData:
+        """Flan count, premium share and rating average for a creator (cached)"""
+        return get_or_compute(
+            creator_stats_key(creator_id),
+            lambda: CreatorService._compute_creator_stats(creator_id),
+            CREATOR_STATS_CACHE_TIMEOUT,
+        )
+    
+    @staticmethod
+    def _compute_creator_stats(creator_id: int) -> CreatorStatsData:
+        flan_stats = Flan.objects.filter(featured_creator_id=creator_id).aggregate(
+            flan_count=Count('id'),
+            premium_count=Count('id', filter=Q(is_premium=True)),
+        )
+        rating_stats = FlanRating.objects.filter(
+            flan__featured_creator_id=creator_id
+        ).aggregate(total=Count('id'), avg=Avg('score'))
+        
+        return CreatorStatsData(
+            creator_id=creator_id,
+            flan_count=flan_stats['flan_count'],
+            premium_count=flan_stats['premium_count'],
+            total_ratings=rating_stats['total'],
+            avg_rating=round(rating_stats['avg'] or 0, 1),
+        )
+
 class SubscriberService:
     """Service class for subscriber operations"""
     
+    IMPORT_BATCH_SIZE = 1000
+    MAX_INVALID_SAMPLES = 20
+    
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        """Canonical form we store emails in"""
+        return email.lower().strip()
+    
     @staticmethod
     def get_active_subscribers_count() -> int:
         """Get count of active subscribers"""
@@ -148,12 +284,12 @@ class SubscriberService:
     
     @staticmethod
     def get_subscribers_by_preference() -> Dict[str, int]:
-        """Get subscriber counts by preference"""
-        return {
-            'weekly_digest': Subscriber.objects.filter(receive_weekly_digest=True).count(),
-            'new_flan_alerts': Subscriber.objects.filter(receive_new_flan_alerts=True).count(),
-            'total_active': Subscriber.objects.filter(is_active=True).count()
-        }
+        """Get subscriber counts by preference, in one pass over subscriber_prefs_idx"""
+        return Subscriber.objects.aggregate(
+            weekly_digest=Count('pk', filter=Q(receive_weekly_digest=True)),
+            new_flan_alerts=Count('pk', filter=Q(receive_new_flan_alerts=True)),
+            total_active=Count('pk', filter=Q(is_active=True)),
+        )
     
     @staticmethod
     def create_subscriber(email: str, name: str = "") -> Tuple[bool, SubscriberData, str]:
@@ -180,18 +316,111 @@ class SubscriberService:
             logger.error(f"Error creating subscriber {email}: {e}")
             return False, None, f"Subscription failed: {str(e)}"
     
+    @staticmethod
+    def import_subscribers(rows: Iterable[Dict], batch_size: int = IMPORT_BATCH_SIZE) -> SubscriberImportResult:
+        """
+        Bulk-import subscribers from dicts with an 'email' (and optional 'name') key.
+        
+        Emails are normalized and validated, deduplicated in memory, and
+        inserted in batches: one case-insensitive lookup and one INSERT per
+        batch instead of two round-trips per address.
+        """
+        result = SubscriberImportResult()
+        seen = set()
+        batch: List[Subscriber] = []
+        
+        for row in rows:
+            raw_email = str(row.get('email') or '')
+            email = SubscriberService.normalize_email(raw_email)
+            try:
+                validate_email(email)
+            except ValidationError:
+                result.invalid += 1
+                if len(result.invalid_samples) < SubscriberService.MAX_INVALID_SAMPLES:
+                    result.invalid_samples.append(raw_email)
+                continue
+            
+            if email in seen:
+                result.duplicates += 1
+                continue
+            seen.add(email)
+            
+            name = str(row.get('name') or '').strip()[:100]
+            batch.append(Subscriber(email=email, name=name, is_active=True))
+            if len(batch) >= batch_size:
+                SubscriberService._insert_subscriber_batch(batch, result)
+                batch = []
+        
+        if batch:
+            SubscriberService._insert_subscriber_batch(batch, result)
+        
+        logger.info(
+            f"Imported subscribers: {result.inserted} inserted, "
+            f"{result.duplicates} duplicates, {result.invalid} invalid"
+        )
+        return result
+    
+    @staticmethod
+    def _subscribed_emails(emails: List[str]) -> Set[str]:
+        """Which of the (normalized) ``emails`` are already subscribed, ignoring case"""
+        return set(Subscriber.objects.annotate(
+            email_lower=Lower('email')
+        ).filter(email_lower__in=emails).values_list('email_lower', flat=True))
+    
+    @staticmethod
+    def _insert_subscriber_batch(batch: List[Subscriber], result: SubscriberImportResult) -> None:
+        emails = [sub.email for sub in batch]
+        existing = SubscriberService._subscribed_emails(emails)
+        new_subscribers = [sub for sub in batch if sub.email not in existing]
+        
+        try:
+            with transaction.atomic():
+                Subscriber.objects.bulk_create(new_subscribers)
+            inserted = len(new_subscribers)
+        except IntegrityError:
+            # Some were inserted concurrently since the lookup: insert one by
+            # one so only the rows we actually wrote are counted
+            inserted = 0
+            for sub in new_subscribers:
+                try:
+                    with transaction.atomic():
+                        Subscriber.objects.bulk_create([sub])
+                    inserted += 1
+                except IntegrityError:
+                    pass
+        result.inserted += inserted
+        result.duplicates += len(batch) - inserted
+    
     @staticmethod
     def get_subscribers_for_weekly_digest() -> List[SubscriberData]:
         """Get all active subscribers who want weekly digest"""
         try:
-            subscribers = Subscriber.objects.filter(
-                is_active=True, 
-                receive_weekly_digest=True
-            )
-            return [SubscriberData.from_model(sub) for sub in subscribers]
+            return list(SubscriberService.iter_subscribers_for_weekly_digest())
         except Exception as e:
             logger.error(f"Error getting subscribers for digest: {e}")
             return []
+    
+    @staticmethod
+    def iter_subscribers_for_weekly_digest(chunk_size: int = ITERATOR_CHUNK_SIZE) -> Iterator[SubscriberData]:
+        """Stream active weekly-digest subscribers, ``chunk_size`` rows at a time"""
+        rows = Subscriber.objects.filter(
+            is_active=True,
+            receive_weekly_digest=True
+        ).values_list(*SubscriberData.VALUES_FIELDS)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield SubscriberData.from_row(row)
+    
+    @staticmethod
+    def iter_subscribers_for_new_flan_alert(flan_type: str,
+                                            chunk_size: int = ITERATOR_CHUNK_SIZE) -> Iterator[SubscriberData]:
+        """Stream active alert subscribers whose favorite type is ``flan_type`` or unset"""
+        rows = Subscriber.objects.filter(
+            Q(favorite_flan_type='') | Q(favorite_flan_type=flan_type),
+            is_active=True,
+            receive_new_flan_alerts=True,
+        ).values_list(*SubscriberData.VALUES_FIELDS)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield SubscriberData.from_row(row)
 
 class AnalyticsService:
     """Service class for analytics and reporting"""
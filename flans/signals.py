@@ -0,0 +1,96 @@
+"""
+Cache invalidation, flan group counter and thumbnail hash hooks.
+Connected in FlansConfig.ready().
+
+Note: queryset.update() and bulk_create() don't send these signals, so
+callers using them are responsible for invalidating what they touch and
+for keeping the group counts right.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import thumbnails
+from .caching import bump_catalog_generation, invalidate_creator_stats, invalidate_flan
+from .counting import adjust_flan_group_counts
+from .models import Flan, FlanCreator, FlanDeletion, FlanRating
+
+
+def _forget_stale_thumbnails(instance, stored_source, update_fields) -> None:
+    """A new picture makes the thumbnail hash stale; clearing it queues the row for generate_thumbnails."""
+    source_field, hash_field = thumbnails.get_image_fields(instance)
+    if stored_source is None or stored_source == getattr(instance, source_field):
+        return
+    setattr(instance, hash_field, '')
+    if update_fields is not None and hash_field not in update_fields:
+        type(instance).objects.filter(pk=instance.pk).update(**{hash_field: ''})
+
+
+@receiver(pre_save, sender=Flan)
+def remember_stored_flan(sender, instance: Flan, raw: bool = False, update_fields=None, **kwargs) -> None:
+    """Keep the row as it was before this save, so post_save can see what moved."""
+    stored = None
+    if instance.pk is not None and not raw:
+        stored = Flan.objects.filter(pk=instance.pk).values(
+            'featured_creator_id', 'flan_type', 'is_premium', 'image_url').first()
+    instance._stored_values = stored
+    if stored is not None:
+        _forget_stale_thumbnails(instance, stored['image_url'], update_fields)
+
+
+@receiver(pre_save, sender=FlanCreator)
+def forget_stale_creator_thumbnails(sender, instance: FlanCreator, raw: bool = False, update_fields=None, **kwargs) -> None:
+    if instance.pk is None or raw:
+        return
+    stored_image = FlanCreator.objects.filter(pk=instance.pk).values_list('profile_image', flat=True).first()
+    _forget_stale_thumbnails(instance, stored_image, update_fields)
+
+
+@receiver([post_save, post_delete], sender=Flan)
+def flan_changed(sender, instance: Flan, **kwargs) -> None:
+    invalidate_flan(instance.pk)
+    bump_catalog_generation()
+
+    # A reassigned flan changes the stats of the creator it left, too
+    stored = getattr(instance, '_stored_values', None) or {}
+    old_creator_id = stored.get('featured_creator_id')
+    for creator_id in {instance.featured_creator_id, old_creator_id} - {None}:
+        invalidate_creator_stats(creator_id)
+    # The old creator's page no longer has the flan to date it, so touch the creator
+    if old_creator_id is not None and old_creator_id != instance.featured_creator_id:
+        FlanCreator.objects.filter(pk=old_creator_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Flan)
+def count_saved_flan(sender, instance: Flan, created: bool, **kwargs) -> None:
+    group = (instance.flan_type, instance.is_premium)
+    if created:
+        adjust_flan_group_counts({group: 1})
+        return
+
+    stored = getattr(instance, '_stored_values', None)
+    if stored is not None:
+        old_group = (stored['flan_type'], stored['is_premium'])
+        if old_group != group:
+            adjust_flan_group_counts({old_group: -1, group: 1})
+
+
+@receiver(post_delete, sender=Flan)
+def count_deleted_flan(sender, instance: Flan, **kwargs) -> None:
+    adjust_flan_group_counts({(instance.flan_type, instance.is_premium): -1})
+
+
+@receiver([post_save, post_delete], sender=FlanCreator)
+def creator_changed(sender, instance: FlanCreator, **kwargs) -> None:
+    # Creator names and counts appear in generation-keyed catalog caches
+    bump_catalog_generation()
+
+
+@receiver(post_delete, sender=Flan)
+def record_flan_deletion(sender, instance: Flan, **kwargs) -> None:
+    FlanDeletion.objects.create(flan_id=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=FlanRating)
+def rating_changed(sender, instance: FlanRating, **kwargs) -> None:
+    invalidate_flan(instance.flan_id)
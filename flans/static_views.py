@@ -0,0 +1,80 @@
+"""
+Static file serving for deployments without a front-end server.
+
+Serves files collected into STATIC_ROOT by ``CompressedManifestStaticFilesStorage``.
+The pre-built ``.br``/``.gz`` variant is picked when the client accepts it,
+and content-hashed names get a one-year immutable Cache-Control, since their
+URL changes whenever their content does. Enabled with ``FLANS_SERVE_STATIC``
+(see onlyflans/urls.py).
+"""
+import mimetypes
+import os
+from functools import lru_cache
+from typing import FrozenSet
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpRequest, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Best first; matched against the files on disk, not against what's installed here
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+HASHED_MAX_AGE = 365 * 24 * 60 * 60  # one year
+UNHASHED_MAX_AGE = 60  # seconds
+
+
+@lru_cache(maxsize=1)
+def get_hashed_names() -> FrozenSet[str]:
+    """Content-hashed names from the staticfiles manifest (empty without one)."""
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def accepted_encodings(request: HttpRequest) -> FrozenSet[str]:
+    encodings = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(coding.strip().lower())
+    return frozenset(encodings)
+
+
+def serve_static(request: HttpRequest, path: str) -> FileResponse:
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid path")
+    if not os.path.isfile(fullpath):
+        raise Http404(f"{path} not found")
+
+    content_type, _ = mimetypes.guess_type(fullpath)
+    served, encoding = fullpath, None
+    accepted = accepted_encodings(request)
+    for candidate, suffix in STATIC_ENCODINGS:
+        if candidate in accepted and os.path.isfile(fullpath + suffix):
+            served, encoding = fullpath + suffix, candidate
+            break
+
+    stat = os.stat(served)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    response = FileResponse(
+        open(served, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+        filename=os.path.basename(fullpath),
+    )
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+
+    if path in get_hashed_names():
+        patch_cache_control(response, public=True, max_age=HASHED_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=UNHASHED_MAX_AGE)
+    return response
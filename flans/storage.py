@@ -0,0 +1,72 @@
+"""
+Static file storage with pre-compressed variants.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` writes
+content-hashed copies (``list.3f2a91c0d4e5.css``) plus ``.gz`` and, when the
+optional ``brotli`` package is installed, ``.br`` siblings for text assets,
+so ``static_views.serve_static`` (or a front-end server) never compresses
+on the fly. Hashed names change whenever the content does, which is what
+makes far-future cache headers safe.
+"""
+import gzip
+import logging
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.html', '.txt', '.json', '.map', '.xml'}
+# Below this size the compressed file plus headers isn't worth it
+MIN_COMPRESS_SIZE = 256  # bytes
+
+
+def compress_gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-for-byte reproducible across builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def get_encoders():
+    """(encoding, file suffix, compressor) for every available encoding, best first."""
+    encoders = []
+    if brotli is not None:
+        encoders.append(('br', '.br', compress_brotli))
+    encoders.append(('gzip', '.gz', compress_gzip))
+    return encoders
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes .gz/.br variants of hashed text files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in self.hashed_files.values():
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                self._write_compressed(name)
+
+    def _write_compressed(self, name: str) -> None:
+        with self.open(name) as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+
+        for _, suffix, compress in get_encoders():
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
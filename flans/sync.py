@@ -0,0 +1,108 @@
+"""
+Delta sync for clients that keep a local mirror of the flan catalog.
+
+Changes are two ordered streams: flans by (updated_at, id) and deletion
+tombstones by (deleted_at, id). They are merged into one sequence ordered
+by (timestamp, stream, id), and the sync token is the position of the last
+event a client has seen, so tokens only ever move forward.
+
+updated_at is set by the application before the row is written, so a
+transaction can commit after a client has already read past its
+timestamp. Events newer than FLANS_SYNC_SETTLE_SECONDS are therefore
+delivered but not settled: the token stops at the last settled event, and
+the unsettled ones are read (and delivered) again on the next call, by
+which time any slower transaction from that window has committed. Clients
+apply changes as upserts, so repeats are harmless.
+
+Only changes that go through Flan.save()/delete() bump updated_at or leave
+a tombstone; queryset.update() and bulk_create() callers must set
+updated_at themselves.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Flan, FlanDeletion
+from .pagination import decode_cursor, encode_cursor
+
+SYNC_PAGE_SIZE = 500
+MAX_SYNC_PAGE_SIZE = 1000
+
+DEFAULT_SETTLE_SECONDS = 30
+
+FLAN_STREAM = 0
+DELETION_STREAM = 1
+
+
+@dataclass
+class FlanChanges:
+    """One page of the change feed."""
+    changed: List[Flan] = field(default_factory=list)
+    deleted: List[int] = field(default_factory=list)
+    next_token: str = ''
+    has_more: bool = False
+
+
+def _after(position: Tuple, stream: int, time_field: str) -> Q:
+    """Rows of ``stream`` that sort after ``position`` in the merged feed."""
+    moment, position_stream, pk = position
+    if stream > position_stream:
+        return Q(**{f'{time_field}__gte': moment})
+    if stream < position_stream:
+        return Q(**{f'{time_field}__gt': moment})
+    return Q(**{f'{time_field}__gt': moment}) | Q(**{time_field: moment, 'id__gt': pk})
+
+
+def get_settle_horizon() -> datetime:
+    """Events at or before this moment are settled: no transaction still in flight can precede them."""
+    seconds = getattr(settings, 'FLANS_SYNC_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS)
+    return timezone.now() - timedelta(seconds=seconds)
+
+
+def get_flan_changes(token: Optional[str] = None, limit: int = SYNC_PAGE_SIZE) -> FlanChanges:
+    """
+    Flans created/updated and deleted after ``token``.
+    Without a token this is a full snapshot (tombstones are skipped, since
+    a client without a mirror has nothing to delete).
+    Raises InvalidCursorError for malformed tokens.
+    """
+    position = decode_cursor(token, num_keys=2) if token else None
+    horizon = get_settle_horizon()
+
+    flans = Flan.objects.order_by('updated_at', 'id')
+    if position:
+        flans = flans.filter(_after(position, FLAN_STREAM, 'updated_at'))
+    events = [
+        ((flan.updated_at, FLAN_STREAM, flan.id), flan)
+        for flan in flans[:limit + 1]
+    ]
+
+    if position:
+        deletions = FlanDeletion.objects.order_by('deleted_at', 'id').filter(
+            _after(position, DELETION_STREAM, 'deleted_at'))
+        events += [
+            ((deletion.deleted_at, DELETION_STREAM, deletion.id), deletion)
+            for deletion in deletions[:limit + 1]
+        ]
+
+    events.sort(key=lambda event: event[0])
+    page = events[:limit]
+    # Settled events form a prefix of the (time-ordered) page
+    settled = [event for event in page if event[0][0] <= horizon]
+
+    changes = FlanChanges(next_token=token or '')
+    for event_position, obj in page:
+        if event_position[1] == FLAN_STREAM:
+            changes.changed.append(obj)
+        else:
+            changes.deleted.append(obj.flan_id)
+    if settled:
+        changes.next_token = encode_cursor(*settled[-1][0])
+    # Once the page reaches unsettled events the client is caught up: the
+    # token can't move past them, so "more" would only repeat this page
+    changes.has_more = len(events) > limit and len(settled) == len(page)
+    return changes
@@ -0,0 +1,31 @@
+"""
+{% responsive_image %}: an <img> for a flan or creator picture, upgraded to a
+<picture> with WebP/JPEG srcsets once local thumbnails exist (see thumbnails).
+
+    {% load flan_images %}
+    {% responsive_image flan.image_hash flan.image_url alt=flan.name css_class="flan-image" sizes="(max-width: 600px) 100vw, 320px" %}
+"""
+from django import template
+
+from ..thumbnails import THUMBNAIL_WIDTHS, srcset, thumbnail_url
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 600px) 100vw, 320px'
+
+
+@register.inclusion_tag('flans/includes/responsive_image.html')
+def responsive_image(digest: str, src: str, alt: str = '', css_class: str = '',
+                     sizes: str = DEFAULT_SIZES, fallback: str = ''):
+    context = {
+        'digest': digest, 'src': src, 'alt': alt, 'css_class': css_class,
+        'sizes': sizes, 'fallback': fallback,
+    }
+    if digest:
+        middle = THUMBNAIL_WIDTHS[len(THUMBNAIL_WIDTHS) // 2]
+        context.update(
+            src=thumbnail_url(digest, middle, 'jpg'),
+            webp_srcset=srcset(digest, 'webp'),
+            jpeg_srcset=srcset(digest, 'jpg'),
+        )
+    return context
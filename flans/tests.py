@@ -6,9 +6,12 @@ pytest tests for models, views, and API endpoints.
 
 Run with: pytest flans/tests.py -v
 """
+import io
+import re
 import pytest
 from decimal import Decimal
 from django.contrib.auth.models import User
+from django.http import HttpResponse
 from django.test import Client
 from django.urls import reverse
 
@@ -74,6 +77,21 @@ def client():
     return Client()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached pages and stats must not leak between tests."""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def no_page_cache(settings):
+    """For tests that measure the view's own render path under the anonymous page cache."""
+    settings.FLANS_ANONYMOUS_PAGE_CACHE = False
+
+
 @pytest.fixture
 def auth_client(client, user):
     client.login(username='flanfan', password='flanpassword123')
@@ -369,3 +387,2147 @@ class TestFlanAPI:
         )
         assert response.status_code == 200  # 200 = updated, not 201 created
         assert FlanRating.objects.get(flan=free_flan, user=user).score == 5
+
+
+# ============================================================
+# EXPORT TESTS
+# ============================================================
+
+@pytest.fixture
+def staff_client(db):
+    User.objects.create_user(
+        username='flanadmin', password='flanpassword789', is_staff=True
+    )
+    staff = Client()
+    staff.login(username='flanadmin', password='flanpassword789')
+    return staff
+
+
+class TestExports:
+
+    def test_keyset_iteration_crosses_batches(self, user):
+        from .pagination import iter_keyset
+        for i in range(7):
+            Flan.objects.create(
+                name=f"Flan {i}", description="A flan.", creator=user)
+        rows = list(iter_keyset(Flan.objects.values('id', 'name'), batch_size=3))
+        assert [r['name'] for r in rows] == [f"Flan {i}" for i in range(7)]
+
+    def test_export_flans_ndjson(self, client, free_flan, premium_flan):
+        import json
+        response = client.get('/api/export/flans.ndjson')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [r['id'] for r in rows] == [free_flan.id, premium_flan.id]
+        assert rows[1]['price'] == '9.99'
+
+    def test_export_since_filters_on_updated_at(self, client, free_flan, premium_flan):
+        from datetime import timedelta
+        Flan.objects.filter(id=free_flan.id).update(
+            updated_at=free_flan.updated_at - timedelta(days=30))
+        since = (premium_flan.updated_at - timedelta(days=1)).date().isoformat()
+        response = client.get(f'/api/export/flans.ndjson?since={since}')
+        body = b''.join(response.streaming_content).decode()
+        assert premium_flan.name in body
+        assert free_flan.name not in body
+
+    def test_export_invalid_since(self, client, db):
+        response = client.get('/api/export/flans.csv?since=yesterday')
+        assert response.status_code == 400
+
+    def test_export_unknown_resource(self, client, db):
+        response = client.get('/api/export/passwords.csv')
+        assert response.status_code == 404
+
+    def test_export_ratings_requires_staff(self, auth_client, free_flan):
+        response = auth_client.get('/api/export/ratings.csv')
+        assert response.status_code == 403
+
+    def test_export_ratings_csv(self, staff_client, user, free_flan):
+        FlanRating.objects.create(flan=free_flan, user=user, score=4)
+        response = staff_client.get('/api/export/ratings.csv')
+        assert response.status_code == 200
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'id,flan_id,user_id,score,review,created_at,updated_at'
+        assert len(lines) == 2
+
+    def test_export_command(self, free_flan, tmp_path):
+        from django.core.management import call_command
+        output = tmp_path / 'flans.csv'
+        call_command('export_data', 'flans', format='csv', output=str(output))
+        assert free_flan.name in output.read_text()
+
+
+# ============================================================
+# ASYNC API TESTS
+# ============================================================
+
+class TestAsyncAPI:
+
+    def test_async_flan_list_matches_sync(self, client, free_flan, premium_flan):
+        sync_data = client.get('/api/flans/').json()
+        async_data = client.get('/api/async/flans/').json()
+        assert async_data == sync_data
+
+    def test_async_flan_list_filter_premium(self, client, free_flan, premium_flan):
+        response = client.get('/api/async/flans/?premium=true')
+        assert [f['id'] for f in response.json()] == [premium_flan.id]
+
+    def test_async_flan_detail(self, client, user, free_flan):
+        FlanRating.objects.create(flan=free_flan, user=user, score=4)
+        response = client.get(f'/api/async/flans/{free_flan.id}/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data == client.get(f'/api/flans/{free_flan.id}/').json()
+        assert data['featured_creator']['total_flans'] == 1
+        assert data['avg_score'] == 4.0
+
+    def test_async_flan_detail_404(self, client, db):
+        response = client.get('/api/async/flans/99999/')
+        assert response.status_code == 404
+
+    def test_async_creators_list(self, client, creator, free_flan):
+        response = client.get('/api/async/creators/')
+        assert response.status_code == 200
+        assert response.json()[0]['total_flans'] == 1
+
+    def test_async_creators_list_follows_writes(self, client, user, creator, free_flan):
+        assert client.get('/api/async/creators/').json() == client.get('/api/creators/').json()
+        Flan.objects.create(name='Second Flan', description='Another one', creator=user,
+                            featured_creator=creator)
+        creator.name = 'Renamed Creator'
+        creator.save()
+        async_data = client.get('/api/async/creators/').json()
+        assert async_data == client.get('/api/creators/').json()
+        assert async_data[0]['total_flans'] == 2 and async_data[0]['name'] == 'Renamed Creator'
+
+    def test_async_stats_matches_sync(self, client, free_flan, premium_flan):
+        assert client.get('/api/async/stats/').json() == client.get('/api/stats/').json()
+
+
+# ============================================================
+# COALESCING / CACHE TESTS
+# ============================================================
+
+class TestSingleFlight:
+
+    def test_concurrent_threads_share_one_computation(self):
+        import threading
+        import time
+        from .coalescing import SingleFlight
+
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'flan'
+
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do('hot', compute)))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ['flan'] * 20
+
+    def test_follower_times_out_and_computes(self):
+        import threading
+        import time
+        from .coalescing import SingleFlight
+
+        flight = SingleFlight()
+        leader = threading.Thread(
+            target=lambda: flight.do('slow', lambda: time.sleep(0.5)))
+        leader.start()
+        time.sleep(0.05)
+        assert flight.do('slow', lambda: 'fallback', timeout=0.01) == 'fallback'
+        leader.join()
+
+    def test_leader_error_is_raised(self):
+        from .coalescing import SingleFlight
+
+        flight = SingleFlight()
+        with pytest.raises(ZeroDivisionError):
+            flight.do('broken', lambda: 1 / 0)
+
+    def test_async_coroutines_share_one_computation(self):
+        import asyncio
+        from .coalescing import SingleFlight
+
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'flan'
+
+        async def main():
+            return await asyncio.gather(*(flight.ado('hot', compute) for _ in range(50)))
+
+        assert asyncio.run(main()) == ['flan'] * 50
+        assert len(calls) == 1
+
+
+@pytest.mark.usefixtures('no_page_cache')
+class TestFlanDetailCache:
+
+    def test_cached_detail_skips_queries(self, client, free_flan, django_assert_num_queries):
+        client.get(reverse('flan-detail', args=[free_flan.id]))
+        with django_assert_num_queries(0):
+            response = client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert response.status_code == 200
+
+    def test_new_rating_invalidates_cached_detail(self, client, user, free_flan):
+        client.get(reverse('flan-detail', args=[free_flan.id]))
+        client.get(f'/api/flans/{free_flan.id}/')
+        FlanRating.objects.create(flan=free_flan, user=user, score=2)
+
+        response = client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert response.context['total_ratings'] == 1
+        assert client.get(f'/api/flans/{free_flan.id}/').json()['total_ratings'] == 1
+
+
+@pytest.mark.usefixtures('no_page_cache')
+class TestFlanDetailQueries:
+
+    def test_anonymous_miss_is_one_query(self, client, user, another_user, free_flan, django_assert_num_queries):
+        FlanRating.objects.create(flan=free_flan, user=user, score=5)
+        FlanRating.objects.create(flan=free_flan, user=another_user, score=2)
+        with django_assert_num_queries(1):
+            response = client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert response.context['avg_score'] == 3.5
+        assert response.context['total_ratings'] == 2
+        assert response.context['user_rating'] is None
+
+    def test_unrated_flan_stats(self, client, free_flan):
+        response = client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert response.context['avg_score'] == 0
+        assert response.context['total_ratings'] == 0
+
+    def test_authenticated_view_uses_shared_cache(self, client, auth_client, user, another_user, free_flan,
+                                                  django_assert_num_queries):
+        FlanRating.objects.create(flan=free_flan, user=user, score=4, review="Wobbly.")
+        FlanRating.objects.create(flan=free_flan, user=another_user, score=2)
+        client.get(reverse('flan-detail', args=[free_flan.id]))  # anonymous view fills the cache
+        # session + user + the user's own rating; the flan comes from the cache
+        with django_assert_num_queries(3):
+            response = auth_client.get(reverse('flan-detail', args=[free_flan.id]))
+        user_rating = response.context['user_rating']
+        assert (user_rating.score, user_rating.review) == (4, "Wobbly.")
+        assert response.context['total_ratings'] == 2
+
+    def test_authenticated_view_sees_own_new_rating(self, auth_client, user, free_flan):
+        url = reverse('flan-detail', args=[free_flan.id])
+        auth_client.get(url)
+        auth_client.post(reverse('flan-rate', args=[free_flan.id]), {'score': 5})
+        response = auth_client.get(url)
+        assert response.context['user_rating'].score == 5
+        assert response.context['total_ratings'] == 1
+
+    def test_authenticated_view_without_rating(self, auth_client, free_flan):
+        response = auth_client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert response.context['user_rating'] is None
+
+    def test_missing_flan_is_404(self, client, user):
+        assert client.get(reverse('flan-detail', args=[999999])).status_code == 404
+        client.login(username='flanfan', password='flanpassword123')
+        assert client.get(reverse('flan-detail', args=[999999])).status_code == 404
+
+
+# ============================================================
+# DELTA SYNC TESTS
+# ============================================================
+
+@pytest.fixture
+def settled_sync(settings):
+    """Treat every change as settled, so tokens advance to the newest event."""
+    settings.FLANS_SYNC_SETTLE_SECONDS = 0
+
+
+@pytest.mark.usefixtures('settled_sync')
+class TestFlanChangesAPI:
+
+    def test_full_snapshot_without_token(self, client, free_flan, premium_flan):
+        data = client.get('/api/flans/changes/').json()
+        assert [f['id'] for f in data['changed']] == [free_flan.id, premium_flan.id]
+        assert data['deleted'] == []
+        assert data['has_more'] is False
+        assert data['next_token']
+
+    def test_only_changes_after_token(self, client, free_flan, premium_flan):
+        token = client.get('/api/flans/changes/').json()['next_token']
+
+        free_flan.name = "Basic Vanilla v2"
+        free_flan.save()
+        premium_id = premium_flan.id
+        premium_flan.delete()
+
+        data = client.get(f'/api/flans/changes/?since={token}').json()
+        assert [f['name'] for f in data['changed']] == ["Basic Vanilla v2"]
+        assert data['deleted'] == [premium_id]
+
+        again = client.get(f"/api/flans/changes/?since={data['next_token']}").json()
+        assert again['changed'] == [] and again['deleted'] == []
+
+    def test_paging_with_limit_visits_every_flan_once(self, client, user):
+        flans = [
+            Flan.objects.create(name=f"Flan {i}", description="A flan.", creator=user)
+            for i in range(5)
+        ]
+        # Same updated_at for all rows: the token must still break ties by id
+        Flan.objects.update(updated_at=flans[0].updated_at)
+
+        seen, token, has_more = [], '', True
+        while has_more:
+            data = client.get(f'/api/flans/changes/?since={token}&limit=2').json()
+            seen += [f['id'] for f in data['changed']]
+            token, has_more = data['next_token'], data['has_more']
+        assert seen == [flan.id for flan in flans]
+
+    def test_invalid_token(self, client, db):
+        response = client.get('/api/flans/changes/?since=not-a-token')
+        assert response.status_code == 400
+
+
+class TestFlanChangesSettleWindow:
+
+    def test_late_commit_behind_the_token_is_delivered(self, client, user, free_flan):
+        from datetime import timedelta
+        Flan.objects.filter(pk=free_flan.pk).update(updated_at=free_flan.updated_at - timedelta(minutes=5))
+        fresh = Flan.objects.create(name="Fresh Flan", description="Just saved", creator=user)
+
+        first = client.get('/api/flans/changes/').json()
+        assert [f['id'] for f in first['changed']] == [free_flan.id, fresh.id]
+
+        # A transaction that stamped updated_at before `fresh` but committed after the read
+        late = Flan.objects.create(name="Late Flan", description="Slow transaction", creator=user)
+        Flan.objects.filter(pk=late.pk).update(updated_at=fresh.updated_at - timedelta(milliseconds=1))
+
+        data = client.get(f"/api/flans/changes/?since={first['next_token']}").json()
+        assert [f['id'] for f in data['changed']] == [late.id, fresh.id]
+
+    def test_unsettled_page_does_not_report_more(self, client, user):
+        for i in range(3):
+            Flan.objects.create(name=f"Flan {i}", description="A flan.", creator=user)
+        data = client.get('/api/flans/changes/?limit=2').json()
+        assert len(data['changed']) == 2
+        assert data['has_more'] is False
+        assert data['next_token'] == ''
+
+
+# ============================================================
+# WRITE-BEHIND RATING TESTS
+# ============================================================
+
+@pytest.fixture
+def rating_buffer(monkeypatch, settings):
+    from . import write_behind
+    settings.FLANS_RATING_WRITE_BEHIND = True
+    buffer = write_behind.RatingWriteBuffer(autostart=False)
+    monkeypatch.setattr(write_behind, 'rating_buffer', buffer)
+    return buffer
+
+
+class TestRatingWriteBehind:
+
+    def test_repeated_ratings_are_coalesced(self, db, user, another_user, free_flan):
+        from .write_behind import RatingWriteBuffer
+        buffer = RatingWriteBuffer(autostart=False)
+        buffer.submit(free_flan.id, user.id, 2)
+        buffer.submit(free_flan.id, user.id, 5, 'Changed my mind')
+        buffer.submit(free_flan.id, another_user.id, 3)
+        assert len(buffer) == 2
+
+        assert buffer.flush() == 2
+        assert len(buffer) == 0
+        assert FlanRating.objects.get(flan=free_flan, user=user).score == 5
+        assert FlanRating.objects.count() == 2
+
+    def test_flush_updates_existing_rating(self, db, user, free_flan):
+        from .write_behind import RatingWriteBuffer
+        FlanRating.objects.create(flan=free_flan, user=user, score=1)
+        buffer = RatingWriteBuffer(autostart=False)
+        buffer.submit(free_flan.id, user.id, 4)
+        buffer.flush()
+        assert FlanRating.objects.get(flan=free_flan, user=user).score == 4
+
+    def test_flush_skips_deleted_flans(self, db, user, free_flan):
+        from .write_behind import RatingWriteBuffer
+        buffer = RatingWriteBuffer(autostart=False)
+        buffer.submit(free_flan.id, user.id, 4)
+        free_flan.delete()
+        assert buffer.flush() == 0
+        assert len(buffer) == 0
+
+    def test_flush_skips_deleted_users_and_keeps_submission_time(self, db, user, another_user, free_flan):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .write_behind import RatingWriteBuffer
+        buffer = RatingWriteBuffer(autostart=False)
+        pending = buffer.submit(free_flan.id, user.id, 4)
+        pending.submitted_at = timezone.now() - timedelta(minutes=1)
+        buffer.submit(free_flan.id, another_user.id, 2)
+        another_user.delete()
+
+        assert buffer.flush() == 1
+        assert len(buffer) == 0
+        rating = FlanRating.objects.get()
+        assert rating.created_at == pending.submitted_at
+        assert rating.updated_at > rating.created_at
+
+    def test_integrity_error_drops_only_the_offending_rating(self, db, user, another_user, free_flan,
+                                                             monkeypatch):
+        from django.db import IntegrityError
+        from .write_behind import RatingWriteBuffer
+        buffer = RatingWriteBuffer(autostart=False)
+        buffer.submit(free_flan.id, user.id, 4)
+        buffer.submit(free_flan.id, another_user.id, 2)
+
+        original = RatingWriteBuffer._write
+
+        def write(self, ratings):
+            # As if another_user vanished between the liveness check and the insert
+            if any(rating.user_id == another_user.id for rating in ratings):
+                raise IntegrityError("FOREIGN KEY constraint failed")
+            original(self, ratings)
+
+        monkeypatch.setattr(RatingWriteBuffer, '_write', write)
+        assert buffer.flush() == 1
+        assert len(buffer) == 0
+        assert FlanRating.objects.get().user == user
+
+    def test_view_queues_rating_and_reads_own_write(self, auth_client, free_flan, rating_buffer):
+        auth_client.post(reverse('flan-rate', args=[free_flan.id]), {'score': 4})
+        assert FlanRating.objects.count() == 0
+
+        response = auth_client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert response.context['user_rating'].score == 4
+
+        rating_buffer.flush()
+        assert FlanRating.objects.get(flan=free_flan).score == 4
+
+    def test_api_returns_accepted_and_lists_pending(self, auth_client, free_flan, rating_buffer):
+        url = f'/api/flans/{free_flan.id}/ratings/'
+        response = auth_client.post(url, {'score': 5}, content_type='application/json')
+        assert response.status_code == 202
+        assert response.json()['score'] == 5
+        assert auth_client.get(url).json()[0]['score'] == 5
+
+
+# ============================================================
+# SUBSCRIBER IMPORT TESTS
+# ============================================================
+
+class TestSubscriberImport:
+
+    def test_import_normalizes_dedupes_and_counts(self, db):
+        from .services import SubscriberService
+        Subscriber.objects.create(email='existing@example.com')
+        rows = [
+            {'email': ' New@Example.com ', 'name': 'New'},
+            {'email': 'new@example.com'},
+            {'email': 'EXISTING@example.com'},
+            {'email': 'not-an-email'},
+            {},
+        ]
+        result = SubscriberService.import_subscribers(rows, batch_size=2)
+        assert (result.inserted, result.duplicates, result.invalid) == (1, 2, 2)
+        assert Subscriber.objects.get(email='new@example.com').name == 'New'
+
+    def test_existing_emails_match_case_insensitively(self, db):
+        from .services import SubscriberService
+        Subscriber.objects.create(email='Mixed.Case@Example.com')
+        result = SubscriberService.import_subscribers([{'email': 'mixed.case@example.com'}])
+        assert (result.inserted, result.duplicates) == (0, 1)
+        assert Subscriber.objects.count() == 1
+
+    def test_rows_skipped_by_conflicts_are_not_counted(self, db, monkeypatch):
+        from .services import SubscriberService
+        lookup = SubscriberService._subscribed_emails
+        calls = []
+
+        def racing_lookup(emails):
+            calls.append(emails)
+            if len(calls) == 1:
+                # Another import commits the address right after our lookup
+                Subscriber.objects.create(email='race@example.com')
+                return set()
+            return lookup(emails)
+
+        monkeypatch.setattr(SubscriberService, '_subscribed_emails', staticmethod(racing_lookup))
+        result = SubscriberService.import_subscribers([{'email': 'race@example.com'}, {'email': 'ok@example.com'}])
+        assert (result.inserted, result.duplicates) == (1, 1)
+
+    def test_case_insensitive_lookup_uses_index(self, db):
+        from .query_plans import capture_plans
+        from .services import SubscriberService
+        with capture_plans() as plans:
+            SubscriberService._subscribed_emails(['a@example.com'])
+        assert 'subscriber_email_lower_idx' in str(plans[0])
+
+    def test_csv_without_header_uses_first_column(self):
+        from .importers import iter_csv_rows
+        rows = list(iter_csv_rows(['a@example.com\n', 'b@example.com\n']))
+        assert rows == [{'email': 'a@example.com'}, {'email': 'b@example.com'}]
+
+    def test_api_import_requires_staff(self, auth_client):
+        response = auth_client.post('/api/subscribers/import/', {})
+        assert response.status_code == 403
+
+    def test_api_import_ndjson_upload(self, staff_client):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile(
+            'partners.ndjson',
+            b'{"email": "a@example.com", "name": "A"}\n{"email": "a@example.com"}\nnope\n',
+        )
+        response = staff_client.post('/api/subscribers/import/', {'file': upload})
+        assert response.status_code == 200
+        data = response.json()
+        assert (data['inserted'], data['duplicates'], data['invalid']) == (1, 1, 1)
+
+    def test_import_command(self, db, tmp_path):
+        from django.core.management import call_command
+        path = tmp_path / 'partners.csv'
+        path.write_text('email,name\nx@example.com,X\ny@example.com,Y\n')
+        call_command('import_subscribers', str(path))
+        assert Subscriber.objects.count() == 2
+
+
+# ============================================================
+# FRAGMENT CACHE TESTS
+# ============================================================
+
+@pytest.mark.usefixtures('no_page_cache')
+class TestFlanListFragmentCache:
+
+    def test_warm_grid_skips_flan_query(self, client, free_flan):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as cold:
+            client.get(reverse('flan-list'))
+        with CaptureQueriesContext(connection) as warm:
+            response = client.get(reverse('flan-list'))
+
+        assert len(warm) < len(cold)
+        assert not [q for q in warm.captured_queries if 'flans_flan' in q['sql']]
+        assert free_flan.name in response.content.decode()
+
+    def test_warm_list_skips_count_and_analytics(self, client, free_flan):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        client.get(reverse('flan-list'))
+        with CaptureQueriesContext(connection) as warm:
+            client.get(reverse('flan-list'))
+
+        sql = [q['sql'] for q in warm.captured_queries]
+        assert not [q for q in sql if 'COUNT(' in q.upper()]
+        assert not [q for q in sql if 'flans_subscriber' in q or 'flans_flanrating' in q]
+
+    def test_count_follows_writes(self, client, user, free_flan):
+        client.get(reverse('flan-list'))
+        Flan.objects.create(name="Second Flan", description="Another one.", creator=user)
+        response = client.get(reverse('flan-list'))
+        assert response.context['total_flans'] == '2'
+
+    def test_page_size_setting(self, client, settings, user):
+        settings.FLANS_LIST_PAGE_SIZE = 2
+        for i in range(3):
+            Flan.objects.create(name=f"Flan {i}", description="Paged.", creator=user)
+        response = client.get(reverse('flan-list'))
+        assert len(response.context['page_obj']) == 2
+        assert response.context['page_obj'].paginator.num_pages == 2
+
+    def test_flan_change_refreshes_grid(self, client, user, free_flan):
+        client.get(reverse('flan-list'))
+        Flan.objects.create(
+            name="Brand New Flan", description="Fresh out of the oven.", creator=user)
+        response = client.get(reverse('flan-list'))
+        assert "Brand New Flan" in response.content.decode()
+
+    def test_grid_cached_per_type(self, client, free_flan, premium_flan):
+        client.get(reverse('flan-list') + '?type=vanilla')
+        response = client.get(reverse('flan-list') + '?type=chocolate')
+        content = response.content.decode()
+        assert premium_flan.name in content
+        assert free_flan.name not in content
+
+
+# ============================================================
+# CREATORS LIST TESTS
+# ============================================================
+
+class TestCreatorsListView:
+
+    def _make_creators(self, user, count):
+        for i in range(count):
+            creator = FlanCreator.objects.create(
+                name=f"Creator {i}",
+                creator_type=['grandma', 'chef', 'influencer', 'amateur'][i % 4],
+                bio="Makes flans.",
+                is_featured=i % 2 == 0,
+                total_earnings=Decimal('100.00'),
+                satisfaction_rate=90,
+            )
+            Flan.objects.create(
+                name=f"Flan {i}", description="A flan.", creator=user,
+                featured_creator=creator)
+
+    def test_creators_list_query_count_is_constant(self, client, user, django_assert_max_num_queries):
+        self._make_creators(user, 12)
+        with django_assert_max_num_queries(2):
+            response = client.get(reverse('creators-list'))
+        assert response.status_code == 200
+        assert response.context['total_creators'] == 12
+        assert len(response.context['grandma_creators']) == 3
+        assert len(response.context['featured_creators']) == 6
+        assert response.context['total_earnings'] == Decimal('1200.00')
+        assert response.context['avg_satisfaction'] == 90
+
+    def test_creators_list_uses_annotated_counts(self, client, creator, free_flan):
+        response = client.get(reverse('creators-list'))
+        assert response.context['featured_creators'][0].total_flans == 1
+
+    def test_api_creators_list_query_count(self, client, user, django_assert_max_num_queries):
+        self._make_creators(user, 5)
+        with django_assert_max_num_queries(1):
+            response = client.get('/api/creators/')
+        assert all(c['total_flans'] == 1 for c in response.json())
+
+
+# ============================================================
+# CREATOR DETAIL TESTS
+# ============================================================
+
+class TestCreatorDetail:
+
+    def _make_flans(self, user, creator, count):
+        for i in range(count):
+            Flan.objects.create(
+                name=f"Flan {i}", description="A flan.", creator=user,
+                featured_creator=creator, is_premium=i % 4 == 0,
+                price=Decimal('9.99') if i % 4 == 0 else Decimal('0.00'))
+
+    def test_creator_detail_paginates_with_cursor(self, client, user, creator):
+        from .views import CREATOR_FLANS_PER_PAGE
+        self._make_flans(user, creator, CREATOR_FLANS_PER_PAGE + 3)
+        url = reverse('creator-detail', args=[creator.id])
+
+        first = client.get(url)
+        assert len(first.context['creator_flans']) == CREATOR_FLANS_PER_PAGE
+        assert first.context['next_cursor']
+
+        second = client.get(url, {'after': first.context['next_cursor']})
+        assert len(second.context['creator_flans']) == 3
+        assert second.context['next_cursor'] is None
+        seen = {f.id for f in first.context['creator_flans']} | {f.id for f in second.context['creator_flans']}
+        assert len(seen) == CREATOR_FLANS_PER_PAGE + 3
+
+    def test_creator_detail_bad_cursor_falls_back_to_first_page(self, client, creator, free_flan):
+        response = client.get(reverse('creator-detail', args=[creator.id]), {'after': 'garbage'})
+        assert response.status_code == 200
+        assert list(response.context['creator_flans']) == [free_flan]
+
+    def test_creator_detail_stats(self, client, user, another_user, creator):
+        self._make_flans(user, creator, 4)
+        flan = Flan.objects.filter(featured_creator=creator).first()
+        FlanRating.objects.create(flan=flan, user=user, score=5)
+        FlanRating.objects.create(flan=flan, user=another_user, score=4)
+
+        response = client.get(reverse('creator-detail', args=[creator.id]))
+        stats = response.context['creator_stats']
+        assert stats.flan_count == 4
+        assert stats.premium_count == 1
+        assert stats.premium_share == 25.0
+        assert stats.total_ratings == 2
+        assert stats.avg_rating == 4.5
+        assert response.context['flans_count_display'] == "4 incredible flans"
+
+    def test_creator_stats_invalidated_on_flan_change(self, client, user, creator, free_flan):
+        url = reverse('creator-detail', args=[creator.id])
+        assert client.get(url).context['creator_stats'].flan_count == 1
+        self._make_flans(user, creator, 2)
+        assert client.get(url).context['creator_stats'].flan_count == 3
+
+    @pytest.mark.usefixtures('no_page_cache')
+    def test_creator_stats_invalidated_for_old_creator(self, client, creator, free_flan):
+        other = FlanCreator.objects.create(name="Other Creator", bio="Also makes flans.")
+        url = reverse('creator-detail', args=[creator.id])
+        assert client.get(url).context['creator_stats'].flan_count == 1
+
+        free_flan.featured_creator = other
+        free_flan.save()
+
+        assert client.get(url).context['creator_stats'].flan_count == 0
+        other_url = reverse('creator-detail', args=[other.id])
+        assert client.get(other_url).context['creator_stats'].flan_count == 1
+
+    def test_creator_detail_query_count_is_constant(self, client, user, creator, django_assert_max_num_queries):
+        self._make_flans(user, creator, 40)
+        url = reverse('creator-detail', args=[creator.id])
+        client.get(url)  # warm the stats cache
+        with django_assert_max_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == 200
+
+    def test_api_creator_detail(self, client, user, creator):
+        self._make_flans(user, creator, 15)
+        response = client.get(f'/api/creators/{creator.id}/')
+        data = response.json()
+        assert response.status_code == 200
+        assert data['total_flans'] == 15
+        assert data['stats']['premium_count'] == 4
+        assert len(data['flans']) == 12
+
+        more = client.get(f'/api/creators/{creator.id}/', {'after': data['next_cursor']}).json()
+        assert len(more['flans']) == 3
+        assert more['next_cursor'] is None
+
+    def test_api_creator_detail_bad_cursor(self, client, creator):
+        response = client.get(f'/api/creators/{creator.id}/', {'after': 'nope'})
+        assert response.status_code == 400
+
+
+# ============================================================
+# COUNTING STRATEGY TESTS
+# ============================================================
+
+class TestCountingPaginator:
+
+    def test_exact_mode_counts(self, settings, free_flan, premium_flan):
+        from .pagination import CountingPaginator
+        settings.FLANS_COUNT_MODE = 'exact'
+        paginator = CountingPaginator(Flan.objects.all(), 10)
+        assert paginator.count == 2
+        assert not paginator.count_is_estimate
+        assert paginator.count_display == "2"
+
+    def test_cached_mode_reuses_count(self, settings, free_flan, django_assert_num_queries):
+        from .pagination import CountingPaginator
+        settings.FLANS_COUNT_MODE = 'cached'
+        assert CountingPaginator(Flan.objects.all(), 10).count == 1
+        with django_assert_num_queries(0):
+            assert CountingPaginator(Flan.objects.all(), 10).count == 1
+
+    def test_estimated_mode_over_threshold(self, settings, free_flan, premium_flan):
+        from .pagination import CountingPaginator
+        settings.FLANS_COUNT_MODE = 'estimated'
+        settings.FLANS_COUNT_ESTIMATE_THRESHOLD = 2
+        paginator = CountingPaginator(Flan.objects.all(), 10, estimate=lambda: 50_000)
+        assert paginator.count == 50_000
+        assert paginator.count_is_estimate
+        assert paginator.count_display == "2+"
+
+    def test_estimated_mode_under_threshold_is_exact(self, settings, free_flan):
+        from .pagination import CountingPaginator
+        settings.FLANS_COUNT_MODE = 'estimated'
+        paginator = CountingPaginator(Flan.objects.all(), 10, estimate=lambda: 1)
+        assert paginator.count == 1
+        assert not paginator.count_is_estimate
+
+    def test_flan_group_counts_follow_signals(self, user, free_flan, premium_flan):
+        from .counting import estimate_flan_count
+        assert estimate_flan_count() == 2
+        assert estimate_flan_count(is_premium=True) == 1
+        assert estimate_flan_count(flan_type=free_flan.flan_type) >= 1
+        Flan.objects.create(name="Extra", description="More flan.", creator=user, is_premium=True)
+        assert estimate_flan_count(is_premium=True) == 2
+        premium_flan.delete()
+        assert estimate_flan_count(is_premium=True) == 1
+
+    def test_flan_group_counts_follow_moves(self, free_flan):
+        from .counting import estimate_flan_count
+        free_flan.flan_type = Flan.FlanType.COFFEE
+        free_flan.is_premium = True
+        free_flan.price = Decimal('4.50')
+        free_flan.save()
+        assert estimate_flan_count(flan_type=Flan.FlanType.VANILLA) == 0
+        assert estimate_flan_count(flan_type=Flan.FlanType.COFFEE, is_premium=True) == 1
+        assert estimate_flan_count() == 1
+
+    def test_flan_group_counts_skip_group_by(self, free_flan, premium_flan):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .counting import get_flan_group_counts
+        with CaptureQueriesContext(connection) as queries:
+            get_flan_group_counts()
+        assert len(queries) == 1
+        assert 'flans_flangroupcount' in queries[0]['sql']
+
+    def test_rebuild_flan_group_counts(self, user, free_flan, premium_flan):
+        from .counting import estimate_flan_count, rebuild_flan_group_counts
+        Flan.objects.bulk_create([Flan(name="Bulk", description="No signals.", creator=user)])
+        assert estimate_flan_count() == 2
+        rebuild_flan_group_counts()
+        assert estimate_flan_count() == 3
+        assert estimate_flan_count(is_premium=True) == 1
+
+    def test_flan_list_shows_estimate(self, client, settings, free_flan, premium_flan):
+        settings.FLANS_COUNT_MODE = 'estimated'
+        settings.FLANS_COUNT_ESTIMATE_THRESHOLD = 2
+        response = client.get(reverse('flan-list'))
+        assert response.context['total_flans'] == "2+"
+        assert response.context['total_flans_is_estimate']
+
+    def test_admin_changelist_uses_counting_paginator(self, staff_client, free_flan):
+        staff = User.objects.get(username='flanadmin')
+        staff.is_superuser = True
+        staff.save()
+        response = staff_client.get('/admin/flans/flan/')
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 1
+
+
+# ============================================================
+# TEMPLATE WARMUP TESTS
+# ============================================================
+
+class TestTemplateWarmup:
+
+    def test_template_names_cover_app_templates(self):
+        from .warmup import get_template_names
+        names = get_template_names()
+        assert 'flans/list.html' in names
+        assert 'flans/emails/weekly_digest.html' in names
+
+    def test_warm_templates_compiles_everything(self):
+        from .warmup import get_template_names, warm_templates
+        assert set(warm_templates()) == set(get_template_names())
+
+    def test_warm_on_boot_respects_setting(self, settings, monkeypatch):
+        from . import warmup
+        calls = []
+        monkeypatch.setattr(warmup, 'warm_templates', lambda: calls.append(1))
+        settings.FLANS_WARM_TEMPLATES_ON_BOOT = False
+        warmup.warm_on_boot()
+        settings.FLANS_WARM_TEMPLATES_ON_BOOT = True
+        warmup.warm_on_boot()
+        assert calls == [1]
+
+
+# ============================================================
+# STATIC ASSET TESTS
+# ============================================================
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    from django.core.management import call_command
+    from .static_views import get_hashed_names
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'flans.storage.CompressedManifestStaticFilesStorage'},
+    }
+    call_command('collectstatic', '--noinput', verbosity=0)
+    get_hashed_names.cache_clear()
+    yield tmp_path
+    get_hashed_names.cache_clear()
+
+
+class TestStaticAssets:
+
+    def test_pages_link_stylesheets_instead_of_inlining(self, client, free_flan, creator):
+        pages = {
+            reverse('flan-list'): 'flans/css/list.css',
+            reverse('creators-list'): 'flans/css/creators.css',
+            reverse('creator-detail', args=[creator.id]): 'flans/css/creator_detail.css',
+        }
+        for url, stylesheet in pages.items():
+            content = client.get(url).content.decode()
+            assert '<style>' not in content, url
+            assert 'flans/css/base.css' in content
+            assert stylesheet in content
+
+    def test_collectstatic_writes_hashed_gzip_variants(self, collected_static):
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        hashed = staticfiles_storage.stored_name('flans/css/list.css')
+        assert hashed != 'flans/css/list.css'
+        assert (collected_static / (hashed + '.gz')).exists()
+
+    def test_serve_hashed_compressed_with_long_cache(self, rf, collected_static):
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        from .static_views import serve_static
+        hashed = staticfiles_storage.stored_name('flans/css/list.css')
+        response = serve_static(rf.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate'), hashed)
+        assert response['Content-Encoding'] == 'gzip'
+        assert response['Content-Type'] == 'text/css'
+        assert 'immutable' in response['Cache-Control']
+        assert 'Accept-Encoding' in response['Vary']
+
+    def test_serve_unhashed_uncompressed_with_short_cache(self, rf, collected_static):
+        from .static_views import serve_static
+        response = serve_static(rf.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0'), 'flans/css/list.css')
+        assert 'Content-Encoding' not in response
+        assert 'immutable' not in response['Cache-Control']
+
+    def test_serve_rejects_path_traversal(self, rf, collected_static):
+        from django.http import Http404
+        from .static_views import serve_static
+        with pytest.raises(Http404):
+            serve_static(rf.get('/'), '../settings.py')
+
+
+# ============================================================
+# THUMBNAIL TESTS
+# ============================================================
+
+@pytest.fixture
+def source_image(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    path = tmp_path / 'flan.png'
+    Image.new('RGB', (800, 600), (220, 160, 60)).save(path)
+    return path
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    return settings.MEDIA_ROOT
+
+
+class TestThumbnails:
+
+    def test_build_writes_every_variant(self, source_image, media_root):
+        from PIL import Image
+        from .thumbnails import THUMBNAIL_WIDTHS, build_thumbnails, thumbnail_name
+        digest = build_thumbnails(source_image.read_bytes())
+        for width in THUMBNAIL_WIDTHS:
+            for ext in ('webp', 'jpg'):
+                with Image.open(media_root / thumbnail_name(digest, width, ext)) as thumb:
+                    assert thumb.width == width
+                    assert thumb.height == width * 3 // 4
+
+    def test_build_is_content_addressed(self, source_image, media_root):
+        from .thumbnails import build_thumbnails
+        data = source_image.read_bytes()
+        assert build_thumbnails(data) == build_thumbnails(data)
+        assert len(list(media_root.rglob('*.webp'))) == 3
+
+    def test_ingest_stores_hash_from_file_url(self, source_image, media_root, free_flan):
+        from .thumbnails import ingest
+        free_flan.image_url = source_image.as_uri()
+        free_flan.save()
+        digest = ingest(free_flan, allow_local=True)
+        free_flan.refresh_from_db()
+        assert free_flan.image_hash == digest
+
+    def test_unreadable_source_raises(self, tmp_path, media_root):
+        pytest.importorskip('PIL')
+        from .exceptions import ThumbnailError
+        from .thumbnails import build_thumbnails, fetch_source
+        bogus = tmp_path / 'not-an-image.png'
+        bogus.write_bytes(b'flan')
+        with pytest.raises(ThumbnailError):
+            build_thumbnails(fetch_source(str(bogus), allow_local=True))
+        with pytest.raises(ThumbnailError):
+            fetch_source(str(tmp_path / 'missing.png'), allow_local=True)
+
+    @pytest.mark.parametrize('source', [
+        'http://127.0.0.1/flan.png',
+        'http://localhost:8000/flan.png',
+        'https://10.0.0.7/flan.png',
+        'http://169.254.169.254/latest/meta-data/',
+        'http://[::1]/flan.png',
+        'ftp://example.com/flan.png',
+        'file:///etc/passwd',
+        '/etc/passwd',
+    ])
+    def test_fetch_rejects_unsafe_sources(self, source):
+        from .exceptions import ThumbnailError
+        from .thumbnails import fetch_source
+        with pytest.raises(ThumbnailError):
+            fetch_source(source)
+
+    def test_redirects_are_checked(self):
+        import urllib.request
+        from .exceptions import ThumbnailError
+        from .thumbnails import _CheckedRedirectHandler
+        request = urllib.request.Request('https://example.com/flan.png')
+        with pytest.raises(ThumbnailError):
+            _CheckedRedirectHandler().redirect_request(
+                request, None, 302, 'Found', {}, 'http://127.0.0.1/admin/')
+
+    def test_command_skips_local_files_without_flag(self, source_image, media_root, user):
+        from django.core.management import call_command
+        Flan.objects.create(name="Flan", description="A flan.", creator=user,
+                            image_url=source_image.as_uri())
+        out = io.StringIO()
+        call_command('generate_thumbnails', '--model', 'flans', stdout=out)
+        assert Flan.objects.get().image_hash == ''
+        assert '1 failed' in out.getvalue()
+
+    def test_list_renders_srcset_once_hashed(self, client, source_image, media_root, free_flan):
+        from .thumbnails import ingest
+        content = client.get(reverse('flan-list')).content.decode()
+        assert 'srcset' not in content
+
+        free_flan.image_url = source_image.as_uri()
+        free_flan.save()
+        digest = ingest(free_flan, allow_local=True)
+        content = client.get(reverse('flan-list')).content.decode()
+        assert f'{digest}-320.webp 320w' in content
+        assert 'type="image/webp"' in content
+
+    def test_generate_thumbnails_command(self, source_image, media_root, user, creator):
+        from django.core.management import call_command
+        for i in range(3):
+            Flan.objects.create(name=f"Flan {i}", description="A flan.", creator=user,
+                                image_url=source_image.as_uri())
+        creator.profile_image = source_image.as_uri()
+        creator.save()
+
+        call_command('generate_thumbnails', '--workers', '2', '--allow-local-files', stdout=io.StringIO())
+        hashes = set(Flan.objects.values_list('image_hash', flat=True))
+        assert len(hashes) == 1 and '' not in hashes
+        creator.refresh_from_db()
+        assert creator.profile_image_hash in hashes
+
+    def test_generate_thumbnails_touches_updated_rows(self, source_image, media_root, user, creator):
+        from django.core.management import call_command
+        from .caching import get_catalog_generation
+        flan = Flan.objects.create(name="Flan", description="A flan.", creator=user,
+                                   image_url=source_image.as_uri())
+        creator.profile_image = source_image.as_uri()
+        creator.save()
+        flan_stamp, creator_stamp = flan.updated_at, creator.updated_at
+
+        generation = get_catalog_generation()
+        call_command('generate_thumbnails', '--model', 'creators', '--allow-local-files', stdout=io.StringIO())
+        assert get_catalog_generation() != generation
+        call_command('generate_thumbnails', '--model', 'flans', '--allow-local-files', stdout=io.StringIO())
+        flan.refresh_from_db()
+        creator.refresh_from_db()
+        assert flan.updated_at > flan_stamp
+        assert creator.updated_at > creator_stamp
+
+    def test_new_picture_clears_hash(self, free_flan, creator):
+        free_flan.image_hash = creator.profile_image_hash = 'a' * 32
+        free_flan.save(update_fields=['image_hash'])
+        creator.save(update_fields=['profile_image_hash'])
+
+        free_flan.description = "Same picture, new words."
+        free_flan.save()
+        free_flan.refresh_from_db()
+        assert free_flan.image_hash == 'a' * 32
+
+        free_flan.image_url = 'https://example.com/new-flan.jpg'
+        free_flan.save(update_fields=['image_url'])
+        creator.profile_image = 'https://example.com/new-face.jpg'
+        creator.save()
+        free_flan.refresh_from_db()
+        creator.refresh_from_db()
+        assert free_flan.image_hash == creator.profile_image_hash == ''
+
+    def test_generate_thumbnails_redoes_changed_pictures(self, tmp_path, source_image, media_root, user):
+        from PIL import Image
+        from django.core.management import call_command
+        flan = Flan.objects.create(name="Flan", description="A flan.", creator=user,
+                                   image_url=source_image.as_uri())
+        call_command('generate_thumbnails', '--model', 'flans', '--allow-local-files', stdout=io.StringIO())
+        flan.refresh_from_db()
+        old_hash = flan.image_hash
+
+        other = tmp_path / 'other.png'
+        Image.new('RGB', (400, 300), (90, 40, 20)).save(other)
+        flan.image_url = other.as_uri()
+        flan.save()
+        call_command('generate_thumbnails', '--model', 'flans', '--allow-local-files', stdout=io.StringIO())
+        flan.refresh_from_db()
+        assert flan.image_hash not in ('', old_hash)
+
+
+
+# ============================================================
+# ANONYMOUS PAGE CACHE TESTS
+# ============================================================
+
+class TestAnonymousPageCache:
+
+    def test_page_carries_validators(self, client, free_flan):
+        response = client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert response.has_header('ETag')
+        assert response.has_header('Last-Modified')
+        assert 'must-revalidate' in response['Cache-Control']
+
+    def test_conditional_get_is_304_with_one_query(self, client, free_flan, django_assert_num_queries):
+        url = reverse('flan-detail', args=[free_flan.id])
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_cache_hit_skips_render(self, client, free_flan, django_assert_num_queries):
+        url = reverse('creators-list')
+        first = client.get(url)
+        with django_assert_num_queries(1):
+            second = client.get(url)
+        assert second.content == first.content
+        assert second.context is None  # served from cache, no template rendered
+
+    def test_rating_changes_etag(self, client, user, free_flan):
+        url = reverse('flan-detail', args=[free_flan.id])
+        etag = client.get(url)['ETag']
+        FlanRating.objects.create(flan=free_flan, user=user, score=5)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert response.context['total_ratings'] == 1
+
+    def test_deleting_flan_changes_list_etag(self, client, free_flan, premium_flan):
+        url = reverse('flan-list')
+        etag = client.get(url)['ETag']
+        premium_flan.delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert premium_flan.name not in response.content.decode()
+
+    def test_flan_leaving_filter_changes_list_etag(self, client, user, free_flan):
+        # The newest vanilla flan stays put, so only the moved one can date the page
+        Flan.objects.create(name="Staying Vanilla", description="Not going anywhere.", creator=user)
+        url = reverse('flan-list') + f'?type={free_flan.flan_type}'
+        etag = client.get(url)['ETag']
+        free_flan.flan_type = Flan.FlanType.COFFEE
+        free_flan.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert free_flan.name not in response.content.decode()
+
+    def test_reassigned_flan_changes_old_creator_etag(self, client, user, creator, free_flan):
+        Flan.objects.create(name="Staying Put", description="Still featured.", creator=user,
+                            featured_creator=creator)
+        url = reverse('creator-detail', args=[creator.id])
+        etag = client.get(url)['ETag']
+        free_flan.featured_creator = FlanCreator.objects.create(name="New Home", bio="Takes in flans.")
+        free_flan.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert free_flan.name not in response.content.decode()
+
+    def test_creator_edit_changes_creator_etag(self, client, creator):
+        url = reverse('creator-detail', args=[creator.id])
+        etag = client.get(url)['ETag']
+        creator.bio = "Now with extra caramel."
+        creator.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert "extra caramel" in response.content.decode()
+
+    def test_session_requests_bypass_cache(self, auth_client, free_flan):
+        url = reverse('flan-detail', args=[free_flan.id])
+        first = auth_client.get(url)
+        assert not first.has_header('ETag')
+        assert auth_client.get(url).context is not None
+
+    def test_cached_page_gets_fresh_csrf_token(self, free_flan):
+        url = reverse('flan-list')
+        first = Client(enforce_csrf_checks=True).get(url)
+        second_client = Client(enforce_csrf_checks=True)
+        second = second_client.get(url)
+        assert second.context is None  # cache hit
+
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', second.content.decode()).group(1)
+        assert token != '__flans_csrf_token__'
+        assert 'private' in second['Cache-Control']
+        response = second_client.post(
+            reverse('subscribe'), {'email': 'new@flan.com', 'csrfmiddlewaretoken': token})
+        assert response.status_code != 403
+        assert first.content != second.content
+
+    def test_missing_flan_still_404(self, client, db):
+        assert client.get(reverse('flan-detail', args=[424242])).status_code == 404
+
+
+# ============================================================
+# SQLITE PROFILE TESTS
+# ============================================================
+
+class TestSQLiteProfile:
+
+    def test_pragmas_applied_on_connect(self, settings, db):
+        from django.db import connection
+        from .db import apply_sqlite_pragmas
+        # (the test runs inside a transaction, where some pragmas can't change)
+        settings.FLANS_SQLITE_PRAGMAS = {'busy_timeout': 4321, 'cache_size': -2000}
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            assert cursor.execute('PRAGMA busy_timeout').fetchone()[0] == 4321
+            assert cursor.execute('PRAGMA cache_size').fetchone()[0] == -2000
+
+    def test_read_only_connections_skip_journal_mode(self):
+        from .db import DEFAULT_SQLITE_PRAGMAS, pragma_statements
+        read_only = pragma_statements(DEFAULT_SQLITE_PRAGMAS, read_only=True)
+        assert not any('journal_mode' in statement for statement in read_only)
+        assert 'PRAGMA journal_mode = wal' in pragma_statements(DEFAULT_SQLITE_PRAGMAS)
+
+    def test_production_profile_routes_safe_methods_to_read_only_alias(self, rf, settings, monkeypatch):
+        from . import db
+        from .db import READ_ONLY_ALIAS, ReplicaMiddleware, ReplicaRouter
+        monkeypatch.setattr(db, 'get_replica_aliases', lambda: [READ_ONLY_ALIAS])
+        settings.FLANS_REPLICA_ALIASES = [READ_ONLY_ALIAS]
+        settings.FLANS_REPLICA_SAFE_METHODS = True
+        seen = []
+        middleware = ReplicaMiddleware(lambda request: seen.append(ReplicaRouter().db_for_read(Flan)) or HttpResponse())
+        middleware(rf.get('/'))
+        middleware(rf.post('/'))
+        assert seen == [READ_ONLY_ALIAS, None]
+        assert not ReplicaRouter().allow_migrate(READ_ONLY_ALIAS, 'flans')
+
+
+# ============================================================
+# REPLICA ROUTING TESTS
+# ============================================================
+
+@pytest.fixture
+def replica_choices(monkeypatch):
+    """
+    Make 'default' the only replica and record each time the router picks
+    one, so routing can be observed against the single test database.
+    """
+    from . import db
+    chosen = []
+
+    def choose(aliases):
+        chosen.append(aliases[0])
+        return aliases[0]
+
+    monkeypatch.setattr(db, 'get_replica_aliases', lambda: ['default'])
+    monkeypatch.setattr(db, 'choose_replica', choose)
+    return chosen
+
+
+@pytest.fixture
+def replica_client(client, settings, replica_choices):
+    settings.DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+    settings.MIDDLEWARE = settings.MIDDLEWARE + ['flans.db.ReplicaMiddleware']
+    return client
+
+
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica_only_when_marked(self, replica_choices):
+        from .db import ReplicaRouter, replica_reads
+        router = ReplicaRouter()
+        assert router.db_for_read(Flan) is None
+        with replica_reads():
+            assert router.db_for_read(Flan) == 'default'
+            assert router.db_for_write(Flan) == 'default'
+        assert router.db_for_read(Flan) is None
+        assert replica_choices == ['default']
+
+    def test_no_replicas_configured_is_a_no_op(self):
+        from .db import ReplicaRouter, replica_reads
+        with replica_reads():
+            assert ReplicaRouter().db_for_read(Flan) is None
+
+    def test_replica_aliases_must_exist(self, settings):
+        from .db import get_replica_aliases
+        settings.FLANS_REPLICA_ALIASES = ['default', 'missing']
+        assert get_replica_aliases() == ['default']
+
+    def test_replicas_are_never_migrated(self, settings):
+        from .db import ReplicaRouter
+        settings.FLANS_REPLICA_ALIASES = ['replica']
+        assert not ReplicaRouter().allow_migrate('replica', 'flans')
+        assert ReplicaRouter().allow_migrate('default', 'flans')
+
+    def test_write_sets_pin_cookie(self, rf):
+        from .db import PIN_COOKIE_NAME, ReplicaMiddleware, ReplicaRouter
+
+        def view(request):
+            ReplicaRouter().db_for_write(Flan)
+            return HttpResponse()
+
+        response = ReplicaMiddleware(view)(rf.post('/'))
+        cookie = response.cookies[PIN_COOKIE_NAME]
+        assert cookie['max-age'] == 5
+        assert cookie['httponly']
+
+        read_only = ReplicaMiddleware(lambda request: HttpResponse())(rf.get('/'))
+        assert PIN_COOKIE_NAME not in read_only.cookies
+
+    def test_async_write_sets_pin_cookie(self, rf):
+        import asyncio
+        from asgiref.sync import iscoroutinefunction
+        from .db import PIN_COOKIE_NAME, ReplicaMiddleware, ReplicaRouter
+
+        async def view(request):
+            ReplicaRouter().db_for_write(Flan)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(view)
+        assert iscoroutinefunction(middleware)
+        assert PIN_COOKIE_NAME in asyncio.run(middleware(rf.post('/'))).cookies
+
+    def test_asgi_middleware_chain_is_not_adapted(self, settings, caplog):
+        import logging
+        from asgiref.sync import SyncToAsync
+        from django.core.handlers.asgi import ASGIHandler
+        # The production chain, with profiling on (the query budget is a development aid)
+        settings.MIDDLEWARE = settings.MIDDLEWARE + ['flans.db.ReplicaMiddleware']
+        settings.FLANS_SQL_PROFILING = True
+        settings.FLANS_QUERY_BUDGET_WARNINGS = False
+        settings.DEBUG = True  # Django only logs adaptations in debug mode
+        with caplog.at_level(logging.DEBUG, logger='django.request'):
+            handler = ASGIHandler()
+        # (switched-off middleware is logged too, before it raises MiddlewareNotUsed)
+        adapted = [record.getMessage() for record in caplog.records if 'adapted' in record.getMessage()]
+        assert not [message for message in adapted
+                    if 'ReplicaMiddleware' in message or 'SQLProfilingMiddleware' in message]
+        # Adapting the outermost middleware isn't logged, but wraps the whole chain
+        assert not isinstance(handler._middleware_chain, SyncToAsync)
+
+    def test_pinned_client_skips_replicas(self, rf, replica_choices):
+        from .db import PIN_COOKIE_NAME, PIN_COOKIE_SALT, ReplicaMiddleware, ReplicaRouter, replica_reads
+
+        def view(request):
+            with replica_reads():
+                ReplicaRouter().db_for_read(Flan)
+            return HttpResponse()
+
+        signed = HttpResponse()
+        signed.set_signed_cookie(PIN_COOKIE_NAME, '1', salt=PIN_COOKIE_SALT)
+        pinned = rf.get('/')
+        pinned.COOKIES[PIN_COOKIE_NAME] = signed.cookies[PIN_COOKIE_NAME].value
+        forged = rf.get('/')
+        forged.COOKIES[PIN_COOKIE_NAME] = '1'
+
+        middleware = ReplicaMiddleware(view)
+        middleware(pinned)
+        assert replica_choices == []
+        middleware(forged)
+        assert replica_choices == ['default']
+
+    def test_service_getters_read_from_replica(self, settings, replica_choices, free_flan):
+        from .services import FlanService
+        settings.DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+        assert FlanService.get_flan_by_id(free_flan.id).name == free_flan.name
+        assert replica_choices
+
+    def test_api_reads_use_replica(self, replica_client, replica_choices, free_flan):
+        assert replica_client.get(reverse('api-stats')).status_code == 200
+        assert replica_choices
+
+    def test_shared_cache_is_filled_from_primary(self, replica_client, replica_choices, free_flan):
+        response = replica_client.get(reverse('api-flan-detail', args=[free_flan.id]))
+        assert response.json()['name'] == free_flan.name
+        assert replica_choices == []
+
+    def test_async_shared_cache_is_filled_from_primary(self, replica_choices, settings, free_flan):
+        import asyncio
+        from .caching import aget_or_compute
+        from .db import ReplicaRouter, replica_reads
+        settings.DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+
+        async def load():
+            return ReplicaRouter().db_for_read(Flan)
+
+        async def main():
+            with replica_reads():
+                return await aget_or_compute('flans:test:primary', load, 60)
+
+        assert asyncio.run(main()) is None
+        assert replica_choices == []
+
+    def test_async_view_caches_are_filled_from_primary(self, rf, replica_choices, settings, free_flan):
+        from asgiref.sync import async_to_sync
+        from . import async_views
+        from .db import replica_reads
+        settings.DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+
+        async def main():
+            with replica_reads():
+                await async_views.creators_list(rf.get('/'))
+                await async_views.stats(rf.get('/'))
+
+        # (async_to_sync runs the ORM calls on this thread, inside the test transaction)
+        async_to_sync(main)()
+        assert replica_choices == []
+
+    def test_list_grid_is_filled_from_primary(self, rf, replica_choices, settings, free_flan):
+        from django.contrib.auth.models import AnonymousUser
+        from .db import replica_reads
+        from .views import flan_list
+        settings.DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+        request = rf.get(reverse('flan-list'))
+        request.user = AnonymousUser()
+
+        with replica_reads():
+            content = flan_list.__wrapped__(request).content.decode()
+        assert free_flan.name in content
+        assert replica_choices == []
+
+    def test_page_cache_fill_reads_from_primary(self, rf, replica_choices, settings):
+        from django.utils import timezone
+        from .db import ReplicaRouter, replica_reads
+        from .page_cache import anonymous_page_cache
+        settings.DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+        moment = timezone.now()
+
+        @anonymous_page_cache(lambda request: moment)
+        def view(request):
+            ReplicaRouter().db_for_read(Flan)
+            return HttpResponse('flan')
+
+        with replica_reads():
+            assert view(rf.get('/')).content == b'flan'
+        assert replica_choices == []
+
+    def test_reads_after_a_write_stay_on_primary(self, replica_client, replica_choices, free_flan):
+        from .db import PIN_COOKIE_NAME
+        response = replica_client.post(reverse('subscribe'), {'email': 'pinned@flans.com'})
+        assert PIN_COOKIE_NAME in response.cookies
+
+        replica_client.get(reverse('api-stats'))
+        assert replica_choices == []
+
+        del replica_client.cookies[PIN_COOKIE_NAME]
+        replica_client.get(reverse('api-stats'))
+        assert replica_choices
+
+
+
+# ============================================================
+# QUERY PLAN TESTS
+# ============================================================
+
+@pytest.fixture
+def large_catalog(db):
+    """A few thousand rows with realistic skew, plus ANALYZE so SQLite plans as it would in production."""
+    import random
+    from datetime import timedelta
+    from django.db import connection
+    from django.utils import timezone
+    from .models import EmailLog, FlanDeletion
+
+    rng = random.Random(43)
+    now = timezone.now()
+    users = User.objects.bulk_create(User(username=f'planner{i}') for i in range(50))
+    creators = FlanCreator.objects.bulk_create(
+        FlanCreator(name=f'Creator {i}', bio='Bio', is_featured=i < 10,
+                    total_earnings=Decimal(rng.randint(0, 50_000)))
+        for i in range(200)
+    )
+    types = [choice for choice, _ in Flan.FlanType.choices]
+    flans = []
+    for i in range(3000):
+        premium = rng.random() < 0.3
+        flans.append(Flan(
+            name=f'Flan {i}', description='Wobbly', creator=rng.choice(users),
+            featured_creator=rng.choice(creators) if rng.random() < 0.8 else None,
+            flan_type=rng.choice(types), is_premium=premium,
+            price=Decimal(rng.randint(1, 30)) if premium else Decimal('0.00'),
+        ))
+    flans = Flan.objects.bulk_create(flans)
+    # bulk_create skips auto_now_add: spread the catalog over a year
+    for i, flan in enumerate(flans):
+        flan.created_at = flan.updated_at = now - timedelta(minutes=3 * i)
+    Flan.objects.bulk_update(flans, ['created_at', 'updated_at'], batch_size=500)
+
+    FlanRating.objects.bulk_create(
+        FlanRating(flan=flan, user=user, score=rng.randint(1, 5))
+        for flan in flans[:600] for user in rng.sample(users, 5)
+    )
+    subscribers = Subscriber.objects.bulk_create(
+        Subscriber(email=f'planner{i}@flans.com', is_active=rng.random() < 0.9,
+                   receive_weekly_digest=rng.random() < 0.7,
+                   receive_new_flan_alerts=rng.random() < 0.4,
+                   favorite_flan_type=rng.choice(types + [''] * 5))
+        for i in range(3000)
+    )
+    EmailLog.objects.bulk_create(EmailLog(subscriber=sub, subject='Digest') for sub in subscribers[:500])
+    FlanDeletion.objects.bulk_create(FlanDeletion(flan_id=100_000 + i) for i in range(50))
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {'flan': flans[10], 'creator': creators[3]}
+
+
+def _plan_scenarios(catalog):
+    """(label, callable taking a client) for every view, API and service read path."""
+    from . import emails
+    from .services import AnalyticsService, CreatorService, FlanService, SubscriberService
+    flan, creator = catalog['flan'], catalog['creator']
+
+    def get(name, *args, query=''):
+        return name + query, lambda client: client.get(reverse(name, args=args) + query)
+
+    def call(label, func):
+        return label, lambda client: func()
+
+    return [
+        get('flan-list'),
+        get('flan-list', query='?type=coffee'),
+        get('flan-list', query='?page=3'),
+        get('flan-detail', flan.id),
+        get('creators-list'),
+        get('creator-detail', creator.id),
+        get('api-flan-list'),
+        get('api-flan-list', query='?type=vanilla&premium=true'),
+        get('api-flan-changes'),
+        get('api-flan-detail', flan.id),
+        get('api-flan-ratings', flan.id),
+        get('api-creators-list'),
+        get('api-creator-detail', creator.id),
+        get('api-stats'),
+        get('api-async-flan-list'),
+        get('api-async-creators-list'),
+        get('api-async-stats'),
+        call('FlanService.get_flans_by_type', lambda: FlanService.get_flans_by_type('coconut')),
+        call('FlanService.get_flan_by_id', lambda: FlanService.get_flan_by_id(flan.id)),
+        call('FlanService.get_premium_flans', FlanService.get_premium_flans),
+        call('FlanService.get_flan_analytics', lambda: FlanService.get_flan_analytics(flan.id)),
+        call('FlanService.get_flans_paginated', lambda: FlanService.get_flans_paginated(page=2)),
+        call('CreatorService.get_creator_stats', lambda: CreatorService.get_creator_stats(creator.id)),
+        call('SubscriberService.get_active_subscribers_count',
+             SubscriberService.get_active_subscribers_count),
+        call('SubscriberService.get_subscribers_by_preference',
+             SubscriberService.get_subscribers_by_preference),
+        call('SubscriberService.get_subscribers_for_weekly_digest',
+             SubscriberService.get_subscribers_for_weekly_digest),
+        call('AnalyticsService.get_system_analytics', AnalyticsService.get_system_analytics),
+        call('emails.send_new_flan_alert', lambda: emails.send_new_flan_alert(flan)),
+    ]
+
+
+# Indexes the scenarios below may walk in full
+FLAN_CREATED_IDX = 'flans_flan_created_cbfb0c_idx'
+FLAN_UPDATED_IDX = 'flans_flan_updated_f11e36_idx'
+FLAN_PREMIUM_IDX = 'flans_flan_is_prem_f26546_idx'
+FLAN_TYPE_CREATED_IDX = 'flans_flan_flan_ty_4ad9dd_idx'
+CREATOR_UPDATED_IDX = 'flans_flanc_updated_c2a950_idx'
+RATING_FLAN_IDX = 'flans_flanr_flan_id_196552_idx'
+RATING_USER_IDX = 'flans_flanrating_user_id_f3553c0b'
+DELETION_IDX = 'flans_fland_deleted_90473c_idx'
+SUBSCRIBER_PREFS_IDX = 'subscriber_prefs_idx'
+
+# (scenario, table, index) scans allowed to read a whole index, with the reason.
+# Subqueries show up under their alias (U0). A SCAN without an index always fails.
+ALLOWED_FULL_SCANS = {
+    # Newest-first walks down an index that stop at a LIMIT (a page, or one row for a validator)
+    ('flan-list', 'flans_flan', FLAN_CREATED_IDX): 'one page, and the cold COUNT(*)',
+    ('flan-list', 'flans_flan', FLAN_UPDATED_IDX): 'the newest updated_at',
+    ('flan-list', 'U0', DELETION_IDX): 'the newest FlanDeletion',
+    ('flan-list?type=coffee', 'flans_flan', FLAN_UPDATED_IDX): 'the newest updated_at',
+    ('flan-list?type=coffee', 'U0', DELETION_IDX): 'the newest FlanDeletion',
+    ('flan-list?page=3', 'flans_flan', FLAN_CREATED_IDX): 'one page, and the cold COUNT(*)',
+    ('flan-list?page=3', 'flans_flan', FLAN_UPDATED_IDX): 'the newest updated_at',
+    ('flan-list?page=3', 'U0', DELETION_IDX): 'the newest FlanDeletion',
+    ('creators-list', 'U0', FLAN_UPDATED_IDX): 'the newest Flan',
+    ('creators-list', 'U0', DELETION_IDX): 'the newest FlanDeletion',
+    ('creator-detail', 'U0', DELETION_IDX): 'the newest FlanDeletion',
+    ('api-flan-changes', 'flans_flan', FLAN_UPDATED_IDX): 'one sync page in (updated_at, id) order',
+    ('FlanService.get_flans_paginated', 'flans_flan', FLAN_CREATED_IDX): 'one page, and its COUNT(*)',
+    # Every creator is on the page
+    ('creators-list', 'flans_flancreator', CREATOR_UPDATED_IDX): 'lists every creator',
+    ('api-creators-list', 'flans_flancreator', CREATOR_UPDATED_IDX): 'lists every creator',
+    ('api-async-creators-list', 'flans_flancreator', CREATOR_UPDATED_IDX): 'lists every creator',
+    # Unpaginated listings, kept as they are for API compatibility
+    ('api-flan-list', 'flans_flan', FLAN_CREATED_IDX): 'returns every flan',
+    ('api-async-flan-list', 'flans_flan', FLAN_CREATED_IDX): 'returns every flan',
+    ('FlanService.get_premium_flans', 'flans_flan', FLAN_CREATED_IDX): 'returns every premium flan',
+    # Site-wide totals, read from the narrowest index that covers them
+    ('api-stats', 'flans_flan', FLAN_CREATED_IDX): 'site-wide totals',
+    ('api-stats', 'flans_flan', FLAN_PREMIUM_IDX): 'site-wide totals',
+    ('api-stats', 'flans_flancreator', CREATOR_UPDATED_IDX): 'site-wide totals',
+    ('api-stats', 'flans_flanrating', RATING_FLAN_IDX): 'site-wide totals',
+    ('api-stats', 'flans_flanrating', RATING_USER_IDX): 'site-wide totals',
+    ('api-stats', 'flans_subscriber', SUBSCRIBER_PREFS_IDX): 'site-wide totals',
+    ('api-async-stats', 'flans_flan', FLAN_TYPE_CREATED_IDX): 'site-wide totals',
+    ('api-async-stats', 'flans_flan', FLAN_PREMIUM_IDX): 'site-wide totals',
+    ('api-async-stats', 'flans_flancreator', CREATOR_UPDATED_IDX): 'site-wide totals',
+    ('api-async-stats', 'flans_flanrating', RATING_FLAN_IDX): 'site-wide totals',
+    ('api-async-stats', 'flans_subscriber', SUBSCRIBER_PREFS_IDX): 'site-wide totals',
+    ('AnalyticsService.get_system_analytics', 'flans_flan', FLAN_CREATED_IDX): 'site-wide totals',
+    ('AnalyticsService.get_system_analytics', 'flans_flan', FLAN_PREMIUM_IDX): 'site-wide totals',
+    ('AnalyticsService.get_system_analytics', 'flans_subscriber', SUBSCRIBER_PREFS_IDX): 'site-wide totals',
+    ('SubscriberService.get_active_subscribers_count', 'flans_subscriber', SUBSCRIBER_PREFS_IDX):
+        'counts every active subscriber',
+    ('SubscriberService.get_subscribers_by_preference', 'flans_subscriber', SUBSCRIBER_PREFS_IDX):
+        'counts every subscriber by preference',
+    # The partial index holds exactly the audience, already in mailing order
+    ('SubscriberService.get_subscribers_for_weekly_digest', 'flans_subscriber', 'subscriber_digest_idx'):
+        'the weekly digest audience',
+    ('emails.send_new_flan_alert', 'flans_subscriber', 'subscriber_alerts_idx'): 'the new-flan alert audience',
+}
+
+# Scenarios allowed a temp B-tree sort, with the reason; each sorts a handful of rows
+ALLOWED_TEMP_SORTS = {
+    'flan-detail': "one flan's ratings, for the validator",
+    'creator-detail': "one creator's flans and ratings, for the validator",
+    'api-flan-detail': "one flan's ratings",
+    'api-flan-ratings': "one flan's ratings",
+    'api-creators-list': 'the grouped creator rows, featured first',
+}
+
+
+class TestQueryPlans:
+
+    def test_full_scan_detection(self, db):
+        from .query_plans import capture_plans
+        with capture_plans() as plans:
+            list(Flan.objects.filter(description='Wobbly').order_by())
+            list(Flan.objects.order_by('-created_at')[:5])
+            list(Flan.objects.filter(pk=1))
+            list(Flan.objects.filter(featured_creator_id=1).order_by('name'))
+        assert plans[0].full_scans() == [('flans_flan', None)]
+        # Walking a whole index is still a full scan
+        assert plans[1].full_scans() == [('flans_flan', FLAN_CREATED_IDX)]
+        assert plans[1].temp_sorts() == []
+        assert plans[2].full_scans() == []
+        assert plans[3].full_scans() == []
+        assert plans[3].temp_sorts() == ['ORDER BY']
+
+    def test_email_audiences_read_partial_index_in_order(self, large_catalog):
+        from . import emails
+        from .query_plans import capture_plans
+        from .services import SubscriberService
+        with capture_plans() as plans:
+            SubscriberService.get_subscribers_for_weekly_digest()
+            emails.send_new_flan_alert(large_catalog['flan'])
+        audiences = [plan for plan in plans if 'flans_subscriber' in plan.sql]
+        assert [step for plan in audiences for step in plan.steps] == [
+            'SCAN flans_subscriber USING INDEX subscriber_digest_idx',
+            'SCAN flans_subscriber USING INDEX subscriber_alerts_idx',
+        ]
+
+    def test_hot_paths_use_indexes(self, large_catalog, client):
+        from django.core.cache import cache
+        from .query_plans import capture_plans
+        problems = []
+        for label, run in _plan_scenarios(large_catalog):
+            cache.clear()
+            with capture_plans() as plans:
+                run(client)
+            assert plans, f"{label} ran no queries"
+            problems += [
+                f"{label}: full scan of {table} using {index or 'no index'}\n{plan}"
+                for plan in plans for table, index in plan.full_scans()
+                if index is None or (label, table, index) not in ALLOWED_FULL_SCANS
+            ]
+            problems += [
+                f"{label}: temp B-tree for {clause}\n{plan}"
+                for plan in plans for clause in plan.temp_sorts()
+                if label not in ALLOWED_TEMP_SORTS
+            ]
+        assert not problems, 'Full scans and temp sorts:\n\n' + '\n\n'.join(problems)
+
+# ============================================================
+# QUERY BUDGET TESTS
+# ============================================================
+
+def _budget_catalog(rows):
+    """``rows`` of every related object: flans, creators, and users rating one flan."""
+    users = User.objects.bulk_create(User(username=f'budget{rows}-{i}') for i in range(rows))
+    creators = FlanCreator.objects.bulk_create(
+        FlanCreator(name=f'Creator {i}', bio='Bio', is_featured=i % 2 == 0) for i in range(rows))
+    flans = Flan.objects.bulk_create(
+        Flan(name=f'Flan {i}', description='Wobbly', creator=users[i], featured_creator=creators[0],
+             is_premium=i % 3 == 0, price=Decimal('5.00') if i % 3 == 0 else Decimal('0.00'))
+        for i in range(rows)
+    )
+    FlanRating.objects.bulk_create(FlanRating(flan=flans[0], user=user, score=4) for user in users)
+    return {'flan': flans[0].id, 'creator': creators[0].id}
+
+
+BUDGETED_URLS = [
+    ('flan-list', lambda ids: []),
+    ('flan-detail', lambda ids: [ids['flan']]),
+    ('creators-list', lambda ids: []),
+    ('creator-detail', lambda ids: [ids['creator']]),
+    ('faq', lambda ids: []),
+    ('api-flan-list', lambda ids: []),
+    ('api-flan-changes', lambda ids: []),
+    ('api-flan-detail', lambda ids: [ids['flan']]),
+    ('api-flan-ratings', lambda ids: [ids['flan']]),
+    ('api-creators-list', lambda ids: []),
+    ('api-creator-detail', lambda ids: [ids['creator']]),
+    ('api-stats', lambda ids: []),
+]
+
+
+class TestQueryBudgets:
+
+    def test_every_budget_is_tested(self):
+        from .query_budget import QUERY_BUDGETS
+        assert set(QUERY_BUDGETS) == {name for name, _ in BUDGETED_URLS}
+
+    @pytest.mark.parametrize('url_name, args', BUDGETED_URLS, ids=[name for name, _ in BUDGETED_URLS])
+    def test_query_count_is_flat_and_within_budget(self, db, client, url_name, args):
+        from django.core.cache import cache
+        from .query_budget import QueryCounter, get_query_budget
+        counts = []
+        for rows in (1, 100):
+            cache.clear()
+            url = reverse(url_name, args=args(_budget_catalog(rows)))
+            with QueryCounter() as counter:
+                assert client.get(url).status_code == 200
+            counts.append(counter.count)
+
+        assert counts[0] == counts[1], f"{url_name}: {counts[0]} queries with 1 row, {counts[1]} with 100"
+        assert counts[1] <= get_query_budget(url_name)
+
+    def test_middleware_warns_with_stack_sample(self, client, settings, free_flan, caplog):
+        settings.FLANS_QUERY_BUDGET_WARNINGS = True
+        settings.FLANS_QUERY_BUDGETS = {'flan-detail': 0}
+        with caplog.at_level('WARNING', logger='flans.query_budget'):
+            client.get(reverse('flan-detail', args=[free_flan.id]))
+        [record] = caplog.records
+        message = record.getMessage()
+        assert 'budget is 0' in message
+        assert 'page_cache.py' in message  # the validator query is the first one
+
+    def test_middleware_quiet_within_budget(self, client, settings, free_flan, caplog):
+        settings.FLANS_QUERY_BUDGET_WARNINGS = True
+        with caplog.at_level('WARNING', logger='flans.query_budget'):
+            client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert not caplog.records
+
+    def test_middleware_off_unless_enabled(self, settings):
+        from django.core.exceptions import MiddlewareNotUsed
+        from .query_budget import QueryBudgetMiddleware
+        settings.FLANS_QUERY_BUDGET_WARNINGS = False
+        with pytest.raises(MiddlewareNotUsed):
+            QueryBudgetMiddleware(lambda request: HttpResponse())
+
+
+# ============================================================
+# SQL PROFILING TESTS
+# ============================================================
+
+@pytest.fixture
+def sql_profiling(settings):
+    from .profiling import profile_store
+    settings.FLANS_SQL_PROFILING = True
+    settings.FLANS_SQL_PROFILING_SAMPLE_RATE = 1.0
+    profile_store.reset()
+    yield profile_store
+    profile_store.reset()
+
+
+class TestSQLProfiling:
+
+    def test_fingerprint_ignores_literals_and_list_lengths(self):
+        from .profiling import fingerprint, normalize_sql
+        assert normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21") == \
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?"
+        assert fingerprint('SELECT * FROM t WHERE id IN (%s)') == \
+            fingerprint('SELECT  *  FROM t\nWHERE id IN (%s, %s, %s, %s)')
+        assert fingerprint('SELECT * FROM t') != fingerprint('SELECT * FROM u')
+
+    def test_rolling_percentiles(self):
+        from .profiling import RollingStats
+        stats = RollingStats(window=100)
+        for value in range(1, 201):
+            stats.add(float(value))
+        summary = stats.summary()
+        # Only the last 100 samples (101..200) count toward percentiles
+        assert summary['count'] == 200
+        assert summary['p50'] == 151
+        assert summary['p95'] == 196
+        assert summary['p99'] == 200
+
+    def test_store_keeps_recent_fingerprints_only(self):
+        from .profiling import ProfileStore, QueryTiming, RequestProfile
+        store = ProfileStore(max_fingerprints=2)
+        for table in ('a', 'b', 'c'):
+            store.record(RequestProfile('page', [QueryTiming(f'SELECT * FROM {table}', 1.0)]))
+        assert [row['sql'] for row in store.snapshot()['queries']] == \
+            ['SELECT * FROM b', 'SELECT * FROM c']
+
+    def test_middleware_records_sampled_requests(self, client, free_flan, sql_profiling):
+        client.get(reverse('flan-detail', args=[free_flan.id]))
+        snapshot = sql_profiling.snapshot()
+        [row] = snapshot['urls']
+        assert row['url_name'] == 'flan-detail'
+        assert row['request_ms']['count'] == 1
+        assert row['queries']['p50'] >= 1
+        assert snapshot['queries']
+
+    def test_middleware_profiles_async_requests(self, rf, free_flan, sql_profiling):
+        from asgiref.sync import async_to_sync, iscoroutinefunction
+        from .profiling import SQLProfilingMiddleware
+
+        async def view(request):
+            return HttpResponse(str(await Flan.objects.acount()))
+
+        middleware = SQLProfilingMiddleware(view)
+        assert iscoroutinefunction(middleware)
+        assert async_to_sync(middleware)(rf.get(reverse('api-async-stats'))).content == b'1'
+        [row] = sql_profiling.snapshot()['urls']
+        assert row['url_name'] == 'api-async-stats'
+        assert row['queries']['p50'] == 1
+
+    def test_unsampled_requests_are_not_recorded(self, client, free_flan, settings, sql_profiling):
+        settings.FLANS_SQL_PROFILING_SAMPLE_RATE = 0.0
+        client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert sql_profiling.snapshot()['urls'] == []
+
+    def test_slow_queries_are_logged(self, client, free_flan, settings, sql_profiling, caplog):
+        settings.FLANS_SLOW_QUERY_MS = 0
+        settings.FLANS_SLOW_REQUEST_MS = 0
+        with caplog.at_level('WARNING', logger='flans.slow_queries'):
+            client.get(reverse('flan-detail', args=[free_flan.id]))
+        messages = [record.getMessage() for record in caplog.records]
+        assert any(message.startswith('slow query') and 'flans_flan' in message for message in messages)
+        assert any(message.startswith('slow request') for message in messages)
+
+    def test_profiling_endpoint_is_staff_only(self, client, staff_client, free_flan, sql_profiling):
+        client.get(reverse('flan-detail', args=[free_flan.id]))
+        assert client.get(reverse('api-profiling')).status_code == 403
+
+        data = staff_client.get(reverse('api-profiling')).json()
+        assert data['sample_rate'] == 1.0
+        assert 'flan-detail' in [row['url_name'] for row in data['urls']]
+
+        assert staff_client.delete(reverse('api-profiling')).status_code == 204
+        data = staff_client.get(reverse('api-profiling')).json()
+        assert 'flan-detail' not in [row['url_name'] for row in data['urls']]
+
+
+# ============================================================
+# FLAN DATA TESTS
+# ============================================================
+
+class TestFlanData:
+
+    def test_from_row_matches_from_model(self, free_flan, premium_flan):
+        from .datatypes import FlanData
+        for flan in (free_flan, premium_flan):
+            row = Flan.objects.values_list(*FlanData.VALUES_FIELDS).get(id=flan.id)
+            assert FlanData.from_row(row) == FlanData.from_model(flan)
+
+    def test_datatypes_are_slotted(self):
+        import dataclasses
+        from . import datatypes
+        classes = [obj for obj in vars(datatypes).values()
+                   if dataclasses.is_dataclass(obj) and obj.__module__ == datatypes.__name__]
+        assert classes
+        for cls in classes:
+            assert '__slots__' in vars(cls), cls.__name__
+
+    def test_slotted_stats_survive_the_cache(self):
+        import pickle
+        from .datatypes import CreatorStatsData
+        stats = CreatorStatsData(creator_id=1, flan_count=4, premium_count=1)
+        assert pickle.loads(pickle.dumps(stats)) == stats
+
+    def test_getters_skip_models_and_joins(self, free_flan, premium_flan):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .services import FlanService
+        with CaptureQueriesContext(connection) as queries:
+            all_flans = FlanService.get_all_flans()
+            premium = FlanService.get_premium_flans()
+            coconut = FlanService.get_flans_by_type('coconut')
+            single = FlanService.get_flan_by_id(free_flan.id)
+            page = FlanService.get_flans_paginated(page=1, page_size=1)
+        assert not any('JOIN' in query['sql'] for query in queries.captured_queries)
+        assert {flan.id for flan in all_flans} == {free_flan.id, premium_flan.id}
+        assert [flan.id for flan in premium] == [premium_flan.id]
+        assert coconut == []
+        assert single.creator_id == free_flan.creator_id
+        assert page.total_count == 2 and len(page.data) == 1
+
+
+# ============================================================
+# STREAMING GETTER TESTS
+# ============================================================
+
+@pytest.fixture
+def mailing_list(db):
+    return [
+        Subscriber.objects.create(email='digest@flans.com', name='Dee', receive_new_flan_alerts=False),
+        Subscriber.objects.create(email='coffee@flans.com', receive_weekly_digest=False,
+                                  favorite_flan_type='coffee'),
+        Subscriber.objects.create(email='anything@flans.com'),
+        Subscriber.objects.create(email='gone@flans.com', is_active=False),
+    ]
+
+
+class TestStreamingGetters:
+
+    def test_iter_all_flans_streams_flan_data(self, free_flan, premium_flan):
+        import types
+        from .services import FlanService
+        flans = FlanService.iter_all_flans(chunk_size=1)
+        assert isinstance(flans, types.GeneratorType)
+        assert sorted(flans, key=lambda flan: flan.id) == \
+            sorted(FlanService.get_all_flans(), key=lambda flan: flan.id)
+
+    def test_iter_all_flans_reads_from_replica(self, free_flan, replica_choices, settings):
+        from .services import FlanService
+        settings.DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+        assert [flan.id for flan in FlanService.iter_all_flans()] == [free_flan.id]
+        assert replica_choices == ['default']
+
+    def test_weekly_digest_subscribers(self, mailing_list):
+        from .services import SubscriberService
+        emails = [sub.email for sub in SubscriberService.iter_subscribers_for_weekly_digest(chunk_size=1)]
+        assert sorted(emails) == ['anything@flans.com', 'digest@flans.com']
+        assert SubscriberService.get_subscribers_for_weekly_digest()[0].display_name in ('anything', 'Dee')
+
+    def test_new_flan_alert_subscribers_match_favorite_type(self, mailing_list):
+        from .services import SubscriberService
+        coffee = [sub.email for sub in SubscriberService.iter_subscribers_for_new_flan_alert('coffee')]
+        vanilla = [sub.email for sub in SubscriberService.iter_subscribers_for_new_flan_alert('vanilla')]
+        assert sorted(coffee) == ['anything@flans.com', 'coffee@flans.com']
+        assert vanilla == ['anything@flans.com']
+
+    def test_emails_go_to_streamed_subscribers(self, mailing_list, premium_flan):
+        from django.core import mail
+        from .emails import send_new_flan_alert, send_weekly_digest
+        from .models import EmailLog
+        send_weekly_digest()
+        send_new_flan_alert(premium_flan)
+        assert sorted(message.to[0] for message in mail.outbox) == \
+            ['anything@flans.com', 'anything@flans.com', 'digest@flans.com']
+        assert EmailLog.objects.filter(was_successful=True).count() == 3
+        assert 'Hello Dee!' in next(
+            message.alternatives[0][0] for message in mail.outbox if message.to == ['digest@flans.com'])
+
+
+# ============================================================
+# BULK FLAN CREATION TESTS
+# ============================================================
+
+def _flan_item(**overrides):
+    from .datatypes import FlanCreateData
+    data = dict(name='Bulk Flan', description='Made by the hundred', image_url='',
+                flan_type='vanilla', is_premium=False, price=Decimal('0.00'))
+    data.update(overrides)
+    return FlanCreateData(**data)
+
+
+class TestFlanBulkCreate:
+
+    def test_valid_items_created_and_invalid_reported(self, user):
+        from .services import FlanService
+        items = [
+            _flan_item(name='One'),
+            _flan_item(name='x'),
+            _flan_item(name='Three', is_premium=True, price=Decimal('7.50')),
+            _flan_item(name='Four', image_url='not a url'),
+        ]
+        result = FlanService.create_flans_bulk(items, user)
+
+        assert sorted(result.errors) == [1, 3]
+        assert result.errors[1] == ["Name must be at least 3 characters"]
+        assert result.errors[3][0].startswith('image_url:')
+        created = Flan.objects.filter(id__in=result.created_ids).order_by('id')
+        assert [flan.name for flan in created] == ['One', 'Three']
+        assert all(flan.creator == user and flan.created_at for flan in created)
+
+    def test_free_flans_get_zero_price(self, user):
+        from .services import FlanService
+        result = FlanService.create_flans_bulk([_flan_item(price=Decimal('9.99'))], user)
+        assert Flan.objects.get(id=result.created_ids[0]).price == Decimal('0.00')
+
+    def test_inserts_in_batches_inside_one_transaction(self, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .services import FlanService
+        items = [_flan_item(name=f'Batch {i}') for i in range(5)]
+        with CaptureQueriesContext(connection) as queries:
+            result = FlanService.create_flans_bulk(items, user, batch_size=2)
+        inserts = [query for query in queries.captured_queries
+                   if query['sql'].startswith('INSERT INTO "flans_flan" ')]
+        assert len(inserts) == 3
+        assert result.created == 5
+        assert len(set(result.created_ids)) == 5
+
+    def test_strict_creates_nothing_when_an_item_is_invalid(self, user):
+        from .services import FlanService
+        result = FlanService.create_flans_bulk([_flan_item(), _flan_item(flan_type='jelly')], user, strict=True)
+        assert result.created_ids == []
+        assert result.errors == {1: ["Invalid flan type"]}
+        assert not Flan.objects.exists()
+
+    def test_dict_items_are_parsed(self, user):
+        from .services import FlanService
+        result = FlanService.create_flans_bulk([
+            {'name': 'Dict Flan', 'description': 'From a CSV row', 'is_premium': 'true', 'price': '3.25'},
+            {'name': 'Bad Price', 'description': 'From a CSV row', 'price': 'lots'},
+        ], user)
+        flan = Flan.objects.get(id=result.created_ids[0])
+        assert flan.is_premium and flan.price == Decimal('3.25')
+        assert result.errors == {1: ["Invalid price: 'lots'"]}
+
+    def test_catalog_caches_are_invalidated(self, user, free_flan):
+        from .counting import estimate_flan_count
+        from .services import FlanService
+        assert estimate_flan_count() == 1
+        FlanService.create_flans_bulk([_flan_item(), _flan_item()], user)
+        assert estimate_flan_count() == 3
+
+    def test_api_bulk_create(self, client, staff_client):
+        url = reverse('api-flans-bulk-create')
+        payload = [
+            {'name': 'API Flan', 'description': 'Posted in bulk', 'flan_type': 'coffee'},
+            {'name': 'No', 'description': 'Too short a name'},
+        ]
+        assert client.post(url, payload, content_type='application/json').status_code == 403
+
+        response = staff_client.post(url, {'flans': payload}, content_type='application/json')
+        assert response.status_code == 201
+        data = response.json()
+        assert data['created'] == 1 and data['invalid'] == 1
+        assert Flan.objects.get(id=data['created_ids'][0]).creator.username == 'flanadmin'
+        assert data['errors'] == [{'index': 1, 'errors': ["Name must be at least 3 characters"]}]
+
+    def test_api_rejects_bad_payloads(self, staff_client):
+        url = reverse('api-flans-bulk-create')
+        assert staff_client.post(url, {'name': 'x'}, content_type='application/json').status_code == 400
+        response = staff_client.post(url, [{'name': 'x'}], content_type='application/json')
+        assert response.status_code == 400
+        assert response.json()['invalid'] == 1
+
+    def test_import_flans_command(self, user, tmp_path):
+        from django.core.management import call_command
+        path = tmp_path / 'recipes.csv'
+        path.write_text(
+            'name,description,flan_type,is_premium,price\n'
+            'CSV Flan,Imported from a file,coconut,yes,4.00\n'
+            'x,Too short,vanilla,no,0\n'
+        )
+        out = io.StringIO()
+        call_command('import_flans', str(path), creator=user.username, stdout=out)
+        output = out.getvalue()
+        flan = Flan.objects.get(name='CSV Flan')
+        assert flan.is_premium and flan.flan_type == 'coconut'
+        assert f'ids: {flan.id}' in output
+        assert 'row 2: Name must be at least 3 characters' in output
+
+
+# ============================================================
+# LOAD DATA GENERATOR TESTS
+# ============================================================
+
+class TestGenerateLoadData:
+
+    def test_rating_counts_are_skewed_and_capped(self):
+        from .management.commands.generate_load_data import rating_counts
+        counts = rating_counts(flans=1000, users=50, ratings=10_000, skew=1.1)
+        assert sum(counts) == 10_000
+        assert max(counts) == 50
+        assert counts[0] > counts[500] >= 1
+        assert sum(rating_counts(flans=3, users=2, ratings=100, skew=1.1)) == 6
+
+    def test_rows_do_not_depend_on_worker_count(self):
+        from datetime import date
+        from .management.commands.generate_load_data import chunk_tasks, generate_chunks
+        context = {'seed': 9, 'prefix': 'load9', 'days': 30, 'last_day': date(2026, 1, 31)}
+        tasks = chunk_tasks('subscribers', 50, chunk_size=10)
+        serial = list(generate_chunks(tasks, context, workers=1))
+        parallel = list(generate_chunks(tasks, context, workers=2))
+        assert serial == parallel
+        assert serial != list(generate_chunks(tasks, {**context, 'seed': 10}, workers=1))
+
+    def test_command_generates_requested_rows(self, db):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from django.db.models import Count
+        from .models import EmailLog
+        out = io.StringIO()
+        call_command('generate_load_data', seed=4, users=20, creators=5, flans=30, ratings=200,
+                     subscribers=15, email_logs=40, stdout=out)
+
+        assert User.objects.filter(username__startswith='load4-user-').count() == 20
+        assert Flan.objects.count() == 30
+        assert FlanRating.objects.count() == 200
+        assert Subscriber.objects.count() == 15
+        assert EmailLog.objects.count() == 40
+        top = FlanRating.objects.values('flan').annotate(n=Count('id')).order_by('-n')
+        assert top[0]['n'] == 20
+        assert not Flan.objects.filter(is_premium=False).exclude(price=0).exists()
+
+        with pytest.raises(CommandError):
+            call_command('generate_load_data', seed=4, users=1, stdout=out)
+
+
+# ============================================================
+# SEEDING TESTS
+# ============================================================
+
+def _seed(*args):
+    from django.core.management import call_command
+    out = io.StringIO()
+    call_command('seed_flans', *args, stdout=out)
+    return out.getvalue()
+
+
+class TestSeeding:
+
+    def test_seed_flans_creates_catalog(self, db):
+        from .management.commands.seed_flans import CREATORS, FLANS, SUBSCRIBERS
+        output = _seed()
+        assert Flan.objects.count() == len({data['name'] for data in FLANS})
+        assert FlanCreator.objects.count() == len(CREATORS)
+        assert Subscriber.objects.count() == len(SUBSCRIBERS)
+        flan = Flan.objects.select_related('featured_creator', 'creator').get(name=FLANS[0]['name'])
+        assert flan.featured_creator.name == FLANS[0]['creator_name']
+        assert flan.creator.username == 'admin'
+        assert '⏱️  Timings' in output
+
+    def test_reseeding_is_idempotent_and_cheap(self, db):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        _seed()
+        flan_ids = set(Flan.objects.values_list('id', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            _seed()
+        assert set(Flan.objects.values_list('id', flat=True)) == flan_ids
+        # Admin lookup + one key lookup per model, plus savepoint/summary overhead
+        assert len(queries) <= 10
+
+    def test_clear_reseeds_with_tombstones(self, db, user):
+        from .models import FlanDeletion
+        _seed()
+        old_ids = set(Flan.objects.values_list('id', flat=True))
+        FlanRating.objects.create(flan=Flan.objects.first(), user=user, score=5)
+
+        _seed('--clear')
+        assert not FlanRating.objects.exists()
+        assert set(FlanDeletion.objects.values_list('flan_id', flat=True)) == old_ids
+        new_ids = set(Flan.objects.values_list('id', flat=True))
+        assert len(new_ids) == len(old_ids) and not new_ids & old_ids
+
+    def test_seeding_keeps_group_counts(self, db):
+        from .counting import estimate_flan_count
+        _seed()
+        _seed()
+        assert estimate_flan_count() == Flan.objects.count()
+        _seed('--clear')
+        assert estimate_flan_count() == Flan.objects.count()
+
+    def test_insert_missing_skips_existing_and_duplicate_keys(self, user):
+        from .seeding import insert_missing
+        Flan.objects.create(name='Old', description='Already here', creator=user)
+        rows = [
+            {'name': 'Old', 'description': 'Skipped', 'creator': user},
+            {'name': 'New', 'description': 'Inserted', 'creator': user, 'price': Decimal('3.00')},
+            {'name': 'New', 'description': 'Duplicate', 'creator': user},
+        ]
+        ids, created = insert_missing(Flan, 'name', rows, prepare=Flan.apply_price_rule)
+        assert created == ['New']
+        assert set(ids) == {'Old', 'New'}
+        new = Flan.objects.get(id=ids['New'])
+        assert new.description == 'Inserted' and new.price == Decimal('0.00')
+
+    def test_add_fake_creators(self, db):
+        from django.core.management import call_command
+        call_command('add_fake_creators', stdout=io.StringIO())
+        count = FlanCreator.objects.count()
+        assert count > 0
+        call_command('add_fake_creators', stdout=io.StringIO())
+        assert FlanCreator.objects.count() == count
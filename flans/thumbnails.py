@@ -0,0 +1,201 @@
+"""
+Local thumbnails for flan and creator pictures.
+
+``Flan.image_url`` and ``FlanCreator.profile_image`` point at full-size
+remote images. ``ingest`` fetches one (a public http(s) URL; file:// URLs
+and local paths only when allowed explicitly), builds fixed-width WebP and JPEG variants with Pillow and stores them
+in the default storage under ``thumbs/`` with content-hash names:
+
+    thumbs/3f/3f2a91c0d4e5...-320.webp
+
+The hash is stored on the row (``image_hash``/``profile_image_hash``) and the
+``responsive_image`` template tag turns it into a srcset. Since names depend
+only on the source bytes, rebuilding is idempotent and identical pictures
+share files. Saving a row with a different picture clears its hash (see
+``signals``), so the next ``generate_thumbnails`` run rebuilds it.
+
+Pillow is optional: without it the templates keep using the remote URLs and
+``ingest`` raises ThumbnailError.
+"""
+import hashlib
+import io
+import ipaddress
+import logging
+import socket
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .exceptions import ThumbnailError
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional dependency
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTHS = (160, 320, 640)
+# (format, file extension, content type), preferred first
+THUMBNAIL_FORMATS = (
+    ('WEBP', 'webp', 'image/webp'),
+    ('JPEG', 'jpg', 'image/jpeg'),
+)
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_DIR = 'thumbs'
+
+FETCH_TIMEOUT = 10  # seconds
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+REMOTE_SCHEMES = ('http', 'https')
+
+# (model attribute holding the source, attribute holding the hash) per model
+IMAGE_FIELDS = {
+    'Flan': ('image_url', 'image_hash'),
+    'FlanCreator': ('profile_image', 'profile_image_hash'),
+}
+
+
+def is_available() -> bool:
+    return Image is not None
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def thumbnail_name(digest: str, width: int, ext: str) -> str:
+    return f'{THUMBNAIL_DIR}/{digest[:2]}/{digest}-{width}.{ext}'
+
+
+def thumbnail_url(digest: str, width: int, ext: str) -> str:
+    return default_storage.url(thumbnail_name(digest, width, ext))
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    return not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved
+                or ip.is_multicast or ip.is_unspecified)
+
+
+def check_remote_url(url: str) -> None:
+    """
+    Raise ThumbnailError unless ``url`` is http(s) and its host resolves only
+    to public addresses, so row data can't make us fetch internal services.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in REMOTE_SCHEMES or not parts.hostname:
+        raise ThumbnailError(url, "only http(s) URLs are fetched")
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or None, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError) as e:
+        raise ThumbnailError(url, f"can't resolve host ({e})")
+    if not all(_is_public_address(info[4][0]) for info in infos):
+        raise ThumbnailError(url, "host resolves to a private or local address")
+
+
+class _CheckedRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Applies check_remote_url to every redirect target too."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_remote_url(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_CheckedRedirectHandler)
+
+
+def fetch_source(source: str, allow_local: bool = False) -> bytes:
+    """
+    Bytes of an image given as a public http(s) URL. file:// URLs and local
+    paths are only read with ``allow_local`` (generate_thumbnails --allow-local-files).
+    """
+    scheme = urlsplit(source).scheme
+    try:
+        if scheme in REMOTE_SCHEMES:
+            check_remote_url(source)
+            request = urllib.request.Request(source, headers={'User-Agent': 'OnlyFlans-Thumbnailer'})
+            with _opener.open(request, timeout=FETCH_TIMEOUT) as response:
+                data = response.read(MAX_SOURCE_BYTES + 1)
+        elif scheme in ('', 'file') and allow_local:
+            path = Path(urlsplit(source).path if scheme == 'file' else source)
+            with open(path, 'rb') as f:
+                data = f.read(MAX_SOURCE_BYTES + 1)
+        elif scheme in ('', 'file'):
+            raise ThumbnailError(source, "local files need --allow-local-files")
+        else:
+            raise ThumbnailError(source, "only http(s) URLs are fetched")
+    except (OSError, ValueError) as e:
+        raise ThumbnailError(source, str(e))
+
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ThumbnailError(source, f"larger than {MAX_SOURCE_BYTES} bytes")
+    return data
+
+
+def _resize(image, width: int):
+    # Never upscale: small sources are stored at their own width under every name
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def build_thumbnails(data: bytes, source: str = '<bytes>') -> str:
+    """Write every width/format variant of ``data`` (skipping existing ones). Returns the hash."""
+    if not is_available():
+        raise ThumbnailError(source, "Pillow is not installed")
+
+    digest = content_hash(data)
+    wanted: List[Tuple[int, str, str]] = [
+        (width, fmt, ext) for width in THUMBNAIL_WIDTHS for fmt, ext, _ in THUMBNAIL_FORMATS
+        if not default_storage.exists(thumbnail_name(digest, width, ext))
+    ]
+    if not wanted:
+        return digest
+
+    try:
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        image = image.convert('RGB')
+    except Exception as e:
+        raise ThumbnailError(source, f"not a readable image ({e})")
+
+    for width, fmt, ext in wanted:
+        buffer = io.BytesIO()
+        _resize(image, width).save(buffer, fmt, quality=THUMBNAIL_QUALITY)
+        default_storage.save(thumbnail_name(digest, width, ext), ContentFile(buffer.getvalue()))
+
+    return digest
+
+
+def get_image_fields(instance) -> Tuple[str, str]:
+    try:
+        return IMAGE_FIELDS[type(instance).__name__]
+    except KeyError:
+        raise TypeError(f"No thumbnail fields for {type(instance).__name__}")
+
+
+def build_for_instance(instance, allow_local: bool = False) -> Optional[str]:
+    """Fetch and thumbnail the instance's picture without saving it. Returns the hash (None without a picture)."""
+    source_field, _ = get_image_fields(instance)
+    source = getattr(instance, source_field)
+    if not source:
+        return None
+    return build_thumbnails(fetch_source(source, allow_local), source)
+
+
+def ingest(instance, allow_local: bool = False) -> Optional[str]:
+    """Build thumbnails for a Flan or FlanCreator and store the hash on it."""
+    _, hash_field = get_image_fields(instance)
+    digest = build_for_instance(instance, allow_local) or ''
+    if getattr(instance, hash_field) != digest:
+        setattr(instance, hash_field, digest)
+        instance.save(update_fields=[hash_field])
+    return digest or None
+
+
+def srcset(digest: str, ext: str) -> str:
+    return ', '.join(f'{thumbnail_url(digest, width, ext)} {width}w' for width in THUMBNAIL_WIDTHS)
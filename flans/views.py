@@ -1,53 +1,84 @@
+from collections import defaultdict
 from typing import Any, Dict
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import HttpRequest, HttpResponse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Sum, Avg, Count
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from .models import Flan, FlanCreator, FlanRating
-from .services import FlanService, SubscriberService, AnalyticsService
+from .services import FlanService, SubscriberService, CreatorService
 from .datatypes import FlanCreateData
-from .exceptions import FlanNotFoundError
+from .exceptions import FlanNotFoundError, InvalidCursorError
+from .counting import estimate_flan_count
+from .db import primary_queryset, replica_reads
+from .pagination import CountingPaginator, keyset_page
+from .caching import (
+    FLAN_DETAIL_CACHE_TIMEOUT, FLAN_LIST_COUNT_CACHE_TIMEOUT, flan_detail_key, flan_list_count_key,
+    get_catalog_generation, get_or_compute,
+)
+from .page_cache import (
+    anonymous_page_cache, creator_detail_last_modified, creators_list_last_modified,
+    flan_detail_last_modified, flan_list_last_modified,
+)
+from . import write_behind
 import logging
 
 logger = logging.getLogger(__name__)
 
 FLANS_PER_PAGE = 9
+CREATOR_FLANS_PER_PAGE = 12
 
 
+def get_flans_per_page() -> int:
+    return getattr(settings, 'FLANS_LIST_PAGE_SIZE', FLANS_PER_PAGE)
+
+
+@anonymous_page_cache(flan_list_last_modified)
 def flan_list(request: HttpRequest) -> HttpResponse:
     """
     Display all flans with filtering and pagination.
 
     FIX: Added pagination — loading all flans at once doesn't scale.
-    FIX: Uses ORM aggregate for stats instead of Python loops.
+    NEW: The card grid is fragment-cached per (type, page, catalog generation),
+    so the page's flans are only queried on a cache miss.
+    FIX: The total is cached per (type, catalog generation) too, so a warm
+    page runs no COUNT either.
     """
     try:
         flan_type = request.GET.get('type', '')
         page_number = request.GET.get('page', 1)
+        per_page = get_flans_per_page()
+        generation = get_catalog_generation()
 
-        # Filter queryset
-        queryset = Flan.objects.select_related('featured_creator', 'creator')
+        # Filter queryset. The page fills the shared grid fragment in list.html,
+        # so it's read from the primary like any other shared cache fill
+        queryset = primary_queryset(Flan.objects.select_related('featured_creator', 'creator'))
         if flan_type:
             queryset = queryset.filter(flan_type=flan_type)
 
-        # Paginate
-        paginator = Paginator(queryset, FLANS_PER_PAGE)
+        # Paginate; the total comes from FLANS_COUNT_MODE (may be an estimate)
+        paginator = CountingPaginator(
+            queryset, per_page,
+            estimate=lambda: estimate_flan_count(flan_type=flan_type),
+            counter=lambda count: get_or_compute(
+                flan_list_count_key(flan_type, generation), count, FLAN_LIST_COUNT_CACHE_TIMEOUT),
+        )
         page_obj = paginator.get_page(page_number)
 
-        # FIX: Single DB query for stats instead of Python sum() loop
-        system_analytics = AnalyticsService.get_system_analytics()
-
         context: Dict[str, Any] = {
             'flans': page_obj,
             'page_obj': page_obj,
             'selected_type': flan_type,
             # FIX: was Flan.FLAN_TYPES (didn't exist)
             'flan_types': Flan.FlanType.choices,
-            'total_flans': paginator.count,
-            'system_analytics': system_analytics,
+            'total_flans': paginator.count_display,
+            'total_flans_is_estimate': paginator.count_is_estimate,
+            # Keys for the cached card grid in list.html
+            'per_page': per_page,
+            'catalog_generation': generation,
         }
 
         return render(request, 'flans/list.html', context)
@@ -58,39 +89,60 @@ def flan_list(request: HttpRequest) -> HttpResponse:
         return render(request, 'flans/list.html', {
             'flans': [],
             'flan_types': Flan.FlanType.choices,
-            'system_analytics': {}
         })
 
 
+def _flan_detail_queryset():
+    """
+    Flans with rating stats as correlated subqueries, so the shared part of
+    the detail page is one SELECT.
+    """
+    ratings = FlanRating.objects.filter(flan=OuterRef('pk')).order_by().values('flan')
+    return Flan.objects.select_related('creator', 'featured_creator').annotate(
+        avg_score=Subquery(ratings.annotate(avg=Avg('score')).values('avg')),
+        total_ratings=Coalesce(Subquery(ratings.annotate(total=Count('id')).values('total')), 0),
+    )
+
+
+@anonymous_page_cache(flan_detail_last_modified)
 def flan_detail(request: HttpRequest, flan_id: int) -> HttpResponse:
     """
     Display detailed view of a single flan.
 
     FIX: Was querying the DB twice (service + ORM). Now one query.
     NEW: Shows ratings and handles rating submission.
+    NEW: Flan + rating stats are cached and misses coalesced per flan.
+    FIX: Rating stats are annotated onto the flan fetch, so a miss is a
+    single query.
+    FIX: Signed-in views share the cached flan too; only the user's own
+    rating is looked up per request.
     """
-    flan = get_object_or_404(
-        Flan.objects.select_related('creator', 'featured_creator'),
-        id=flan_id
-    )
-
-    # Get rating stats in one query
-    rating_stats = flan.ratings.aggregate(
-        avg_score=Avg('score'),
-        total_ratings=Count('id'),
+    # Shared part of the page is cached; concurrent misses are coalesced
+    flan = get_or_compute(
+        flan_detail_key(flan_id),
+        lambda: get_object_or_404(_flan_detail_queryset(), id=flan_id),
+        FLAN_DETAIL_CACHE_TIMEOUT,
     )
 
-    # Check if current user has rated this flan
     user_rating = None
     if request.user.is_authenticated:
-        user_rating = flan.ratings.filter(user=request.user).first()
+        # Read-your-writes: a rating still sitting in the write-behind buffer wins
+        pending = write_behind.rating_buffer.get_pending(flan.id, request.user.id)
+        if pending:
+            user_rating = FlanRating(
+                flan=flan, user=request.user,
+                score=pending.score, review=pending.review,
+            )
+        else:
+            user_rating = FlanRating.objects.filter(
+                flan_id=flan.id, user=request.user).only('score', 'review').first()
 
     context = {
         'flan': flan,
         'display_type': flan.get_flan_type_display(),
         'display_price': flan.get_display_price(),
-        'avg_score': round(rating_stats['avg_score'] or 0, 1),
-        'total_ratings': rating_stats['total_ratings'],
+        'avg_score': round(flan.avg_score or 0, 1),
+        'total_ratings': flan.total_ratings,
         'user_rating': user_rating,
         'score_range': range(1, 6),  # for rendering 5 stars in template
     }
@@ -103,6 +155,7 @@ def rate_flan(request: HttpRequest, flan_id: int) -> HttpResponse:
     """
     NEW: Handle flan rating submission.
     Uses update_or_create — one query, no race conditions.
+    With FLANS_RATING_WRITE_BEHIND the write is queued instead (see write_behind).
     """
     if request.method != 'POST':
         return redirect('flan-detail', flan_id=flan_id)
@@ -117,14 +170,20 @@ def rate_flan(request: HttpRequest, flan_id: int) -> HttpResponse:
             messages.error(request, "Rating must be between 1 and 5.")
             return redirect('flan-detail', flan_id=flan_id)
 
-        # update_or_create: if rating exists update it, otherwise create it
-        rating, created = FlanRating.objects.update_or_create(
-            flan=flan,
-            user=request.user,
-            defaults={'score': score, 'review': review}
-        )
+        if write_behind.is_enabled():
+            # Committed in the background, batched with other ratings
+            write_behind.rating_buffer.submit(
+                flan.id, request.user.id, score, review)
+            action = "submitted"
+        else:
+            # update_or_create: if rating exists update it, otherwise create it
+            rating, created = FlanRating.objects.update_or_create(
+                flan=flan,
+                user=request.user,
+                defaults={'score': score, 'review': review}
+            )
+            action = "submitted" if created else "updated"
 
-        action = "submitted" if created else "updated"
         messages.success(
             request, f"Your rating has been {action}! {'🍮' * score}")
         logger.info(
@@ -203,31 +262,40 @@ def create_flan(request: HttpRequest) -> HttpResponse:
     })
 
 
+@replica_reads()
+@anonymous_page_cache(creators_list_last_modified)
 def creators_list(request: HttpRequest) -> HttpResponse:
     """
     Display all flan creators.
 
-    FIX: Uses DB aggregation instead of Python loops for stats.
-    FIX: Uses select_related to avoid N+1 queries.
+    FIX: One query for everything — creators come annotated with their flan
+    counts, and the type groups and summary stats are built from that one
+    list in Python instead of re-querying per section.
     """
     try:
-        creators = FlanCreator.objects.prefetch_related('flans')
+        creators = list(
+            FlanCreator.objects.annotate(flans_count=Count('flans'))
+        )
+
+        by_type = defaultdict(list)
+        for creator in creators:
+            by_type[creator.creator_type].append(creator)
 
-        # FIX: One DB query instead of Python sum() loop
-        stats = creators.aggregate(
-            total_earnings=Sum('total_earnings'),
-            avg_satisfaction=Avg('satisfaction_rate'),
+        total_earnings = sum(creator.total_earnings for creator in creators)
+        avg_satisfaction = (
+            sum(creator.satisfaction_rate for creator in creators) / len(creators)
+            if creators else 0
         )
 
         context = {
             'creators': creators,
-            'featured_creators': creators.filter(is_featured=True),
-            'grandma_creators': creators.filter(creator_type='grandma'),
-            'chef_creators': creators.filter(creator_type='chef'),
-            'influencer_creators': creators.filter(creator_type='influencer'),
-            'total_creators': creators.count(),
-            'total_earnings': stats['total_earnings'] or 0,
-            'avg_satisfaction': round(stats['avg_satisfaction'] or 0, 1),
+            'featured_creators': [c for c in creators if c.is_featured],
+            'grandma_creators': by_type[FlanCreator.CreatorType.GRANDMA],
+            'chef_creators': by_type[FlanCreator.CreatorType.CHEF],
+            'influencer_creators': by_type[FlanCreator.CreatorType.INFLUENCER],
+            'total_creators': len(creators),
+            'total_earnings': total_earnings,
+            'avg_satisfaction': round(avg_satisfaction, 1),
         }
 
         return render(request, 'flans/creators.html', context)
@@ -238,23 +306,36 @@ def creators_list(request: HttpRequest) -> HttpResponse:
         return render(request, 'flans/creators.html', {'creators': []})
 
 
+@anonymous_page_cache(creator_detail_last_modified)
 def creator_detail(request: HttpRequest, creator_id: int) -> HttpResponse:
     """
     Display detailed view of a creator.
 
     FIX: Was returning random Flan.objects.all()[:3] as mock data.
     Now returns actual flans linked to this creator via FK.
+    FIX: Flans are keyset-paginated (?after=<cursor>) and the stats come from
+    the per-creator cache, so a top creator's page costs the same as a newcomer's.
     """
     creator = get_object_or_404(FlanCreator, id=creator_id)
+    creator_stats = CreatorService.get_creator_stats(creator.id)
+    # Lets total_flans/get_flans_count_display use the cached count
+    creator.flans_count = creator_stats.flan_count
 
-    # FIX: actual related flans via featured_creator FK
-    creator_flans = Flan.objects.filter(
-        featured_creator=creator
-    ).select_related('creator')
+    try:
+        page = keyset_page(
+            Flan.objects.filter(featured_creator=creator),
+            request.GET.get('after'),
+            CREATOR_FLANS_PER_PAGE,
+        )
+    except InvalidCursorError:
+        page = keyset_page(
+            Flan.objects.filter(featured_creator=creator), None, CREATOR_FLANS_PER_PAGE)
 
     context = {
         'creator': creator,
-        'creator_flans': creator_flans,
+        'creator_flans': page.items,
+        'next_cursor': page.next_cursor,
+        'creator_stats': creator_stats,
         'is_popular': creator.is_popular,
         'flans_count_display': creator.get_flans_count_display(),
     }
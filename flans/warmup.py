@@ -0,0 +1,52 @@
+"""
+Template warmup.
+
+With the cached template loader each template is parsed once per process,
+on first use, so without warmup the first request a worker serves for every
+page pays the compile cost. ``warm_templates`` loads every template shipped
+in flans/templates up front; ``onlyflans.wsgi``/``asgi`` call it at boot
+when ``FLANS_WARM_TEMPLATES_ON_BOOT`` is set, and the ``warm_templates``
+command runs it by hand.
+"""
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_names() -> List[str]:
+    """Names (as passed to get_template) of every template under flans/templates."""
+    root = Path(apps.get_app_config('flans').path) / 'templates'
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in root.rglob('*') if path.is_file()
+    )
+
+
+def warm_templates() -> Dict[str, float]:
+    """Compile every flans template in every Django template engine. Returns ms per template."""
+    timings: Dict[str, float] = {}
+    for name in get_template_names():
+        started = time.perf_counter()
+        for engine in engines.all():
+            engine.get_template(name)
+        timings[name] = (time.perf_counter() - started) * 1000
+
+    logger.info(f"Warmed {len(timings)} templates in {sum(timings.values()):.1f} ms")
+    return timings
+
+
+def warm_on_boot() -> None:
+    """Hook for the WSGI/ASGI entry points; never lets a warmup error stop a worker."""
+    if not getattr(settings, 'FLANS_WARM_TEMPLATES_ON_BOOT', False):
+        return
+    try:
+        warm_templates()
+    except Exception as e:
+        logger.error(f"Template warmup failed: {e}")
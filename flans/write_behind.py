@@ -0,0 +1,179 @@
+"""
+Write-behind buffering for rating submissions.
+
+On SQLite every writer serializes on the database lock, so bursts of
+``update_or_create`` calls from request threads end in "database is
+locked". With ``FLANS_RATING_WRITE_BEHIND = True`` the rating views hand
+writes to a single background writer thread instead. Repeated ratings of
+the same flan by the same user are coalesced (last one wins) and the
+buffer is committed in batches, one transaction and one upsert per batch.
+
+Pending ratings stay visible to the user who submitted them until they are
+committed (read-your-writes). The buffer is per process, so deployments
+with several worker processes should keep a user on one worker or accept
+that a pending rating can show up on the next request only after the
+flush interval.
+"""
+import atexit
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .caching import invalidate_flan
+from .models import Flan, FlanRating
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.25  # seconds between commits
+MAX_BATCH_SIZE = 500   # pending ratings that trigger an early commit
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'FLANS_RATING_WRITE_BEHIND', False)
+
+
+@dataclass
+class PendingRating:
+    flan_id: int
+    user_id: int
+    score: int
+    review: str = ''
+    submitted_at: datetime = field(default_factory=timezone.now)
+
+
+class RatingWriteBuffer:
+    """Coalescing single-writer queue for FlanRating upserts."""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL,
+                 max_batch_size: int = MAX_BATCH_SIZE, autostart: bool = True):
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.autostart = autostart
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[int, int], PendingRating] = {}
+        self._wakeup = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, flan_id: int, user_id: int, score: int, review: str = '') -> PendingRating:
+        """Queue a rating; replaces any not-yet-committed rating for the same flan and user."""
+        pending = PendingRating(flan_id, user_id, score, review)
+        with self._lock:
+            self._pending[(flan_id, user_id)] = pending
+            backlog = len(self._pending)
+
+        if backlog >= self.max_batch_size:
+            self._wakeup.set()
+        if self.autostart:
+            self._ensure_worker()
+        return pending
+
+    def get_pending(self, flan_id: int, user_id: int) -> Optional[PendingRating]:
+        with self._lock:
+            return self._pending.get((flan_id, user_id))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Commit everything pending in one transaction. Returns the number of ratings written."""
+        with self._lock:
+            batch = dict(self._pending)
+        if not batch:
+            return 0
+
+        # Ratings for flans or users deleted in the meantime would fail the whole batch
+        live_flans = set(Flan.objects.filter(
+            id__in={flan_id for flan_id, _ in batch}
+        ).values_list('id', flat=True))
+        live_users = set(User.objects.filter(
+            id__in={user_id for _, user_id in batch}
+        ).values_list('id', flat=True))
+
+        now = timezone.now()
+        ratings = [
+            # updated_at is the commit time, so page validators built on it still move forward
+            FlanRating(
+                flan_id=p.flan_id, user_id=p.user_id, score=p.score,
+                review=p.review, created_at=p.submitted_at, updated_at=now,
+            )
+            for p in batch.values() if p.flan_id in live_flans and p.user_id in live_users
+        ]
+        try:
+            with transaction.atomic():
+                self._write(ratings)
+            written = ratings
+        except IntegrityError:
+            # Something was deleted after the check above: write row by row and
+            # drop the offenders, or the batch would fail on every retry
+            written = self._write_each(ratings)
+
+        # Only drop entries that weren't replaced while we were writing
+        # (written, dropped or filtered out above, all are done with)
+        with self._lock:
+            for key, pending in batch.items():
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
+
+        # bulk_create doesn't send post_save, so invalidate explicitly
+        for flan_id in {rating.flan_id for rating in written}:
+            invalidate_flan(flan_id)
+
+        logger.info(f"Committed {len(written)} buffered ratings")
+        return len(written)
+
+    def _write(self, ratings: List[FlanRating]) -> None:
+        FlanRating.objects.bulk_create(
+            ratings,
+            batch_size=self.max_batch_size,
+            update_conflicts=True,
+            unique_fields=['flan', 'user'],
+            update_fields=['score', 'review', 'updated_at'],
+        )
+
+    def _write_each(self, ratings: List[FlanRating]) -> List[FlanRating]:
+        written = []
+        for rating in ratings:
+            try:
+                with transaction.atomic():
+                    self._write([rating])
+            except IntegrityError as e:
+                logger.warning(
+                    f"Dropping buffered rating of flan {rating.flan_id} by user {rating.user_id}: {e}")
+            else:
+                written.append(rating)
+        return written
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name='rating-write-behind', daemon=True)
+            self._worker.start()
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Pending ratings are kept and retried on the next tick
+                logger.error(f"Error flushing buffered ratings: {e}")
+            finally:
+                close_old_connections()
+
+
+# Process-wide buffer used by the rating views
+rating_buffer = RatingWriteBuffer()
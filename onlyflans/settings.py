@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Sampled SQL profiling; inactive unless FLANS_SQL_PROFILING
+    'flans.profiling.SQLProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +52,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Logs requests over their query budget; inactive unless FLANS_QUERY_BUDGET_WARNINGS
+    'flans.query_budget.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'onlyflans.urls'
@@ -126,9 +130,49 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 STATIC_URL = '/static/'
+# collectstatic target; production serves hashed + compressed files from here
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Queue rating writes on a single background writer instead of writing
+# from each request thread (helps with "database is locked" on SQLite)
+FLANS_RATING_WRITE_BEHIND = False
+
+# Delta sync tokens never move past changes newer than this many seconds,
+# so a transaction that commits late is still picked up (see flans.sync)
+FLANS_SYNC_SETTLE_SECONDS = 30
+
+# Cards per page on the flan list
+FLANS_LIST_PAGE_SIZE = 9
+
+# Listing totals: 'exact', 'cached' (exact, cached for FLANS_COUNT_CACHE_TTL
+# seconds) or 'estimated' (shows "10,000+" past FLANS_COUNT_ESTIMATE_THRESHOLD)
+FLANS_COUNT_MODE = 'exact'
+FLANS_COUNT_CACHE_TTL = 60
+FLANS_COUNT_ESTIMATE_THRESHOLD = 10_000
+
+# Pre-compile templates when a WSGI/ASGI worker boots (on in settings_production)
+FLANS_WARM_TEMPLATES_ON_BOOT = False
+
+# Whole-page HTML cache + ETag/Last-Modified for visitors without a session
+FLANS_ANONYMOUS_PAGE_CACHE = True
+
+# PRAGMAs run on every new SQLite connection (see flans.db); tuned set in settings_production
+FLANS_SQLITE_PRAGMAS = {}
+
+# Read replicas (see flans.db.ReplicaRouter; add it to DATABASE_ROUTERS and
+# ReplicaMiddleware to MIDDLEWARE to enable). Reads marked replica_reads(),
+# or every GET/HEAD with FLANS_REPLICA_SAFE_METHODS, go to one of these
+# aliases; a client that just wrote reads from the primary for
+# FLANS_PRIMARY_PIN_SECONDS.
+FLANS_REPLICA_ALIASES = []
+FLANS_REPLICA_SAFE_METHODS = False
+FLANS_PRIMARY_PIN_SECONDS = 5
+
+# Serve STATIC_ROOT through flans.static_views (on in settings_production)
+FLANS_SERVE_STATIC = False
+
 # Email Configuration (Development - emails print to console)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_HOST = 'localhost'
@@ -142,3 +186,17 @@ DEFAULT_FROM_EMAIL = 'noreply@onlyflans.com'
 # EMAIL_USE_TLS = True
 # EMAIL_HOST_USER = 'your-email@gmail.com'
 # EMAIL_HOST_PASSWORD = 'your-app-password'
+
+# Warn (flans.query_budget logger) when a request runs more SQL queries than
+# its URL's budget in flans.query_budget.QUERY_BUDGETS; override budgets
+# per URL name with FLANS_QUERY_BUDGETS = {'flan-list': 10}
+FLANS_QUERY_BUDGET_WARNINGS = DEBUG
+FLANS_QUERY_BUDGETS = {}
+
+# Sampled request/SQL profiling (flans.profiling): p50/p95/p99 per URL name
+# and query fingerprint at /api/profiling/, slow statements to the
+# flans.slow_queries logger. Cheap enough for production at a low rate.
+FLANS_SQL_PROFILING = False
+FLANS_SQL_PROFILING_SAMPLE_RATE = 0.05
+FLANS_SLOW_QUERY_MS = 100
+FLANS_SLOW_REQUEST_MS = 500
@@ -0,0 +1,98 @@
+"""
+Production settings for onlyflans.
+
+Use with DJANGO_SETTINGS_MODULE=onlyflans.settings_production. Everything
+not overridden here comes from ``settings``.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+FLANS_QUERY_BUDGET_WARNINGS = False
+
+# FLANS_SQL_PROFILING=1 to sample requests (see flans.profiling)
+FLANS_SQL_PROFILING = os.environ.get('FLANS_SQL_PROFILING', '') == '1'
+FLANS_SQL_PROFILING_SAMPLE_RATE = float(os.environ.get('FLANS_SQL_PROFILING_SAMPLE_RATE', '0.01'))
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',') if host
+]
+
+# SQLite in WAL mode: readers don't block behind writers. Connections are kept
+# for CONN_MAX_AGE seconds so the pragmas below run once per connection, not
+# per request. IMMEDIATE transactions take the write lock up front, so a
+# writer waits out busy_timeout instead of failing on a lock upgrade.
+SQLITE_PATH = os.environ.get('FLANS_SQLITE_PATH', str(BASE_DIR / 'db.sqlite3'))  # noqa: F405
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': SQLITE_PATH,
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        # Lock waits are governed by the busy_timeout pragma below
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
+    # Same file opened read-only, used as the "replica" (flans.db.ReplicaRouter).
+    # With Postgres, list the streaming replicas here and in FLANS_REPLICA_ALIASES.
+    'readonly': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{SQLITE_PATH}?mode=ro',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'uri': True},
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+from flans.db import DEFAULT_SQLITE_PRAGMAS  # noqa: E402
+
+FLANS_SQLITE_PRAGMAS = DEFAULT_SQLITE_PRAGMAS
+
+DATABASE_ROUTERS = ['flans.db.ReplicaRouter']
+
+MIDDLEWARE = MIDDLEWARE + ['flans.db.ReplicaMiddleware']  # noqa: F405
+
+FLANS_REPLICA_ALIASES = ['readonly']
+# The read-only connection never lags the file, so every GET/HEAD can use it
+FLANS_REPLICA_SAFE_METHODS = True
+
+# Compile each template once per process and keep it. Explicit loaders
+# require APP_DIRS to be off; app_directories covers flans/templates.
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Pre-compile every flans template when a worker boots (see flans.warmup)
+FLANS_WARM_TEMPLATES_ON_BOOT = True
+
+# Content-hashed filenames plus pre-built .gz/.br variants (run collectstatic)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'flans.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# Serve STATIC_ROOT with far-future Cache-Control unless a front-end server does
+FLANS_SERVE_STATIC = os.environ.get('FLANS_SERVE_STATIC', '1') == '1'
@@ -13,11 +13,25 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from flans.static_views import serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('flans.urls')),
     path('api/', include('flans.api_urls')),
 ]
+
+# Generated thumbnails under MEDIA_ROOT (only served by Django when DEBUG)
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+# Hashed, pre-compressed static files when there's no front-end server
+if getattr(settings, 'FLANS_SERVE_STATIC', False):
+    urlpatterns.insert(0, re_path(
+        r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static))
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'onlyflans.settings')
 
 application = get_wsgi_application()
+
+# Compile templates before the first request (FLANS_WARM_TEMPLATES_ON_BOOT)
+from flans.warmup import warm_on_boot  # noqa: E402
+
+warm_on_boot()